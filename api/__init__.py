@@ -1,5 +1,7 @@
 from flask import Blueprint
 from flask_restx import Api
+from utils.fieldsets import apply_fields_mask
+from utils.json_provider import output_json
 
 # Main Blueprint for all API routes
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -13,6 +15,12 @@ api = Api(
     doc='/docs'  # Documentation URL (http://127.0.0.1:5000/api/docs)
 )
 
+# Encode resource responses with the application's JSON provider instead of the stdlib
+api.representation('application/json')(output_json)
+
+# Let `?fields=` drive the marshalling mask of every resource
+api_bp.before_request(apply_fields_mask)
+
 # Import namespaces in the desired order
 from .client import clients_ns
 from .employee import employees_ns
@@ -22,6 +30,12 @@ from .task import tasks_ns
 from .invoice import invoice_ns
 from .invoice_item import invoice_items_ns
 from .setting import setting_ns
+from .batch import batch_ns
+from .revenue import revenue_ns
+from .report import reports_ns
+from .search import search_ns
+from .cache import cache_ns
+from .database import database_ns
 
 # Add namespaces in the desired order
 api.add_namespace(clients_ns, path='/client')  # Client operations
@@ -32,3 +46,9 @@ api.add_namespace(tasks_ns, path='/task')  # Task operations
 api.add_namespace(invoice_ns, path='/invoice')  # Invoice operations
 api.add_namespace(invoice_items_ns, path='/invoice_item')  # Invoice item operations
 api.add_namespace(setting_ns, path='/setting')  # Setting operations
+api.add_namespace(batch_ns, path='/batch')  # Multi-operation transactions
+api.add_namespace(revenue_ns, path='/revenue')  # Revenue rollups
+api.add_namespace(reports_ns, path='/reports')  # Aggregated reports
+api.add_namespace(search_ns, path='/search')  # Full-text search
+api.add_namespace(cache_ns, path='/cache')  # Response cache statistics
+api.add_namespace(database_ns, path='/database')  # Read/write routing statistics
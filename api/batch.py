@@ -0,0 +1,38 @@
+import logging
+from flask_restx import Namespace, Resource, fields
+from services.batch_service import BATCH_OPERATIONS, BATCH_RESOURCES, BatchOperationError, run_batch
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for running several writes in one transaction
+batch_ns = Namespace('batch', description='Run several create, update and delete operations in one transaction')
+
+batch_operation_model = batch_ns.model('BatchOperation', {
+    'op': fields.String(required=True, enum=list(BATCH_OPERATIONS), description='Operation to run'),
+    'resource': fields.String(required=True, enum=list(BATCH_RESOURCES), description='Resource the operation applies to'),
+    'ref': fields.String(description='Name under which a create stores its id for later operations'),
+    'id': fields.Raw(description='Id of the row to update or delete, or {"$ref": name}'),
+    'data': fields.Raw(description='Column values; any value may be {"$ref": name}'),
+})
+
+batch_result_model = batch_ns.model('BatchResult', {
+    'op': fields.String(description='Operation that was run'),
+    'resource': fields.String(description='Resource the operation applied to'),
+    'id': fields.Integer(description='Id of the created, updated or deleted row'),
+    'ref': fields.String(description='Reference name given to the created row'),
+})
+
+@batch_ns.route('/')
+class Batch(Resource):
+    @batch_ns.expect([batch_operation_model])
+    @batch_ns.marshal_list_with(batch_result_model)
+    @batch_ns.response(400, 'An operation failed and nothing was written')
+    def post(self):
+        try:
+            return run_batch(batch_ns.payload)
+        except BatchOperationError as e:
+            batch_ns.abort(400, str(e), index=e.index)
+        except ValueError as e:
+            batch_ns.abort(400, str(e))
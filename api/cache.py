@@ -0,0 +1,30 @@
+import logging
+from flask_restx import Namespace, Resource, fields
+from utils.response_cache import response_cache
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for inspecting the in-process response cache
+cache_ns = Namespace('cache', description='Statistics of the in-process response cache')
+
+cache_stats_model = cache_ns.model('CacheStats', {
+    'entries': fields.Integer(description='Number of cached responses'),
+    'size': fields.Integer(description='Total size of the cached responses, in bytes'),
+    'max_size': fields.Integer(description='Memory budget of the cache, in bytes (0 when disabled)'),
+    'hits': fields.Integer(description='Requests answered from the cache'),
+    'misses': fields.Integer(description='Requests that had to be computed'),
+    'evictions': fields.Integer(description='Entries dropped to stay within the budget'),
+    'hit_ratio': fields.Float(description='hits / (hits + misses)'),
+})
+
+@cache_ns.route('/')
+class Cache(Resource):
+    @cache_ns.marshal_with(cache_stats_model)
+    def get(self):
+        return response_cache.stats()
+
+    def delete(self):
+        response_cache.clear()
+        return '', 204
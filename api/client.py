@@ -1,15 +1,47 @@
 import logging
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, fields
 from werkzeug.exceptions import HTTPException
 from services.client_service import (
     get_all_clients,
+    iter_clients,
     get_client,
+    get_client_history,
     create_client,
+    create_clients_bulk,
+    update_clients_bulk,
+    delete_clients_bulk,
     update_client,
+    patch_client,
     delete_client
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.date_range import DATE_RANGE_PARAMS, date_range_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    CASCADE_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    cascade_arg,
+    returning_arg
+)
 from models.client import Client
+from models.vehicle import Vehicle
+from models.work import Work
+from models.task import Task
+from models.invoice import Invoice
 
 
 # Initialize logging
@@ -27,6 +59,30 @@ client_model = generate_swagger_model(
     readonly_fields=['client_id']  # Fields that cannot be modified
 )
 
+# Response of the history endpoint: the client, its vehicles with their works and tasks, and its invoices
+client_task_model = generate_swagger_model(api=clients_ns, model=Task, readonly_fields=['task_id'])
+client_work_model = clients_ns.clone('ClientWork', generate_swagger_model(
+    api=clients_ns, model=Work, readonly_fields=['work_id']
+), {
+    'tasks': fields.List(fields.Nested(client_task_model), description='Tasks of the work'),
+})
+client_vehicle_model = clients_ns.clone('ClientVehicle', generate_swagger_model(
+    api=clients_ns, model=Vehicle, readonly_fields=['vehicle_id']
+), {
+    'works': fields.List(fields.Nested(client_work_model), description='Works on the vehicle in the date window'),
+})
+client_history_model = clients_ns.clone('ClientHistory', client_model, {
+    'vehicles': fields.List(fields.Nested(client_vehicle_model), description='Vehicles of the client'),
+    'invoices': fields.List(fields.Nested(generate_swagger_model(
+        api=clients_ns, model=Invoice, readonly_fields=['invoice_id', 'total_with_iva']
+    )), description='Invoices of the client issued in the date window'),
+})
+
+# Request and responses of the bulk endpoints
+client_bulk_result_model = bulk_result_model(clients_ns)
+client_bulk_change_request_model = bulk_change_request_model(clients_ns)
+client_bulk_change_result_model = bulk_change_result_model(clients_ns, client_model)
+
 
 @clients_ns.route('/')
 class ClientList(Resource):
@@ -35,16 +91,26 @@ class ClientList(Resource):
     Supports retrieving all clients (GET) and creating new clients (POST).
     """
 
-    @clients_ns.doc('get_all_clients')
-    @clients_ns.marshal_list_with(client_model)
+    @clients_ns.doc('get_all_clients', params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("client")
+    @conditional("client")
+    @streamable(iter_clients, client_model)
+    @clients_ns.response(200, 'Success', [client_model])
     def get(self):
         """
-        Retrieve all clients.
-        :return: List of all clients
+        Retrieve a page of clients.
+        :return: List of clients, with the next page cursor in the X-Next-Cursor header
         """
         try:
-            # Fetch all clients from the service layer
-            return get_all_clients()
+            # Fetch one page of clients from the service layer
+            clients, next_cursor = get_all_clients(
+                **pagination_args(), fields=parse_fields(client_model), filters=filter_args(),
+                include=parse_include(model_for_table("client"))
+            )
+            return clients, 200, pagination_headers(next_cursor)
+        except ValueError as e:
+            # Invalid limit, cursor, field, filter or sort column
+            clients_ns.abort(400, str(e))
         except HTTPException as http_err:
             # Allow HTTP exceptions to propagate their status codes and messages
             logger.error(f"HTTP error while retrieving clients: {http_err}")
@@ -75,6 +141,86 @@ class ClientList(Resource):
             clients_ns.abort(500, "An error occurred while creating the client.")
 
 
+@clients_ns.route('/bulk')
+class ClientBulk(Resource):
+    """
+    Handles batch operations on clients.
+    Supports creating many clients in one transaction (POST), and updating (PATCH) or
+    deleting (DELETE) a selection of clients with a single statement.
+    """
+
+    @clients_ns.doc('create_clients_bulk', params=BULK_PARAMS)
+    @clients_ns.expect([client_model])
+    @clients_ns.response(201, 'All clients created', client_bulk_result_model)
+    @clients_ns.response(207, 'Some clients created, see errors', client_bulk_result_model)
+    @clients_ns.response(400, 'No client created')
+    def post(self):
+        """
+        Create many clients with a single multi-row INSERT.
+        :return: Generated ids in request order and per-row errors
+        """
+        try:
+            result = create_clients_bulk(bulk_payload(), atomic=atomic_arg())
+            return result, bulk_status(result)
+        except ValueError as e:
+            # The body is not a usable array of rows
+            clients_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk creating clients: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk creating clients: {e}")
+            clients_ns.abort(500, "An error occurred while creating the clients.")
+
+    @clients_ns.doc('update_clients_bulk', params=BULK_CHANGE_PARAMS)
+    @clients_ns.expect(client_bulk_change_request_model)
+    @clients_ns.marshal_with(client_bulk_change_result_model)
+    @clients_ns.response(400, 'Invalid selection or values')
+    def patch(self):
+        """
+        Update every selected client with a single UPDATE ... WHERE statement.
+        Clients are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of updated clients (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return update_clients_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            # Invalid selection, values or constraint violation
+            clients_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk updating clients: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk updating clients: {e}")
+            clients_ns.abort(500, "An error occurred while updating the clients.")
+
+    @clients_ns.doc('delete_clients_bulk', params=BULK_CHANGE_PARAMS)
+    @clients_ns.expect(client_bulk_change_request_model)
+    @clients_ns.marshal_with(client_bulk_change_result_model)
+    @clients_ns.response(400, 'Invalid selection')
+    def delete(self):
+        """
+        Delete every selected client with a single DELETE ... WHERE statement.
+        Clients are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of deleted clients (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return delete_clients_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            # Invalid selection or constraint violation
+            clients_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk deleting clients: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk deleting clients: {e}")
+            clients_ns.abort(500, "An error occurred while deleting the clients.")
+
+
 @clients_ns.route('/<int:client_id>')
 @clients_ns.param('client_id', 'The ID of the client')
 class Client(Resource):
@@ -83,7 +229,9 @@ class Client(Resource):
     Supports retrieving (GET), updating (PUT), and deleting (DELETE) a client.
     """
 
-    @clients_ns.doc('get_client')
+    @clients_ns.doc('get_client', params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("client")
+    @includable(get_client, Client, client_model)
     @clients_ns.marshal_with(client_model)
     def get(self, client_id):
         """
@@ -93,11 +241,14 @@ class Client(Resource):
         """
         try:
             # Fetch client by ID
-            client = get_client(client_id)
+            client = get_client(client_id, fields=parse_fields(client_model))
             if not client:
                 # Return a 404 error if client does not exist
                 clients_ns.abort(404, f"Client with ID {client_id} not found.")
             return client
+        except ValueError as e:
+            # Unknown field requested
+            clients_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while retrieving client with ID {client_id}: {http_err}")
             raise http_err
@@ -131,25 +282,90 @@ class Client(Resource):
             logger.error(f"Error updating client with ID {client_id}: {e}")
             clients_ns.abort(500, "An error occurred while updating the client.")
 
-    @clients_ns.doc('delete_client')
+    @clients_ns.doc('patch_client')
+    @clients_ns.expect(client_model)
+    @clients_ns.marshal_with(client_model)
+    def patch(self, client_id):
+        """
+        Partially update a client by ID, with a single UPDATE ... RETURNING.
+        Only the columns present in the payload are changed, falsy values such as 0 or "" included.
+        :param client_id: The ID of the client
+        :return: The updated client details or 404 if not found
+        """
+        try:
+            client = patch_client(client_id, clients_ns.payload)
+            if client is None:
+                # Return a 404 error if the client does not exist
+                clients_ns.abort(404, f"Client with ID {client_id} not found.")
+            return client
+        except ValueError as e:
+            # Unknown column, invalid value or constraint violation
+            clients_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while patching client with ID {client_id}: {http_err}")
+            raise http_err
+        except Exception as e:
+            # Log error and return a 500 status code
+            logger.error(f"Error patching client with ID {client_id}: {e}")
+            clients_ns.abort(500, "An error occurred while updating the client.")
+
+    @clients_ns.doc('delete_client', params=CASCADE_PARAMS)
     @clients_ns.response(204, 'Client successfully deleted')
+    @clients_ns.response(400, 'Client has vehicles or invoices and cascade is not set')
     def delete(self, client_id):
         """
-        Delete a client by ID.
+        Delete a client by ID, with a single DELETE statement.
+        A client with vehicles or invoices is only deleted, together with them, when `cascade` is set.
         :param client_id: The ID of the client
         :return: HTTP 204 status code if deleted successfully or 404 if not found
         """
         try:
             # Call the service to delete the client
-            client = delete_client(client_id)
-            if not client:
+            deleted = delete_client(client_id, cascade=cascade_arg())
+            if not deleted:
                 # Return a 404 error if client does not exist
                 clients_ns.abort(404, f"Client with ID {client_id} not found.")
             return '', 204  # Return no content with status code 204
+        except ValueError as e:
+            # The client still owns rows and cascade was not requested
+            clients_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while deleting client with ID {client_id}: {http_err}")
             raise http_err
         except Exception as e:
             # Log error and return a 500 status code
             logger.error(f"Error deleting client with ID {client_id}: {e}")
-            clients_ns.abort(500, "An error occurred while deleting the client.")
\ No newline at end of file
+            clients_ns.abort(500, "An error occurred while deleting the client.")
+
+
+@clients_ns.route('/<int:client_id>/history')
+class ClientHistory(Resource):
+    """
+    Handles the full history of a single client.
+    """
+
+    @clients_ns.doc('get_client_history', params=DATE_RANGE_PARAMS)
+    @clients_ns.marshal_with(client_history_model)
+    def get(self, client_id):
+        """
+        Retrieve a client with their vehicles, the works and tasks on each vehicle, and their invoices.
+        :param client_id: The ID of the client
+        :return: The client history or 404 if not found
+        """
+        try:
+            # Fetch the client and every related level, one query per level
+            history = get_client_history(client_id, **date_range_args())
+            if history is None:
+                # Return a 404 error if client does not exist
+                clients_ns.abort(404, f"Client with ID {client_id} not found.")
+            return history
+        except ValueError as e:
+            # Invalid date window
+            clients_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while retrieving the history of client with ID {client_id}: {http_err}")
+            raise http_err
+        except Exception as e:
+            # Log error and return a 500 status code
+            logger.error(f"Error retrieving the history of client with ID {client_id}: {e}")
+            clients_ns.abort(500, "An error occurred while retrieving the client history.")
@@ -0,0 +1,27 @@
+import logging
+from flask_restx import Namespace, Resource, fields
+from utils.database import route_stats
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for inspecting how statements are spread over the database engines
+database_ns = Namespace('database', description='Routing of statements between the primary and read engines')
+
+engine_stats_model = database_ns.model('EngineStats', {
+    'statements': fields.Integer(description='Statements executed on the engine since startup'),
+    'pool': fields.String(description='State of the engine\'s connection pool'),
+})
+
+routing_stats_model = database_ns.model('RoutingStats', {
+    'primary': fields.Nested(engine_stats_model, description='Engine receiving every write'),
+    'read': fields.Nested(engine_stats_model, allow_null=True,
+                          description='Read-only engine serving GET requests (null when disabled)'),
+})
+
+@database_ns.route('/routing')
+class Routing(Resource):
+    @database_ns.marshal_with(routing_stats_model)
+    def get(self):
+        return route_stats()
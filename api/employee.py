@@ -1,8 +1,27 @@
 import logging
 from flask_restx import Namespace, Resource, abort
 from models.employee import Employee
-from services.employee_service import get_all_employees, get_employee, create_employee, update_employee, delete_employee
+from services.employee_service import get_all_employees, iter_employees, get_employee, create_employee, create_employees_bulk, update_employees_bulk, delete_employees_bulk, update_employee, patch_employee, delete_employee
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from werkzeug.exceptions import HTTPException, BadRequest, NotFound
 
 # Initialize logging
@@ -20,6 +39,11 @@ employee_model = generate_swagger_model(
     readonly_fields=['employee_id', 'created_at']
 )
 
+# Request and responses of the bulk endpoints
+employee_bulk_result_model = bulk_result_model(employees_ns)
+employee_bulk_change_request_model = bulk_change_request_model(employees_ns)
+employee_bulk_change_result_model = bulk_change_result_model(employees_ns, employee_model)
+
 # Routes for managing employees
 @employees_ns.route('/')
 @employees_ns.response(500, 'Internal Server Error')
@@ -27,16 +51,25 @@ class EmployeeList(Resource):
     """
     Resource for operations on the collection of employees (GET all, POST new).
     """
-    @employees_ns.doc('get_all_employees')
-    @employees_ns.marshal_list_with(employee_model)
+    @employees_ns.doc('get_all_employees', params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("employee")
+    @conditional("employee")
+    @streamable(iter_employees, employee_model)
+    @employees_ns.response(200, 'Success', [employee_model])
     def get(self):
         """
-        Retrieve all employees.
-        :return: List of all employees in dictionary format
+        Retrieve a page of employees.
+        :return: List of employees in dictionary format, with the next page cursor in the X-Next-Cursor header
         """
         try:
-            employees = get_all_employees()
-            return employees
+            employees, next_cursor = get_all_employees(
+                **pagination_args(), fields=parse_fields(employee_model), filters=filter_args(),
+                include=parse_include(model_for_table("employee"))
+            )
+            return employees, 200, pagination_headers(next_cursor)
+        except ValueError as e:
+            # Invalid limit, cursor, field, filter or sort column
+            employees_ns.abort(400, str(e))
         except HTTPException as http_err:
             # Allow HTTP exceptions to propagate as they are
             raise http_err
@@ -67,6 +100,87 @@ class EmployeeList(Resource):
             employees_ns.abort(400, "Bad Request")
 
 
+@employees_ns.route('/bulk')
+@employees_ns.response(500, 'Internal Server Error')
+class EmployeeBulk(Resource):
+    """
+    Resource for batch operations on employees (POST many, PATCH/DELETE a selection).
+    """
+    @employees_ns.doc('create_employees_bulk', params=BULK_PARAMS)
+    @employees_ns.expect([employee_model])
+    @employees_ns.response(201, 'All employees created', employee_bulk_result_model)
+    @employees_ns.response(207, 'Some employees created, see errors', employee_bulk_result_model)
+    @employees_ns.response(400, 'Bad Request')
+    def post(self):
+        """
+        Create many employees with a single multi-row INSERT.
+        :return: Generated ids in request order and per-row errors
+        """
+        try:
+            result = create_employees_bulk(bulk_payload(), atomic=atomic_arg())
+            return result, bulk_status(result)
+        except ValueError as e:
+            # The body is not a usable array of rows
+            employees_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            # Allow HTTP exceptions to propagate as they are
+            raise http_err
+        except Exception as e:
+            # Log and handle unexpected exceptions with a 500 status code
+            logger.error(f"Error bulk creating employees: {e}")
+            employees_ns.abort(500, "Internal Server Error")
+
+    @employees_ns.doc('update_employees_bulk', params=BULK_CHANGE_PARAMS)
+    @employees_ns.expect(employee_bulk_change_request_model)
+    @employees_ns.marshal_with(employee_bulk_change_result_model)
+    @employees_ns.response(400, 'Invalid selection or values')
+    def patch(self):
+        """
+        Update every selected employee with a single UPDATE ... WHERE statement.
+        Employees are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of updated employees (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return update_employees_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            # Invalid selection, values or constraint violation
+            employees_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            # Allow HTTP exceptions to propagate as they are
+            raise http_err
+        except Exception as e:
+            # Log and handle unexpected exceptions with a 500 status code
+            logger.error(f"Error bulk updating employees: {e}")
+            employees_ns.abort(500, "Internal Server Error")
+
+    @employees_ns.doc('delete_employees_bulk', params=BULK_CHANGE_PARAMS)
+    @employees_ns.expect(employee_bulk_change_request_model)
+    @employees_ns.marshal_with(employee_bulk_change_result_model)
+    @employees_ns.response(400, 'Invalid selection')
+    def delete(self):
+        """
+        Delete every selected employee with a single DELETE ... WHERE statement.
+        Employees are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of deleted employees (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return delete_employees_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            # Invalid selection or constraint violation
+            employees_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            # Allow HTTP exceptions to propagate as they are
+            raise http_err
+        except Exception as e:
+            # Log and handle unexpected exceptions with a 500 status code
+            logger.error(f"Error bulk deleting employees: {e}")
+            employees_ns.abort(500, "Internal Server Error")
+
+
 @employees_ns.route('/<int:employee_id>')
 @employees_ns.response(404, 'Employee ID not found')
 @employees_ns.response(500, 'Internal Server Error')
@@ -77,7 +191,9 @@ class Employee(Resource):
     """
     @employees_ns.route('/<int:employee_id>')
     class EmployeeResource(Resource):
-        @employees_ns.doc('get_employee')
+        @employees_ns.doc('get_employee', params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+        @conditional("employee")
+        @includable(get_employee, Employee, employee_model)
         @employees_ns.marshal_with(employee_model)
         def get(self, employee_id):
             """
@@ -85,11 +201,14 @@ class Employee(Resource):
             """
             try:
                 # Fetch the employee by ID
-                employee = get_employee(employee_id)
+                employee = get_employee(employee_id, fields=parse_fields(employee_model))
                 if not employee:
                     # Abort with a 404 status and custom message
                     raise NotFound('My custom message')
                 return employee
+            except ValueError as e:
+                # Unknown field requested
+                employees_ns.abort(400, str(e))
             # except HTTPException as http_err:
             #     # Allow HTTP exceptions to propagate as they are
             #     raise http_err
@@ -122,10 +241,38 @@ class Employee(Resource):
             logger.error(f"Error updating employee {employee_id}: {e}")
             employees_ns.abort(400, "Bad Request")
 
+    @employees_ns.doc('patch_employee')
+    @employees_ns.expect(employee_model)
+    @employees_ns.marshal_with(employee_model)
+    @employees_ns.response(400, 'Bad Request')
+    def patch(self, employee_id):
+        """
+        Partially update an employee, with a single UPDATE ... RETURNING.
+        Only the columns present in the payload are changed, falsy values included.
+        :param employee_id: The ID of the employee
+        :return: Dictionary of the updated employee or a 404 error if not found
+        """
+        try:
+            patched_employee = patch_employee(employee_id, employees_ns.payload)
+            if patched_employee is None:
+                employees_ns.abort(404, f"Employee with ID {employee_id} not found.")
+            return patched_employee
+        except ValueError as e:
+            # Unknown column, invalid value or constraint violation
+            employees_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            # Allow HTTP exceptions to propagate as they are
+            raise http_err
+        except Exception as e:
+            # Log and handle unexpected exceptions with a 500 status code
+            logger.error(f"Error patching employee {employee_id}: {e}")
+            employees_ns.abort(500, "Internal Server Error")
+
     @employees_ns.doc('delete_employee')
+    @employees_ns.response(400, 'Employee still has tasks')
     def delete(self, employee_id):
         """
-        Delete an employee by ID.
+        Delete an employee by ID. Employees who still have tasks are kept.
         :param employee_id: The ID of the employee
         :return: Empty response body with HTTP 204 status code or a 404 error if not found
         """
@@ -134,6 +281,9 @@ class Employee(Resource):
             if not deleted:
                 employees_ns.abort(404, f"Employee with ID {employee_id} not found.")
             return '', 204
+        except ValueError as e:
+            # The employee is still assigned to tasks (ON DELETE RESTRICT)
+            employees_ns.abort(400, str(e))
         except HTTPException as http_err:
             # Allow HTTP exceptions to propagate as they are
             raise http_err
@@ -1,15 +1,41 @@
 import logging
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, fields
 from werkzeug.exceptions import HTTPException
 from services.invoice_service import (
     get_all_invoices,
+    iter_invoices,
     get_invoice,
     create_invoice,
+    create_invoices_bulk,
+    update_invoices_bulk,
+    delete_invoices_bulk,
     update_invoice,
-    delete_invoice
+    patch_invoice,
+    delete_invoice,
+    create_invoice_from_work
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -26,11 +52,37 @@ invoice_model = generate_swagger_model(
     readonly_fields=['invoice_id', 'total_with_iva']
 )
 
+# Request and response of the invoice generated from a work
+invoice_from_work_request_model = invoice_ns.model('InvoiceFromWorkRequest', {
+    'issued_at': fields.Date(description='Issue date of the invoice (defaults to now)'),
+})
+invoice_from_work_model = invoice_ns.clone('InvoiceWithItems', invoice_model, {
+    'items': fields.List(fields.Nested(generate_swagger_model(
+        api=invoice_ns, model=InvoiceItem, readonly_fields=['item_id']
+    )), description='One item per billable task of the work'),
+})
+
+# Request and responses of the bulk endpoints
+invoice_bulk_result_model = bulk_result_model(invoice_ns)
+invoice_bulk_change_request_model = bulk_change_request_model(invoice_ns)
+invoice_bulk_change_result_model = bulk_change_result_model(invoice_ns, invoice_model)
+
 @invoice_ns.route('/')
 class InvoiceList(Resource):
-    @invoice_ns.marshal_list_with(invoice_model)
+    @invoice_ns.doc(params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("invoice")
+    @conditional("invoice")
+    @streamable(iter_invoices, invoice_model)
+    @invoice_ns.response(200, 'Success', [invoice_model])
     def get(self):
-        return get_all_invoices()
+        try:
+            invoices, next_cursor = get_all_invoices(
+                **pagination_args(), fields=parse_fields(invoice_model), filters=filter_args(),
+                include=parse_include(model_for_table("invoice"))
+            )
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        return invoices, 200, pagination_headers(next_cursor)
 
     @invoice_ns.expect(invoice_model, validate=True)
     @invoice_ns.marshal_with(invoice_model, code=201)
@@ -40,11 +92,67 @@ class InvoiceList(Resource):
             data["client_id"], data["issued_at"], data["total"], data["iva"]
         ), 201
 
+@invoice_ns.route('/bulk')
+class InvoiceBulk(Resource):
+    @invoice_ns.doc(params=BULK_PARAMS)
+    @invoice_ns.expect([invoice_model])
+    @invoice_ns.response(201, 'All invoices created', invoice_bulk_result_model)
+    @invoice_ns.response(207, 'Some invoices created, see errors', invoice_bulk_result_model)
+    def post(self):
+        try:
+            result = create_invoices_bulk(bulk_payload(), atomic=atomic_arg())
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        return result, bulk_status(result)
+
+    @invoice_ns.doc(params=BULK_CHANGE_PARAMS)
+    @invoice_ns.expect(invoice_bulk_change_request_model)
+    @invoice_ns.marshal_with(invoice_bulk_change_result_model)
+    def patch(self):
+        try:
+            body = bulk_change_payload()
+            return update_invoices_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+
+    @invoice_ns.doc(params=BULK_CHANGE_PARAMS)
+    @invoice_ns.expect(invoice_bulk_change_request_model)
+    @invoice_ns.marshal_with(invoice_bulk_change_result_model)
+    def delete(self):
+        try:
+            body = bulk_change_payload()
+            return delete_invoices_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+
+@invoice_ns.route('/from-work/<int:work_id>')
+class InvoiceFromWork(Resource):
+    @invoice_ns.expect(invoice_from_work_request_model)
+    @invoice_ns.marshal_with(invoice_from_work_model, code=201)
+    def post(self, work_id):
+        try:
+            data = bulk_change_payload()
+            result = create_invoice_from_work(work_id, issued_at=data.get("issued_at"))
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        if result is None:
+            invoice_ns.abort(404, f"Work with ID {work_id} not found.")
+        return result, 201
+
 @invoice_ns.route('/<int:invoice_id>')
 class Invoice(Resource):
+    @invoice_ns.doc(params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("invoice")
+    @includable(get_invoice, Invoice, invoice_model)
     @invoice_ns.marshal_with(invoice_model)
     def get(self, invoice_id):
-        return get_invoice(invoice_id)
+        try:
+            fields = parse_fields(invoice_model)
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        return get_invoice(invoice_id, fields=fields)
 
     @invoice_ns.expect(invoice_model, validate=True)
     @invoice_ns.marshal_with(invoice_model)
@@ -55,5 +163,23 @@ class Invoice(Resource):
             data.get("total"), data.get("iva")
         )
 
+    @invoice_ns.doc(description="Update only the given columns, in one UPDATE ... RETURNING")
+    @invoice_ns.expect(invoice_model)
+    @invoice_ns.marshal_with(invoice_model)
+    def patch(self, invoice_id):
+        try:
+            invoice = patch_invoice(invoice_id, invoice_ns.payload)
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        if invoice is None:
+            invoice_ns.abort(404, f"Invoice with ID {invoice_id} not found.")
+        return invoice
+
     def delete(self, invoice_id):
-        return delete_invoice(invoice_id), 204
+        try:
+            deleted = delete_invoice(invoice_id)
+        except ValueError as e:
+            invoice_ns.abort(400, str(e))
+        if not deleted:
+            invoice_ns.abort(404, f"Invoice with ID {invoice_id} not found.")
+        return '', 204
@@ -3,12 +3,36 @@ from flask_restx import Namespace, Resource
 from werkzeug.exceptions import HTTPException
 from services.invoice_item_service import (
     get_all_invoice_items,
+    iter_invoice_items,
     get_invoice_item,
     create_invoice_item,
+    create_invoice_items_bulk,
+    update_invoice_items_bulk,
+    delete_invoice_items_bulk,
     update_invoice_item,
+    patch_invoice_item,
     delete_invoice_item
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.invoice_item import InvoiceItem
 
 # Initialize logging
@@ -26,11 +50,27 @@ invoice_item_model = generate_swagger_model(
     readonly_fields=['item_id']
 )
 
+# Request and responses of the bulk endpoints
+invoice_item_bulk_result_model = bulk_result_model(invoice_items_ns)
+invoice_item_bulk_change_request_model = bulk_change_request_model(invoice_items_ns)
+invoice_item_bulk_change_result_model = bulk_change_result_model(invoice_items_ns, invoice_item_model)
+
 @invoice_items_ns.route('/')
 class InvoiceItemList(Resource):
-    @invoice_items_ns.marshal_list_with(invoice_item_model)
+    @invoice_items_ns.doc(params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("invoice_item")
+    @conditional("invoice_item")
+    @streamable(iter_invoice_items, invoice_item_model)
+    @invoice_items_ns.response(200, 'Success', [invoice_item_model])
     def get(self):
-        return get_all_invoice_items()
+        try:
+            items, next_cursor = get_all_invoice_items(
+                **pagination_args(), fields=parse_fields(invoice_item_model), filters=filter_args(),
+                include=parse_include(model_for_table("invoice_item"))
+            )
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+        return items, 200, pagination_headers(next_cursor)
 
     @invoice_items_ns.expect(invoice_item_model, validate=True)
     @invoice_items_ns.marshal_with(invoice_item_model, code=201)
@@ -40,11 +80,53 @@ class InvoiceItemList(Resource):
             data["description"], data["cost"], data["task_id"], data["invoice_id"]
         ), 201
 
+@invoice_items_ns.route('/bulk')
+class InvoiceItemBulk(Resource):
+    @invoice_items_ns.doc(params=BULK_PARAMS)
+    @invoice_items_ns.expect([invoice_item_model])
+    @invoice_items_ns.response(201, 'All invoice items created', invoice_item_bulk_result_model)
+    @invoice_items_ns.response(207, 'Some invoice items created, see errors', invoice_item_bulk_result_model)
+    def post(self):
+        try:
+            result = create_invoice_items_bulk(bulk_payload(), atomic=atomic_arg())
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+        return result, bulk_status(result)
+
+    @invoice_items_ns.doc(params=BULK_CHANGE_PARAMS)
+    @invoice_items_ns.expect(invoice_item_bulk_change_request_model)
+    @invoice_items_ns.marshal_with(invoice_item_bulk_change_result_model)
+    def patch(self):
+        try:
+            body = bulk_change_payload()
+            return update_invoice_items_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+
+    @invoice_items_ns.doc(params=BULK_CHANGE_PARAMS)
+    @invoice_items_ns.expect(invoice_item_bulk_change_request_model)
+    @invoice_items_ns.marshal_with(invoice_item_bulk_change_result_model)
+    def delete(self):
+        try:
+            body = bulk_change_payload()
+            return delete_invoice_items_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+
 @invoice_items_ns.route('/<int:item_id>')
 class InvoiceItem(Resource):
+    @invoice_items_ns.doc(params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("invoice_item")
+    @includable(get_invoice_item, InvoiceItem, invoice_item_model)
     @invoice_items_ns.marshal_with(invoice_item_model)
     def get(self, item_id):
-        return get_invoice_item(item_id)
+        try:
+            fields = parse_fields(invoice_item_model)
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+        return get_invoice_item(item_id, fields=fields)
 
     @invoice_items_ns.expect(invoice_item_model, validate=True)
     @invoice_items_ns.marshal_with(invoice_item_model)
@@ -55,5 +137,19 @@ class InvoiceItem(Resource):
             data.get("task_id"), data.get("invoice_id")
         )
 
+    @invoice_items_ns.doc(description="Update only the given columns, in one UPDATE ... RETURNING")
+    @invoice_items_ns.expect(invoice_item_model)
+    @invoice_items_ns.marshal_with(invoice_item_model)
+    def patch(self, item_id):
+        try:
+            invoice_item = patch_invoice_item(item_id, invoice_items_ns.payload)
+        except ValueError as e:
+            invoice_items_ns.abort(400, str(e))
+        if invoice_item is None:
+            invoice_items_ns.abort(404, f"Invoice item with ID {item_id} not found.")
+        return invoice_item
+
     def delete(self, item_id):
-        return delete_invoice_item(item_id), 204
\ No newline at end of file
+        if not delete_invoice_item(item_id):
+            invoice_items_ns.abort(404, f"Invoice item with ID {item_id} not found.")
+        return '', 204
\ No newline at end of file
@@ -0,0 +1,134 @@
+import logging
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from werkzeug.exceptions import HTTPException
+from services.report_service import (
+    works_by_status,
+    turnaround_by_month,
+    tasks_completed_by_employee,
+    top_vehicles_by_spend
+)
+from utils.date_range import DATE_RANGE_PARAMS, date_range_args
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for the reports
+reports_ns = Namespace('reports', description='Aggregated reports on works, tasks and invoices')
+
+works_by_status_model = reports_ns.model('WorksByStatus', {
+    'status': fields.String(description='Status of the works'),
+    'works': fields.Integer(description='Number of works with this status'),
+    'total_cost': fields.Float(description='Sum of the cost of these works'),
+})
+
+turnaround_model = reports_ns.model('TurnaroundByMonth', {
+    'year_month': fields.String(description='Month the works were finished in (YYYY-MM)'),
+    'works': fields.Integer(description='Number of works finished in the month'),
+    'average_days': fields.Float(description='Average number of days from start to end date'),
+    'min_days': fields.Float(description='Shortest turnaround, in days'),
+    'max_days': fields.Float(description='Longest turnaround, in days'),
+})
+
+tasks_by_employee_model = reports_ns.model('TasksCompletedByEmployee', {
+    'employee_id': fields.Integer(description='ID of the employee'),
+    'name': fields.String(description='Name of the employee'),
+    'tasks_completed': fields.Integer(description='Number of tasks the employee completed'),
+    'rank': fields.Integer(description='Rank of the employee, 1 being the most tasks'),
+})
+
+vehicle_spend_model = reports_ns.model('VehicleSpend', {
+    'vehicle_id': fields.Integer(description='ID of the vehicle'),
+    'license_plate': fields.String(description='License plate of the vehicle'),
+    'brand': fields.String(description='Brand of the vehicle'),
+    'model': fields.String(description='Model of the vehicle'),
+    'client_id': fields.Integer(description='ID of the owner'),
+    'spend': fields.Float(description='Amount invoiced for the tasks done on the vehicle'),
+    'invoices': fields.Integer(description='Number of invoices involving the vehicle'),
+    'rank': fields.Integer(description='Rank of the vehicle, 1 being the highest spend'),
+})
+
+@reports_ns.route('/works-by-status')
+class WorksByStatus(Resource):
+    @reports_ns.doc(params=DATE_RANGE_PARAMS)
+    @reports_ns.marshal_list_with(works_by_status_model)
+    def get(self):
+        """
+        Count the works of each status, with their total cost.
+        :return: One row per status, most frequent first, for the works started in the date range
+        """
+        try:
+            return works_by_status(**date_range_args())
+        except ValueError as e:
+            # Invalid 'from' or 'to' date
+            reports_ns.abort(400, str(e))
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error computing the works by status report")
+            reports_ns.abort(500, "An error occurred while computing the works by status report.")
+
+@reports_ns.route('/turnaround')
+class Turnaround(Resource):
+    @reports_ns.doc(params=DATE_RANGE_PARAMS)
+    @reports_ns.marshal_list_with(turnaround_model)
+    def get(self):
+        """
+        Average, shortest and longest turnaround of the works finished each month.
+        :return: One row per month, in month order, for the works finished in the date range
+        """
+        try:
+            return turnaround_by_month(**date_range_args())
+        except ValueError as e:
+            # Invalid 'from' or 'to' date
+            reports_ns.abort(400, str(e))
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error computing the turnaround report")
+            reports_ns.abort(500, "An error occurred while computing the turnaround report.")
+
+@reports_ns.route('/tasks-by-employee')
+class TasksByEmployee(Resource):
+    @reports_ns.doc(params=DATE_RANGE_PARAMS)
+    @reports_ns.marshal_list_with(tasks_by_employee_model)
+    def get(self):
+        """
+        Rank the employees by the number of tasks they completed.
+        :return: One row per employee, highest count first, for the tasks finished in the date range
+        """
+        try:
+            return tasks_completed_by_employee(**date_range_args())
+        except ValueError as e:
+            # Invalid 'from' or 'to' date
+            reports_ns.abort(400, str(e))
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error computing the tasks by employee report")
+            reports_ns.abort(500, "An error occurred while computing the tasks by employee report.")
+
+@reports_ns.route('/top-vehicles')
+class TopVehicles(Resource):
+    @reports_ns.doc(params={**DATE_RANGE_PARAMS, "limit": "Number of vehicles to return (default 10)"})
+    @reports_ns.marshal_list_with(vehicle_spend_model)
+    def get(self):
+        """
+        Rank the vehicles by the amount invoiced for the tasks done on them.
+        :return: The `limit` vehicles with the highest spend, for the invoices issued in the date range
+        """
+        try:
+            limit = int(request.args.get("limit", 10))
+        except ValueError:
+            reports_ns.abort(400, "The 'limit' parameter must be a positive integer.")
+        try:
+            return top_vehicles_by_spend(**date_range_args(), limit=limit)
+        except ValueError as e:
+            # Invalid 'from' or 'to' date, or a limit below 1
+            reports_ns.abort(400, str(e))
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("Error computing the top vehicles report")
+            reports_ns.abort(500, "An error occurred while computing the top vehicles report.")
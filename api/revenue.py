@@ -0,0 +1,66 @@
+import logging
+from flask import request
+from flask_restx import Namespace, Resource
+from services.revenue_service import (
+    get_monthly_revenue,
+    get_client_revenue,
+    get_month_revenue_by_client
+)
+from utils.utils import generate_swagger_model
+from utils.conditional import conditional
+from utils.response_cache import cached
+from models.revenue_month import RevenueMonth
+from models.revenue_client_month import RevenueClientMonth
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for the revenue rollups
+revenue_ns = Namespace('revenue', description='Monthly revenue, read from rollups maintained as invoices change')
+
+# Generate the Swagger models for the rollups
+revenue_month_model = generate_swagger_model(api=revenue_ns, model=RevenueMonth)
+revenue_client_month_model = generate_swagger_model(api=revenue_ns, model=RevenueClientMonth)
+
+# Month range understood by the revenue endpoints
+MONTH_RANGE_PARAMS = {
+    "from": "First month to include (YYYY-MM)",
+    "to": "Last month to include (YYYY-MM)",
+}
+
+# The rollups only change when invoices do, so the invoice table's version applies to them
+@revenue_ns.route('/monthly')
+class MonthlyRevenue(Resource):
+    @revenue_ns.doc(params=MONTH_RANGE_PARAMS)
+    @cached("invoice")
+    @conditional("invoice")
+    @revenue_ns.response(200, 'Success', [revenue_month_model])
+    def get(self):
+        try:
+            return get_monthly_revenue(request.args.get("from"), request.args.get("to"))
+        except ValueError as e:
+            revenue_ns.abort(400, str(e))
+
+@revenue_ns.route('/monthly/<string:year_month>/clients')
+class MonthRevenueByClient(Resource):
+    @cached("invoice")
+    @conditional("invoice")
+    @revenue_ns.response(200, 'Success', [revenue_client_month_model])
+    def get(self, year_month):
+        try:
+            return get_month_revenue_by_client(year_month)
+        except ValueError as e:
+            revenue_ns.abort(400, str(e))
+
+@revenue_ns.route('/client/<int:client_id>')
+class ClientRevenue(Resource):
+    @revenue_ns.doc(params=MONTH_RANGE_PARAMS)
+    @cached("invoice")
+    @conditional("invoice")
+    @revenue_ns.response(200, 'Success', [revenue_client_month_model])
+    def get(self, client_id):
+        try:
+            return get_client_revenue(client_id, request.args.get("from"), request.args.get("to"))
+        except ValueError as e:
+            revenue_ns.abort(400, str(e))
@@ -0,0 +1,40 @@
+import logging
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from services.search_service import SEARCH_SOURCES, search
+from utils.pagination import pagination_args, pagination_headers
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Namespace for the full-text search
+search_ns = Namespace('search', description='Full-text search across clients, vehicles, works and tasks')
+
+search_hit_model = search_ns.model('SearchHit', {
+    'type': fields.String(description='Type of the resource found', enum=list(SEARCH_SOURCES)),
+    'id': fields.Integer(description='ID of the resource found'),
+    'title': fields.String(description='Name, vehicle or description of the resource'),
+    'snippet': fields.String(description='Best matching text, matches wrapped in <mark> tags'),
+    'score': fields.Float(description='Relevance (bm25), lower is better'),
+})
+
+SEARCH_PARAMS = {
+    "q": "Words to search for; rows with all of them, or failing that with any of them, best first",
+    "type": f"Comma-separated types to search ({', '.join(SEARCH_SOURCES)}; all by default)",
+    "limit": "Maximum number of hits to return (capped by the server)",
+    "after": "Cursor returned in the X-Next-Cursor header of the previous page",
+}
+
+@search_ns.route('/')
+class Search(Resource):
+    @search_ns.doc(params=SEARCH_PARAMS)
+    @search_ns.marshal_list_with(search_hit_model)
+    def get(self):
+        try:
+            page = pagination_args()
+            types = [kind for kind in request.args.get("type", "").split(",") if kind] or None
+            hits, next_cursor = search(request.args.get("q"), types=types, limit=page["limit"], after=page["after"])
+        except ValueError as e:
+            search_ns.abort(400, str(e))
+        return hits, 200, pagination_headers(next_cursor)
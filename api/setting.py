@@ -3,12 +3,36 @@ from flask_restx import Namespace, Resource
 from werkzeug.exceptions import HTTPException
 from services.setting_service import (
     get_all_settings,
+    iter_settings,
     get_setting,
+    get_setting_by_key,
     create_setting,
+    create_settings_bulk,
+    update_settings_bulk,
+    delete_settings_bulk,
     update_setting,
+    patch_setting,
     delete_setting
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.setting import Setting
 
 # Initialize logging
@@ -26,11 +50,26 @@ setting_model = generate_swagger_model(
     readonly_fields=['setting_id', 'updated_at']
 )
 
+# Request and responses of the bulk endpoints
+setting_bulk_result_model = bulk_result_model(setting_ns)
+setting_bulk_change_request_model = bulk_change_request_model(setting_ns)
+setting_bulk_change_result_model = bulk_change_result_model(setting_ns, setting_model)
+
 @setting_ns.route('/')
 class SettingList(Resource):
-    @setting_ns.marshal_list_with(setting_model)
+    @setting_ns.doc(params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS})
+    @cached("setting")
+    @conditional("setting")
+    @streamable(iter_settings, setting_model)
+    @setting_ns.response(200, 'Success', [setting_model])
     def get(self):
-        return get_all_settings()
+        try:
+            settings, next_cursor = get_all_settings(
+                **pagination_args(), fields=parse_fields(setting_model), filters=filter_args()
+            )
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+        return settings, 200, pagination_headers(next_cursor)
 
     @setting_ns.expect(setting_model, validate=True)
     @setting_ns.marshal_with(setting_model, code=201)
@@ -38,11 +77,68 @@ class SettingList(Resource):
         data = setting_ns.payload
         return create_setting(data["key_name"], data["value"]), 201
 
+@setting_ns.route('/bulk')
+class SettingBulk(Resource):
+    @setting_ns.doc(params=BULK_PARAMS)
+    @setting_ns.expect([setting_model])
+    @setting_ns.response(201, 'All settings created', setting_bulk_result_model)
+    @setting_ns.response(207, 'Some settings created, see errors', setting_bulk_result_model)
+    def post(self):
+        try:
+            result = create_settings_bulk(bulk_payload(), atomic=atomic_arg())
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+        return result, bulk_status(result)
+
+    @setting_ns.doc(params=BULK_CHANGE_PARAMS)
+    @setting_ns.expect(setting_bulk_change_request_model)
+    @setting_ns.marshal_with(setting_bulk_change_result_model)
+    def patch(self):
+        try:
+            body = bulk_change_payload()
+            return update_settings_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+
+    @setting_ns.doc(params=BULK_CHANGE_PARAMS)
+    @setting_ns.expect(setting_bulk_change_request_model)
+    @setting_ns.marshal_with(setting_bulk_change_result_model)
+    def delete(self):
+        try:
+            body = bulk_change_payload()
+            return delete_settings_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+
+@setting_ns.route('/key/<string:key_name>')
+class SettingByKey(Resource):
+    @setting_ns.doc(params=FIELDS_PARAMS)
+    @conditional("setting")
+    @setting_ns.marshal_with(setting_model)
+    @setting_ns.response(404, 'Setting not found')
+    def get(self, key_name):
+        try:
+            parse_fields(setting_model)
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+        setting = get_setting_by_key(key_name)
+        if setting is None:
+            setting_ns.abort(404, f"Setting '{key_name}' not found.")
+        return setting
+
 @setting_ns.route('/<int:setting_id>')
 class Setting(Resource):
+    @setting_ns.doc(params=FIELDS_PARAMS)
+    @conditional("setting")
     @setting_ns.marshal_with(setting_model)
     def get(self, setting_id):
-        return get_setting(setting_id)
+        try:
+            fields = parse_fields(setting_model)
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+        return get_setting(setting_id, fields=fields)
 
     @setting_ns.expect(setting_model, validate=True)
     @setting_ns.marshal_with(setting_model)
@@ -50,5 +146,19 @@ class Setting(Resource):
         data = setting_ns.payload
         return update_setting(setting_id, data.get("key_name"), data.get("value"))
 
+    @setting_ns.doc(description="Update only the given columns, in one UPDATE ... RETURNING")
+    @setting_ns.expect(setting_model)
+    @setting_ns.marshal_with(setting_model)
+    def patch(self, setting_id):
+        try:
+            setting = patch_setting(setting_id, setting_ns.payload)
+        except ValueError as e:
+            setting_ns.abort(400, str(e))
+        if setting is None:
+            setting_ns.abort(404, f"Setting with ID {setting_id} not found.")
+        return setting
+
     def delete(self, setting_id):
-        return delete_setting(setting_id), 204
+        if not delete_setting(setting_id):
+            setting_ns.abort(404, f"Setting with ID {setting_id} not found.")
+        return '', 204
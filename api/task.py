@@ -3,13 +3,37 @@ from flask_restx import Namespace, Resource, fields
 from werkzeug.exceptions import HTTPException
 from services.task_service import (
     get_all_tasks,
+    iter_tasks,
     get_task,
     create_task,
+    create_tasks_bulk,
+    update_tasks_bulk,
+    delete_tasks_bulk,
     update_task,
+    patch_task,
     delete_task,
     update_task_status
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.task import Task
 
 # Initialize logging
@@ -27,11 +51,27 @@ task_model = generate_swagger_model(
     readonly_fields=['task_id', 'created_at']
 )
 
+# Request and responses of the bulk endpoints
+task_bulk_result_model = bulk_result_model(tasks_ns)
+task_bulk_change_request_model = bulk_change_request_model(tasks_ns)
+task_bulk_change_result_model = bulk_change_result_model(tasks_ns, task_model)
+
 @tasks_ns.route('/')
 class TaskList(Resource):
-    @tasks_ns.marshal_list_with(task_model)
+    @tasks_ns.doc(params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("task")
+    @conditional("task")
+    @streamable(iter_tasks, task_model)
+    @tasks_ns.response(200, 'Success', [task_model])
     def get(self):
-        return get_all_tasks()
+        try:
+            tasks, next_cursor = get_all_tasks(
+                **pagination_args(), fields=parse_fields(task_model), filters=filter_args(),
+                include=parse_include(model_for_table("task"))
+            )
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+        return tasks, 200, pagination_headers(next_cursor)
 
     @tasks_ns.expect(task_model, validate=True)
     @tasks_ns.marshal_with(task_model, code=201)
@@ -42,11 +82,53 @@ class TaskList(Resource):
             data["start_date"], data.get("end_date"), data["status"]
         ), 201
 
+@tasks_ns.route('/bulk')
+class TaskBulk(Resource):
+    @tasks_ns.doc(params=BULK_PARAMS)
+    @tasks_ns.expect([task_model])
+    @tasks_ns.response(201, 'All tasks created', task_bulk_result_model)
+    @tasks_ns.response(207, 'Some tasks created, see errors', task_bulk_result_model)
+    def post(self):
+        try:
+            result = create_tasks_bulk(bulk_payload(), atomic=atomic_arg())
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+        return result, bulk_status(result)
+
+    @tasks_ns.doc(params=BULK_CHANGE_PARAMS)
+    @tasks_ns.expect(task_bulk_change_request_model)
+    @tasks_ns.marshal_with(task_bulk_change_result_model)
+    def patch(self):
+        try:
+            body = bulk_change_payload()
+            return update_tasks_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+
+    @tasks_ns.doc(params=BULK_CHANGE_PARAMS)
+    @tasks_ns.expect(task_bulk_change_request_model)
+    @tasks_ns.marshal_with(task_bulk_change_result_model)
+    def delete(self):
+        try:
+            body = bulk_change_payload()
+            return delete_tasks_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+
 @tasks_ns.route('/<int:task_id>')
 class Task(Resource):
+    @tasks_ns.doc(params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("task")
+    @includable(get_task, Task, task_model)
     @tasks_ns.marshal_with(task_model)
     def get(self, task_id):
-        return get_task(task_id)
+        try:
+            fields = parse_fields(task_model)
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+        return get_task(task_id, fields=fields)
 
     @tasks_ns.expect(task_model, validate=True)
     @tasks_ns.marshal_with(task_model)
@@ -58,8 +140,26 @@ class Task(Resource):
             data.get("end_date"), data.get("status")
         )
 
+    @tasks_ns.doc(description="Update only the given columns, in one UPDATE ... RETURNING")
+    @tasks_ns.expect(task_model)
+    @tasks_ns.marshal_with(task_model)
+    def patch(self, task_id):
+        try:
+            task = patch_task(task_id, tasks_ns.payload)
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+        if task is None:
+            tasks_ns.abort(404, f"Task with ID {task_id} not found.")
+        return task
+
     def delete(self, task_id):
-        return delete_task(task_id), 204
+        try:
+            deleted = delete_task(task_id)
+        except ValueError as e:
+            tasks_ns.abort(400, str(e))
+        if not deleted:
+            tasks_ns.abort(404, f"Task with ID {task_id} not found.")
+        return '', 204
 
 @tasks_ns.route('/<int:task_id>/status')
 class UpdateTaskStatus(Resource):
@@ -1,14 +1,41 @@
 import logging
+from flask import request
 from flask_restx import Namespace, Resource
 from werkzeug.exceptions import HTTPException
 from services.vehicle_service import (
     get_all_vehicles,
+    iter_vehicles,
     get_vehicle,
+    get_vehicle_by_plate,
+    find_vehicles_by_plate_prefix,
     create_vehicle,
+    create_vehicles_bulk,
+    update_vehicles_bulk,
+    delete_vehicles_bulk,
     update_vehicle,
+    patch_vehicle,
     delete_vehicle
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.vehicle import Vehicle
 
 # Initialize logging
@@ -23,9 +50,14 @@ vehicle_model = generate_swagger_model(
     api=vehicles_ns,        # Namespace to associate with the model
     model=Vehicle,          # SQLAlchemy model representing the vehicle resource
     exclude_fields=[],      # No excluded fields in this model
-    readonly_fields=['vehicle_id']  # Fields that cannot be modified
+    readonly_fields=['vehicle_id', 'plate_key']  # Fields that cannot be modified (plate_key is derived)
 )
 
+# Request and responses of the bulk endpoints
+vehicle_bulk_result_model = bulk_result_model(vehicles_ns)
+vehicle_bulk_change_request_model = bulk_change_request_model(vehicles_ns)
+vehicle_bulk_change_result_model = bulk_change_result_model(vehicles_ns, vehicle_model)
+
 
 @vehicles_ns.route('/')
 class VehicleList(Resource):
@@ -34,16 +66,26 @@ class VehicleList(Resource):
     Supports retrieving all vehicles (GET) and creating new vehicles (POST).
     """
 
-    @vehicles_ns.doc('get_all_vehicles')
-    @vehicles_ns.marshal_list_with(vehicle_model)
+    @vehicles_ns.doc('get_all_vehicles', params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("vehicle")
+    @conditional("vehicle")
+    @streamable(iter_vehicles, vehicle_model)
+    @vehicles_ns.response(200, 'Success', [vehicle_model])
     def get(self):
         """
-        Retrieve all vehicles.
-        :return: List of all vehicles
+        Retrieve a page of vehicles.
+        :return: List of vehicles, with the next page cursor in the X-Next-Cursor header
         """
         try:
-            # Fetch all vehicles from the service layer
-            return get_all_vehicles()
+            # Fetch one page of vehicles from the service layer
+            vehicles, next_cursor = get_all_vehicles(
+                **pagination_args(), fields=parse_fields(vehicle_model), filters=filter_args(),
+                include=parse_include(model_for_table("vehicle"))
+            )
+            return vehicles, 200, pagination_headers(next_cursor)
+        except ValueError as e:
+            # Invalid limit, cursor, field, filter or sort column
+            vehicles_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while retrieving vehicles: {http_err}")
             raise http_err
@@ -65,6 +107,9 @@ class VehicleList(Resource):
             return create_vehicle(
                 data["brand"], data["client_id"], data["license_plate"], data["model"], data["year"]
             ), 201
+        except ValueError as e:
+            # Duplicate license plate or unknown client
+            vehicles_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while creating vehicle: {http_err}")
             raise http_err
@@ -73,6 +118,86 @@ class VehicleList(Resource):
             vehicles_ns.abort(500, "An error occurred while creating the vehicle.")
 
 
+@vehicles_ns.route('/bulk')
+class VehicleBulk(Resource):
+    """
+    Handles batch operations on vehicles.
+    Supports creating many vehicles in one transaction (POST), and updating (PATCH) or
+    deleting (DELETE) a selection of vehicles with a single statement.
+    """
+
+    @vehicles_ns.doc('create_vehicles_bulk', params=BULK_PARAMS)
+    @vehicles_ns.expect([vehicle_model])
+    @vehicles_ns.response(201, 'All vehicles created', vehicle_bulk_result_model)
+    @vehicles_ns.response(207, 'Some vehicles created, see errors', vehicle_bulk_result_model)
+    @vehicles_ns.response(400, 'No vehicle created')
+    def post(self):
+        """
+        Create many vehicles with a single multi-row INSERT.
+        :return: Generated ids in request order and per-row errors
+        """
+        try:
+            result = create_vehicles_bulk(bulk_payload(), atomic=atomic_arg())
+            return result, bulk_status(result)
+        except ValueError as e:
+            # The body is not a usable array of rows
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk creating vehicles: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk creating vehicles: {e}")
+            vehicles_ns.abort(500, "An error occurred while creating the vehicles.")
+
+    @vehicles_ns.doc('update_vehicles_bulk', params=BULK_CHANGE_PARAMS)
+    @vehicles_ns.expect(vehicle_bulk_change_request_model)
+    @vehicles_ns.marshal_with(vehicle_bulk_change_result_model)
+    @vehicles_ns.response(400, 'Invalid selection or values')
+    def patch(self):
+        """
+        Update every selected vehicle with a single UPDATE ... WHERE statement.
+        Vehicles are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of updated vehicles (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return update_vehicles_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            # Invalid selection, values or constraint violation
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk updating vehicles: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk updating vehicles: {e}")
+            vehicles_ns.abort(500, "An error occurred while updating the vehicles.")
+
+    @vehicles_ns.doc('delete_vehicles_bulk', params=BULK_CHANGE_PARAMS)
+    @vehicles_ns.expect(vehicle_bulk_change_request_model)
+    @vehicles_ns.marshal_with(vehicle_bulk_change_result_model)
+    @vehicles_ns.response(400, 'Invalid selection')
+    def delete(self):
+        """
+        Delete every selected vehicle with a single DELETE ... WHERE statement.
+        Vehicles are selected by the `ids` of the body and/or the filters of the query string.
+        :return: The number of deleted vehicles (and the rows, if `returning` is set)
+        """
+        try:
+            body = bulk_change_payload()
+            return delete_vehicles_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            # Invalid selection or constraint violation
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while bulk deleting vehicles: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error bulk deleting vehicles: {e}")
+            vehicles_ns.abort(500, "An error occurred while deleting the vehicles.")
+
+
 @vehicles_ns.route('/<int:vehicle_id>')
 @vehicles_ns.param('vehicle_id', 'The ID of the vehicle')
 class Vehicle(Resource):
@@ -81,7 +206,9 @@ class Vehicle(Resource):
     Supports retrieving (GET), updating (PUT), and deleting (DELETE) a vehicle.
     """
 
-    @vehicles_ns.doc('get_vehicle')
+    @vehicles_ns.doc('get_vehicle', params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("vehicle")
+    @includable(get_vehicle, Vehicle, vehicle_model)
     @vehicles_ns.marshal_with(vehicle_model)
     def get(self, vehicle_id):
         """
@@ -90,10 +217,13 @@ class Vehicle(Resource):
         :return: The vehicle details or 404 if not found
         """
         try:
-            vehicle = get_vehicle(vehicle_id)
+            vehicle = get_vehicle(vehicle_id, fields=parse_fields(vehicle_model))
             if not vehicle:
                 vehicles_ns.abort(404, f"Vehicle with ID {vehicle_id} not found.")
             return vehicle
+        except ValueError as e:
+            # Unknown field requested
+            vehicles_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while retrieving vehicle with ID {vehicle_id}: {http_err}")
             raise http_err
@@ -119,6 +249,9 @@ class Vehicle(Resource):
             if not vehicle:
                 vehicles_ns.abort(404, f"Vehicle with ID {vehicle_id} not found.")
             return vehicle
+        except ValueError as e:
+            # Duplicate license plate or unknown client
+            vehicles_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while updating vehicle with ID {vehicle_id}: {http_err}")
             raise http_err
@@ -126,22 +259,119 @@ class Vehicle(Resource):
             logger.error(f"Error updating vehicle with ID {vehicle_id}: {e}")
             vehicles_ns.abort(500, "An error occurred while updating the vehicle.")
 
+    @vehicles_ns.doc('patch_vehicle')
+    @vehicles_ns.expect(vehicle_model)
+    @vehicles_ns.marshal_with(vehicle_model)
+    def patch(self, vehicle_id):
+        """
+        Partially update a vehicle by ID, with a single UPDATE ... RETURNING.
+        Only the columns present in the payload are changed, falsy values such as 0 or "" included.
+        :param vehicle_id: The ID of the vehicle
+        :return: The updated vehicle details or 404 if not found
+        """
+        try:
+            vehicle = patch_vehicle(vehicle_id, vehicles_ns.payload)
+            if vehicle is None:
+                # Return a 404 error if the vehicle does not exist
+                vehicles_ns.abort(404, f"Vehicle with ID {vehicle_id} not found.")
+            return vehicle
+        except ValueError as e:
+            # Unknown column, invalid value or constraint violation
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while patching vehicle with ID {vehicle_id}: {http_err}")
+            raise http_err
+        except Exception as e:
+            # Log error and return a 500 status code
+            logger.error(f"Error patching vehicle with ID {vehicle_id}: {e}")
+            vehicles_ns.abort(500, "An error occurred while updating the vehicle.")
+
     @vehicles_ns.doc('delete_vehicle')
     @vehicles_ns.response(204, 'Vehicle successfully deleted')
     def delete(self, vehicle_id):
         """
-        Delete a vehicle by ID.
+        Delete a vehicle by ID, together with its works and their tasks.
         :param vehicle_id: The ID of the vehicle
         :return: HTTP 204 status code if deleted successfully or 404 if not found
         """
         try:
-            vehicle = delete_vehicle(vehicle_id)
-            if not vehicle:
+            deleted = delete_vehicle(vehicle_id)
+            if not deleted:
                 vehicles_ns.abort(404, f"Vehicle with ID {vehicle_id} not found.")
             return '', 204
+        except ValueError as e:
+            # A foreign key rule forbids the delete
+            vehicles_ns.abort(400, str(e))
         except HTTPException as http_err:
             logger.error(f"HTTP error while deleting vehicle with ID {vehicle_id}: {http_err}")
             raise http_err
         except Exception as e:
             logger.error(f"Error deleting vehicle with ID {vehicle_id}: {e}")
             vehicles_ns.abort(500, "An error occurred while deleting the vehicle.")
+
+
+@vehicles_ns.route('/plate/<string:license_plate>')
+@vehicles_ns.param('license_plate', 'The license plate, with or without spaces and dashes, in any case')
+class VehicleByPlate(Resource):
+    """
+    Handles the lookup of a vehicle by license plate.
+    """
+
+    @vehicles_ns.doc('get_vehicle_by_plate', params=FIELDS_PARAMS)
+    @conditional("vehicle")
+    @vehicles_ns.marshal_with(vehicle_model)
+    def get(self, license_plate):
+        """
+        Retrieve a vehicle by license plate, with one seek on the normalized plate index.
+        :param license_plate: The license plate of the vehicle
+        :return: The vehicle details or 404 if not found
+        """
+        try:
+            vehicle = get_vehicle_by_plate(license_plate, fields=parse_fields(vehicle_model))
+            if not vehicle:
+                vehicles_ns.abort(404, f"Vehicle with license plate {license_plate} not found.")
+            return vehicle
+        except ValueError as e:
+            # Unknown field requested
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while retrieving vehicle with plate {license_plate}: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error retrieving vehicle with plate {license_plate}: {e}")
+            vehicles_ns.abort(500, "An error occurred while retrieving the vehicle.")
+
+
+@vehicles_ns.route('/plate')
+class VehiclePlateSearch(Resource):
+    """
+    Handles the search of vehicles by partial license plate.
+    """
+
+    @vehicles_ns.doc('find_vehicles_by_plate_prefix', params={
+        "prefix": "Beginning of the license plate, with or without spaces and dashes, in any case",
+        "limit": "Maximum number of vehicles to return (capped by the server)",
+        **FIELDS_PARAMS,
+    })
+    @cached("vehicle")
+    @conditional("vehicle")
+    @vehicles_ns.marshal_list_with(vehicle_model)
+    def get(self):
+        """
+        Retrieve the vehicles whose license plate starts with the given characters, in plate order.
+        :return: A list of vehicles
+        """
+        try:
+            limit = request.args.get("limit")
+            return find_vehicles_by_plate_prefix(
+                request.args.get("prefix"), limit=int(limit) if limit else None, fields=parse_fields(vehicle_model)
+            )
+        except ValueError as e:
+            # Empty prefix, invalid limit or unknown field
+            vehicles_ns.abort(400, str(e))
+        except HTTPException as http_err:
+            logger.error(f"HTTP error while searching vehicles by plate: {http_err}")
+            raise http_err
+        except Exception as e:
+            logger.error(f"Error searching vehicles by plate: {e}")
+            vehicles_ns.abort(500, "An error occurred while searching the vehicles.")
@@ -3,13 +3,37 @@ from flask_restx import Namespace, Resource, fields
 from werkzeug.exceptions import HTTPException
 from services.work_service import (
     get_all_works,
+    iter_works,
     get_work,
     create_work,
+    create_works_bulk,
+    update_works_bulk,
+    delete_works_bulk,
     update_work,
+    patch_work,
     delete_work,
     update_work_status
 )
 from utils.utils import generate_swagger_model
+from utils.pagination import PAGINATION_PARAMS, pagination_args, pagination_headers
+from utils.streaming import STREAM_PARAMS, streamable
+from utils.fieldsets import FIELDS_PARAMS, parse_fields
+from utils.includes import INCLUDE_PARAMS, includable, model_for_table, parse_include
+from utils.filtering import filter_args
+from utils.conditional import conditional
+from utils.response_cache import cached
+from utils.bulk import (
+    BULK_CHANGE_PARAMS,
+    BULK_PARAMS,
+    atomic_arg,
+    bulk_change_payload,
+    bulk_change_request_model,
+    bulk_change_result_model,
+    bulk_payload,
+    bulk_result_model,
+    bulk_status,
+    returning_arg
+)
 from models.work import Work
 
 # Initialize logging
@@ -27,11 +51,27 @@ work_model = generate_swagger_model(
     readonly_fields=['work_id']
 )
 
+# Request and responses of the bulk endpoints
+work_bulk_result_model = bulk_result_model(works_ns)
+work_bulk_change_request_model = bulk_change_request_model(works_ns)
+work_bulk_change_result_model = bulk_change_result_model(works_ns, work_model)
+
 @works_ns.route('/')
 class WorkList(Resource):
-    @works_ns.marshal_list_with(work_model)
+    @works_ns.doc(params={**PAGINATION_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @cached("work")
+    @conditional("work")
+    @streamable(iter_works, work_model)
+    @works_ns.response(200, 'Success', [work_model])
     def get(self):
-        return get_all_works()
+        try:
+            works, next_cursor = get_all_works(
+                **pagination_args(), fields=parse_fields(work_model), filters=filter_args(),
+                include=parse_include(model_for_table("work"))
+            )
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+        return works, 200, pagination_headers(next_cursor)
 
     @works_ns.expect(work_model, validate=True)
     @works_ns.marshal_with(work_model, code=201)
@@ -42,11 +82,53 @@ class WorkList(Resource):
             data["start_date"], data["status"], data["vehicle_id"]
         ), 201
 
+@works_ns.route('/bulk')
+class WorkBulk(Resource):
+    @works_ns.doc(params=BULK_PARAMS)
+    @works_ns.expect([work_model])
+    @works_ns.response(201, 'All works created', work_bulk_result_model)
+    @works_ns.response(207, 'Some works created, see errors', work_bulk_result_model)
+    def post(self):
+        try:
+            result = create_works_bulk(bulk_payload(), atomic=atomic_arg())
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+        return result, bulk_status(result)
+
+    @works_ns.doc(params=BULK_CHANGE_PARAMS)
+    @works_ns.expect(work_bulk_change_request_model)
+    @works_ns.marshal_with(work_bulk_change_result_model)
+    def patch(self):
+        try:
+            body = bulk_change_payload()
+            return update_works_bulk(
+                body.get("values"), ids=body.get("ids"), filters=filter_args(), returning=returning_arg()
+            )
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+
+    @works_ns.doc(params=BULK_CHANGE_PARAMS)
+    @works_ns.expect(work_bulk_change_request_model)
+    @works_ns.marshal_with(work_bulk_change_result_model)
+    def delete(self):
+        try:
+            body = bulk_change_payload()
+            return delete_works_bulk(ids=body.get("ids"), filters=filter_args(), returning=returning_arg())
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+
 @works_ns.route('/<int:work_id>')
 class Work(Resource):
+    @works_ns.doc(params={**FIELDS_PARAMS, **INCLUDE_PARAMS})
+    @conditional("work")
+    @includable(get_work, Work, work_model)
     @works_ns.marshal_with(work_model)
     def get(self, work_id):
-        return get_work(work_id)
+        try:
+            fields = parse_fields(work_model)
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+        return get_work(work_id, fields=fields)
 
     @works_ns.expect(work_model, validate=True)
     @works_ns.marshal_with(work_model)
@@ -57,8 +139,26 @@ class Work(Resource):
             data.get("start_date"), data.get("status"), data.get("vehicle_id")
         )
 
+    @works_ns.doc(description="Update only the given columns, in one UPDATE ... RETURNING")
+    @works_ns.expect(work_model)
+    @works_ns.marshal_with(work_model)
+    def patch(self, work_id):
+        try:
+            work = patch_work(work_id, works_ns.payload)
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+        if work is None:
+            works_ns.abort(404, f"Work with ID {work_id} not found.")
+        return work
+
     def delete(self, work_id):
-        return delete_work(work_id), 204
+        try:
+            deleted = delete_work(work_id)
+        except ValueError as e:
+            works_ns.abort(400, str(e))
+        if not deleted:
+            works_ns.abort(404, f"Work with ID {work_id} not found.")
+        return '', 204
 
 @works_ns.route('/<int:work_id>/status')
 class UpdateWorkStatus(Resource):
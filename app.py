@@ -3,9 +3,13 @@ from sqlalchemy import false
 
 from api import api_bp  # Import the API blueprint
 from config import Config  # Import the configuration class
-from utils.database import db  # Import the SQLAlchemy database instance
+from utils.database import db, configure_engine, check_pragmas, READ_BIND  # Import the SQLAlchemy database instance
 from utils.utils import configure_logging  # Import the logging configuration function
 from errors.errors import register_error_handlers
+from migrations import upgrade
+from utils.cli import db_cli
+from services.setting_service import load_settings_cache
+from utils.json_provider import FastJSONProvider
 
 
 def create_app():
@@ -18,8 +22,23 @@ def create_app():
     try:
         app = Flask(__name__)
         app.config.from_object(Config)  # Load configuration from the Config class
+        app.json = FastJSONProvider(app)  # Encode responses with orjson when it is available
         register_error_handlers(app)  # Register error handlers for 404 and 500 errors
         db.init_app(app) # Initialize extensions (e.g., SQLAlchemy)
+        app.cli.add_command(db_cli)  # Register the `flask db ...` commands
+        with app.app_context():
+            # Install connection event handlers before the first connection
+            configure_engine(db.engine, app.config["SQLITE_PRAGMAS"])
+            check_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])  # Log the effective connection profile
+            if READ_BIND in db.engines:
+                # Reads of GET requests use their own pool, whose connections refuse to write
+                read_pragmas = {**app.config["SQLITE_PRAGMAS"], "query_only": "ON"}
+                configure_engine(db.engines[READ_BIND], read_pragmas)
+                check_pragmas(db.engines[READ_BIND], read_pragmas)
+            if app.config["SCHEMA_AUTO_UPGRADE"]:
+                # Bring the database schema up to date before serving requests
+                upgrade(db.engine)
+            load_settings_cache()  # Serve settings from memory from the first request on
         # Register blueprints (e.g., API routes)
         app.register_blueprint(api_bp)
         return app
@@ -0,0 +1,151 @@
+import logging
+import re
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import request
+
+from app import create_app  # Import the Flask application factory
+from api.client import client_model
+from api.employee import employee_model
+from api.vehicle import vehicle_model
+from api.work import work_model
+from api.task import task_model
+from api.invoice import invoice_model
+from api.invoice_item import invoice_item_model
+from api.setting import setting_model
+from models.client import Client
+from models.employee import Employee
+from models.vehicle import Vehicle
+from models.work import Work
+from models.task import Task
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.setting import Setting
+from services.async_read_service import get_page_async, get_row_async, get_table_version_async
+from utils.async_database import create_async_read_engine
+from utils.conditional import entity_tag, last_modified_header, not_modified, validator_headers
+from utils.fieldsets import apply_fields_mask, parse_fields
+from utils.filtering import filter_args
+from utils.pagination import pagination_args, pagination_headers
+from utils.streaming import wants_stream
+
+logger = logging.getLogger(__name__)
+
+# Resources whose list and detail endpoints are served asynchronously: URL segment -> (model, Swagger model).
+# The URL segment is also the name of the table, as used by the conditional GET headers.
+ASYNC_RESOURCES = {
+    "client": (Client, client_model),
+    "employee": (Employee, employee_model),
+    "vehicle": (Vehicle, vehicle_model),
+    "work": (Work, work_model),
+    "task": (Task, task_model),
+    "invoice": (Invoice, invoice_model),
+    "invoice_item": (InvoiceItem, invoice_item_model),
+    "setting": (Setting, setting_model),
+}
+
+# `/api/<resource>/` (list) and `/api/<resource>/<int:id>` (detail), as routed by the Flask app
+ASYNC_ROUTE = re.compile(r"^/api/(?P<resource>[a-z_]+)/(?P<row_id>\d+)?$")
+
+
+class AsyncReadApp:
+    """
+    ASGI application serving the read endpoints of the API with `AsyncSession`.
+
+    List and detail GETs of every resource are answered on the event loop, so a slow client
+    holds a coroutine rather than a worker thread. Their responses are the ones the Flask-RESTx
+    handlers produce: the request is parsed by the same helpers inside a Flask request context,
+    rows are read with the same statements and serialized by the same serializers.
+
+    Everything else is handed over to the Flask app, running in a thread: writes, the other
+    routes, NDJSON streams, reads embedding related rows (`?include=`), and any read the async path does not answer with a 200 or a 304
+    (invalid parameters, missing rows), so errors keep the exact shape of each resource.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        with flask_app.app_context():
+            self.engine, self.sessions = create_async_read_engine(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = ASYNC_ROUTE.match(scope["path"])
+            if match and match["resource"] in ASYNC_RESOURCES:
+                row_id = int(match["row_id"]) if match["row_id"] else None
+                response = await self._read(scope, match["resource"], row_id)
+                if response is not None:
+                    await self._send(send, *response)
+                    return
+
+        await self.wsgi(scope, receive, send)
+
+    async def _read(self, scope, name, row_id):
+        """
+        Answer a list (`row_id` None) or detail GET, or return None to let the Flask app answer it.
+
+        :return: tuple: Status code, headers and body of the response, or None
+        """
+        model, swagger_model = ASYNC_RESOURCES[name]
+        headers = [(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]]
+        with self.flask_app.test_request_context(
+            scope["path"], query_string=scope["query_string"].decode("latin-1"), headers=headers
+        ):
+            apply_fields_mask()
+            if wants_stream() or request.args.get("include"):
+                return None
+            try:
+                fields = parse_fields(swagger_model)
+                page_args = pagination_args() if row_id is None else None
+            except ValueError:
+                return None
+
+            try:
+                async with self.sessions() as session:
+                    version, updated_at = await get_table_version_async(session, name)
+                    updated_at = last_modified_header(updated_at)
+                    etag = entity_tag(name, version)
+                    response_headers = validator_headers(etag, updated_at)
+                    if not_modified(etag, updated_at):
+                        return 304, response_headers, b""
+
+                    if row_id is None:
+                        data, next_cursor = await get_page_async(
+                            session, model, **page_args, fields=fields, filters=filter_args()
+                        )
+                        response_headers.update(pagination_headers(next_cursor))
+                    else:
+                        data = await get_row_async(session, model, row_id, fields=fields)
+                        if data is None:
+                            return None
+            except ValueError:
+                # Invalid cursor, filter or sort column: the Flask handler reports it
+                return None
+
+            response_headers["Content-Type"] = "application/json"
+            return 200, response_headers, self.flask_app.json.dumps_bytes(data)
+
+    @staticmethod
+    async def _send(send, status, headers, body):
+        raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+# ASGI entry point, e.g. `uvicorn asgi:app`
+app = AsyncReadApp(create_app())
@@ -0,0 +1,126 @@
+"""
+Concurrency benchmark of the read endpoints, to compare the WSGI (Flask) and ASGI entry points.
+
+Opens `--connections` keep-alive connections to a running server at once and has each of
+them issue GET requests in a loop for `--duration` seconds, optionally pausing between requests
+to imitate slow mobile clients that hold their connection open. Prints the throughput, the
+latency percentiles and the number of failed or timed out requests.
+
+Start the server in one mode, run the benchmark, then repeat with the other mode:
+
+    gunicorn --threads 32 'app:create_app()'        # or: flask --app app run
+    uvicorn asgi:app                                # needs aiosqlite and asgiref
+
+    python -m benchmarks.concurrency --url http://127.0.0.1:8000/api/work/?limit=50 --connections 500
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+async def read_response(reader):
+    """
+    Read one HTTP/1.1 response and return its status code and whether the connection stays open.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by the server")
+    status = int(status_line.split()[1])
+    length, chunked, keep_alive = 0, False, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name.lower() == "connection" and "close" in value.lower():
+            keep_alive = False
+
+    if not chunked:
+        await reader.readexactly(length)
+        return status, keep_alive
+    while True:
+        chunk_size = int((await reader.readline()).split(b";")[0], 16)
+        await reader.readexactly(chunk_size + 2)
+        if chunk_size == 0:
+            return status, keep_alive
+
+
+async def request_once(reader, writer, request):
+    writer.write(request)
+    await writer.drain()
+    return await read_response(reader)
+
+
+async def client(url, deadline, think_time, timeout, latencies, failures):
+    """
+    One connection issuing requests until the deadline, recording the latency of each.
+    """
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n\r\n"
+    ).encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            started = time.perf_counter()
+            status, keep_alive = await asyncio.wait_for(request_once(reader, writer, request), timeout)
+            if status != 200:
+                failures.append(status)
+            else:
+                latencies.append(time.perf_counter() - started)
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            failures.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+        if think_time:
+            await asyncio.sleep(think_time)
+    if writer is not None:
+        writer.close()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+async def run(url, connections, duration, think_time, timeout):
+    latencies, failures = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[
+        client(url, deadline, think_time, timeout, latencies, failures) for _ in range(connections)
+    ])
+    latencies.sort()
+    print(f"{url} with {connections} connections for {duration:.0f}s (think time {think_time * 1000:.0f} ms)")
+    print(f"  requests:   {len(latencies)} ok, {len(failures)} failed")
+    for reason in sorted(set(map(str, failures))):
+        print(f"    {reason}: {sum(1 for failure in failures if str(failure) == reason)}")
+    print(f"  throughput: {len(latencies) / duration:10.1f} req/s")
+    for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        print(f"  {label}:        {percentile(latencies, fraction) * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/work/", help="Endpoint to request")
+    parser.add_argument("--connections", type=int, default=500, help="Concurrent connections")
+    parser.add_argument("--duration", type=float, default=30.0, help="Length of the run, in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Pause between two requests of a connection, in seconds (slow clients)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Time allowed for one request, in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.connections, args.duration, args.think_time, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
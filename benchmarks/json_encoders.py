@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of the JSON encoders behind `utils.json_provider.FastJSONProvider`.
+
+Encodes payloads shaped like the API's responses (a page of serialized works, a large
+invoice list, rows with native dates) with the standard library and with orjson, and
+prints the best time of several runs for each.
+
+Run from the project root:
+
+    python -m benchmarks.json_encoders [--rows 5000] [--repeat 5]
+"""
+import argparse
+import json
+import timeit
+from datetime import date, datetime, timedelta
+
+from flask import Flask
+
+from utils.json_provider import FastJSONProvider, orjson
+
+
+def work_rows(count):
+    """
+    Works as returned by the list endpoints (dates already in ISO 8601).
+    """
+    start = date(2024, 1, 1)
+    return [
+        {
+            "work_id": i,
+            "cost": round(50 + i * 1.37, 2),
+            "created_at": f"{start + timedelta(days=i % 365)}T09:30:00",
+            "description": f"Revisão geral n.º {i}: troca de óleo, filtros e pastilhas de travão",
+            "end_date": None if i % 3 else str(start + timedelta(days=i % 365 + 2)),
+            "start_date": str(start + timedelta(days=i % 365)),
+            "status": ("pending", "in_progress", "completed")[i % 3],
+            "vehicle_id": i % 500 + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def invoice_rows(count):
+    """
+    Invoices with native datetime values, which the encoders must convert themselves.
+    """
+    issued = datetime(2024, 1, 1, 10, 0)
+    return [
+        {
+            "invoice_id": i,
+            "client_id": i % 800 + 1,
+            "issued_at": issued + timedelta(hours=i),
+            "total": round(100 + i * 2.5, 2),
+            "iva": round((100 + i * 2.5) * 0.23, 2),
+            "total_with_iva": round((100 + i * 2.5) * 1.23, 2),
+        }
+        for i in range(count)
+    ]
+
+
+def provider(use_orjson, compact=True):
+    app = Flask(__name__)
+    app.config.update(JSON_USE_ORJSON=use_orjson, JSON_COMPACT=compact)
+    return FastJSONProvider(app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    payloads = {
+        "works (serialized)": work_rows(args.rows),
+        "invoices (datetimes)": invoice_rows(args.rows),
+        "single work": work_rows(1)[0],
+    }
+    encoders = {
+        "json (restx default)": lambda obj: json.dumps(obj, default=str).encode(),
+        "stdlib provider": provider(use_orjson=False).dumps_bytes,
+    }
+    if orjson is not None:
+        encoders["orjson provider"] = provider(use_orjson=True).dumps_bytes
+    else:
+        print("orjson is not installed: only the standard library encoders are measured.\n")
+
+    for name, payload in payloads.items():
+        number = 1 if isinstance(payload, list) else 10000
+        print(f"{name}:")
+        baseline = None
+        for encoder_name, encode in encoders.items():
+            best = min(timeit.repeat(lambda: encode(payload), number=number, repeat=args.repeat)) / number
+            baseline = baseline or best
+            size = len(encode(payload))
+            print(f"  {encoder_name:<22} {best * 1e3:9.3f} ms  {size:>9} bytes  x{baseline / best:.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
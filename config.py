@@ -6,4 +6,55 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URI")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Read-only engine serving the reads of GET requests: a replica file, or by default a second
+    # connection pool on the primary database whose connections run with `query_only=ON`.
+    # READ_POOL=false sends everything to the primary engine.
+    READ_DATABASE_URI = os.getenv("READ_DATABASE_URI") or SQLALCHEMY_DATABASE_URI
+    READ_POOL = os.getenv("READ_POOL", "true").lower() == "true"
+    SQLALCHEMY_BINDS = {"read": READ_DATABASE_URI} if READ_POOL and READ_DATABASE_URI else {}
+
+    # Connection profile applied to every SQLite connection (see `utils.database.configure_engine`);
+    # an empty value leaves SQLite's default. cache_size < 0 is in KiB (-65536 = 64 MiB).
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),
+        "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+    }
+
+    # JSON encoding: orjson is used when installed (unless disabled), and compact output
+    # drops whitespace and keeps key order; set JSON_COMPACT=false for indented, sorted output
+    JSON_USE_ORJSON = os.getenv("JSON_USE_ORJSON", "true").lower() == "true"
+    JSON_COMPACT = os.getenv("JSON_COMPACT", "true").lower() == "true"
+
+    # Page size used by list endpoints when no `limit` is given, and the hard cap for `limit`
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 50))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 500))
+
+    # Rows fetched per round trip when a list endpoint streams NDJSON (`?stream=1`)
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 1000))
+
+    # Maximum number of rows accepted by a single `POST /api/<resource>/bulk` request
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 1000))
+
+    # Memory budget of the in-process cache of list responses, in bytes (0 disables it). Each worker
+    # keeps its own cache, but entries are checked against the table_version rows on every request,
+    # so a write from another worker or from outside the API is seen at once.
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+    # Seconds a report result is reused before being recomputed (0 disables the cache)
+    REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 60))
+
+    # Maximum number of operations accepted by a single `POST /api/batch` request
+    BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", 100))
+
+    # Apply pending schema migrations (see `migrations/`) when the application starts
+    SCHEMA_AUTO_UPGRADE = os.getenv("SCHEMA_AUTO_UPGRADE", "true").lower() == "true"
+
+    # Tables small enough for `flask db audit-queries` to accept a full scan on them
+    QUERY_AUDIT_SMALL_TABLES = os.getenv("QUERY_AUDIT_SMALL_TABLES", "setting,employee").split(",")
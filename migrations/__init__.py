@@ -0,0 +1,58 @@
+"""
+Versioned schema migrations.
+
+Each `vNNN_*.py` module in this package defines `VERSION`, `DESCRIPTION` and
+`upgrade(connection)`. The version of a database is kept in SQLite's `PRAGMA user_version`,
+so every migration runs exactly once per database file, in version order.
+"""
+import importlib
+import logging
+import pkgutil
+
+logger = logging.getLogger(__name__)
+
+
+def load_migrations():
+    """
+    Import every migration module of this package.
+
+    :return: List of migration modules sorted by VERSION
+    """
+    modules = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("v")
+    ]
+    return sorted(modules, key=lambda module: module.VERSION)
+
+
+def current_version(connection):
+    """
+    Return the schema version recorded in the database.
+    """
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def upgrade(engine):
+    """
+    Apply every migration newer than the database's schema version.
+
+    Each migration runs in its own transaction together with the version bump, so a
+    failing migration leaves the database at the previous version.
+
+    :param engine: SQLAlchemy engine of the database to upgrade
+    :return: List of versions that were applied
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    applied = []
+    for migration in load_migrations():
+        if migration.VERSION <= version:
+            continue
+        with engine.begin() as connection:
+            logger.info(f"Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+            migration.upgrade(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {int(migration.VERSION)}")
+        applied.append(migration.VERSION)
+    return applied
@@ -0,0 +1,28 @@
+"""
+Index every foreign key column plus the columns lists are most often filtered on.
+
+Without these, per-parent lookups (e.g. the tasks of a work) and the foreign key checks
+SQLite runs when a parent row is deleted are full table scans.
+"""
+
+VERSION = 1
+DESCRIPTION = "Add foreign key and hot column indexes"
+
+# (index name, table, column); names match what `index=True` generates on the models
+INDEXES = [
+    ("ix_vehicle_client_id", "vehicle", "client_id"),
+    ("ix_work_vehicle_id", "work", "vehicle_id"),
+    ("ix_work_status", "work", "status"),
+    ("ix_task_work_id", "task", "work_id"),
+    ("ix_task_employee_id", "task", "employee_id"),
+    ("ix_task_status", "task", "status"),
+    ("ix_invoice_client_id", "invoice", "client_id"),
+    ("ix_invoice_issued_at", "invoice", "issued_at"),
+    ("ix_invoice_item_invoice_id", "invoice_item", "invoice_id"),
+    ("ix_invoice_item_task_id", "invoice_item", "task_id"),
+]
+
+
+def upgrade(connection):
+    for name, table, column in INDEXES:
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
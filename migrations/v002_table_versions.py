@@ -0,0 +1,29 @@
+"""
+Keep a version counter per table, bumped by triggers on every insert, update and delete.
+
+The counters back the ETag and Last-Modified headers of the GET endpoints: reading one
+small row tells whether anything in a table changed, whichever process or endpoint wrote it.
+"""
+
+VERSION = 2
+DESCRIPTION = "Add per-table version markers"
+
+# Tables served by the API, whose changes must be visible to conditional GETs
+TABLES = ["client", "employee", "vehicle", "work", "task", "invoice", "invoice_item", "setting"]
+
+
+def upgrade(connection):
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS table_version ("
+        " table_name VARCHAR(100) PRIMARY KEY,"
+        " version INTEGER NOT NULL DEFAULT 0,"
+        " updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    for table in TABLES:
+        connection.exec_driver_sql(f"INSERT OR IGNORE INTO table_version (table_name) VALUES ('{table}')")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} AFTER {event} ON {table} "
+                f"BEGIN UPDATE table_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP "
+                f"WHERE table_name = '{table}'; END"
+            )
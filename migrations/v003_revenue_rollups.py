@@ -0,0 +1,84 @@
+"""
+Keep monthly revenue rollups, per client and overall, up to date with triggers on invoice.
+
+Every insert adds the invoice to the rows of its client and month, every delete subtracts
+it, and an update touching the client, the issue date or an amount does both. Triggers see
+every write, whichever path made it (single-row or bulk endpoints, batches, generated invoices,
+cascading deletes of a client), so the rollups never need the invoice table to be rescanned.
+`flask db rebuild-revenue` recomputes them from scratch and reports any drift.
+"""
+
+VERSION = 3
+DESCRIPTION = "Add monthly revenue rollups"
+
+# Rollup tables and the columns identifying one of their rows, besides the month
+ROLLUPS = {
+    "revenue_client_month": ["client_id"],
+    "revenue_month": [],
+}
+
+AMOUNTS = ["total", "iva", "total_with_iva"]
+
+
+def _add(table, keys, row):
+    """
+    Trigger statement adding invoice `row` (NEW or OLD) to a rollup.
+    """
+    columns = [*keys, "year_month", "invoice_count", *AMOUNTS]
+    values = [*(f"{row}.{key}" for key in keys), f"strftime('%Y-%m', {row}.issued_at)", "1",
+              *(f"{row}.{amount}" for amount in AMOUNTS)]
+    updates = ["invoice_count = invoice_count + 1", *(f"{amount} = {amount} + excluded.{amount}" for amount in AMOUNTS)]
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+        f"ON CONFLICT ({', '.join([*keys, 'year_month'])}) DO UPDATE SET {', '.join(updates)};"
+    )
+
+
+def _subtract(table, keys, row):
+    """
+    Trigger statements removing invoice `row` from a rollup, dropping rows left empty.
+    """
+    where = " AND ".join([*(f"{key} = {row}.{key}" for key in keys), f"year_month = strftime('%Y-%m', {row}.issued_at)"])
+    updates = ["invoice_count = invoice_count - 1", *(f"{amount} = {amount} - {row}.{amount}" for amount in AMOUNTS)]
+    return (
+        f"UPDATE {table} SET {', '.join(updates)} WHERE {where}; "
+        f"DELETE FROM {table} WHERE {where} AND invoice_count <= 0;"
+    )
+
+
+def upgrade(connection):
+    amounts = ", ".join(f"{amount} REAL NOT NULL DEFAULT 0" for amount in AMOUNTS)
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS revenue_client_month ("
+        f" client_id INTEGER NOT NULL, year_month VARCHAR(7) NOT NULL,"
+        f" invoice_count INTEGER NOT NULL DEFAULT 0, {amounts},"
+        f" PRIMARY KEY (client_id, year_month))"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_revenue_client_month_year_month ON revenue_client_month (year_month)"
+    )
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS revenue_month ("
+        f" year_month VARCHAR(7) PRIMARY KEY,"
+        f" invoice_count INTEGER NOT NULL DEFAULT 0, {amounts})"
+    )
+
+    added = " ".join(_add(table, keys, "NEW") for table, keys in ROLLUPS.items())
+    subtracted = " ".join(_subtract(table, keys, "OLD") for table, keys in ROLLUPS.items())
+    watched = ", ".join(["client_id", "issued_at", *AMOUNTS])
+    connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS trg_invoice_revenue_insert AFTER INSERT ON invoice BEGIN {added} END")
+    connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS trg_invoice_revenue_delete AFTER DELETE ON invoice BEGIN {subtracted} END")
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS trg_invoice_revenue_update AFTER UPDATE OF {watched} ON invoice "
+        f"BEGIN {subtracted} {added} END"
+    )
+
+    # Backfill from the existing invoices
+    for table, keys in ROLLUPS.items():
+        group = ", ".join([*keys, "strftime('%Y-%m', issued_at)"])
+        sums = ", ".join(f"SUM({amount})" for amount in AMOUNTS)
+        connection.exec_driver_sql(f"DELETE FROM {table}")
+        connection.exec_driver_sql(
+            f"INSERT INTO {table} ({', '.join([*keys, 'year_month', 'invoice_count', *AMOUNTS])}) "
+            f"SELECT {group}, COUNT(*), {sums} FROM invoice GROUP BY {group}"
+        )
@@ -0,0 +1,64 @@
+"""
+Index the searchable text of clients, vehicles, works and tasks with SQLite FTS5.
+
+Each table gets an external-content FTS5 table (`search_<table>`) whose rowid is the row's
+primary key, so the text is not stored twice and a hit joins back with a rowid lookup.
+Triggers apply every insert, delete and update of an indexed column to the index, whichever
+path made the write (single-row or bulk endpoints, batches, cascading deletes).
+`flask db rebuild-search` reindexes everything from the tables.
+"""
+
+VERSION = 4
+DESCRIPTION = "Add full-text search indexes"
+
+# Indexed tables: table -> (primary key, indexed columns)
+SEARCH_TABLES = {
+    "client": ("client_id", ["name", "email", "phone"]),
+    "vehicle": ("vehicle_id", ["brand", "model", "license_plate"]),
+    "work": ("work_id", ["description"]),
+    "task": ("task_id", ["description"]),
+}
+
+# Accents are folded ("oleo" finds "óleo") and 2- and 3-character prefixes are indexed for prefix queries
+TOKENIZE = "unicode61 remove_diacritics 2"
+PREFIX = "2 3"
+
+
+def _insert(index, key, columns, row):
+    """
+    Trigger statement adding row `row` (NEW or OLD) to an index.
+    """
+    return (
+        f"INSERT INTO {index} (rowid, {', '.join(columns)}) "
+        f"VALUES ({row}.{key}, {', '.join(f'{row}.{column}' for column in columns)});"
+    )
+
+
+def _delete(index, key, columns, row):
+    """
+    Trigger statement removing row `row` from an index; external-content tables need the old values.
+    """
+    return (
+        f"INSERT INTO {index} ({index}, rowid, {', '.join(columns)}) "
+        f"VALUES ('delete', {row}.{key}, {', '.join(f'{row}.{column}' for column in columns)});"
+    )
+
+
+def upgrade(connection):
+    for table, (key, columns) in SEARCH_TABLES.items():
+        index = f"search_{table}"
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{', '.join(columns)}, content='{table}', content_rowid='{key}', "
+            f"tokenize='{TOKENIZE}', prefix='{PREFIX}')"
+        )
+        added, removed = _insert(index, key, columns, "NEW"), _delete(index, key, columns, "OLD")
+        connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table} BEGIN {added} END")
+        connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table} BEGIN {removed} END")
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update AFTER UPDATE OF {', '.join([key, *columns])} ON {table} "
+            f"BEGIN {removed} {added} END"
+        )
+
+        # Backfill from the existing rows
+        connection.exec_driver_sql(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
@@ -0,0 +1,28 @@
+"""
+Add `vehicle.plate_key`, the license plate normalized for lookups, with a unique index.
+
+The key is the plate in upper case without spaces or dashes ("aa-12 bc" -> "AA12BC"), so a
+plate typed at the counter finds its vehicle with an index seek however it was registered.
+The services fill it on every write; this migration backfills the existing rows.
+"""
+
+VERSION = 5
+DESCRIPTION = "Add the normalized license plate key of vehicles"
+
+# Same normalization as `services.vehicle_service.normalize_plate`
+PLATE_KEY = "UPPER(REPLACE(REPLACE(license_plate, ' ', ''), '-', ''))"
+
+
+def upgrade(connection):
+    columns = [row[1] for row in connection.exec_driver_sql("PRAGMA table_info(vehicle)")]
+    if "plate_key" not in columns:
+        connection.exec_driver_sql("ALTER TABLE vehicle ADD COLUMN plate_key VARCHAR(20)")
+    connection.exec_driver_sql(f"UPDATE vehicle SET plate_key = {PLATE_KEY}")
+
+    duplicates = connection.exec_driver_sql(
+        "SELECT plate_key, GROUP_CONCAT(vehicle_id) FROM vehicle GROUP BY plate_key HAVING COUNT(*) > 1"
+    ).all()
+    if duplicates:
+        listed = "; ".join(f"{key} (vehicles {ids})" for key, ids in duplicates)
+        raise RuntimeError(f"Several vehicles share a license plate, merge or correct them first: {listed}")
+    connection.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_vehicle_plate_key ON vehicle (plate_key)")
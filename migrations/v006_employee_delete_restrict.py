@@ -0,0 +1,19 @@
+"""
+Refuse to delete an employee who still has tasks (ON DELETE RESTRICT on `task.employee_id`).
+
+The table was created with `ON DELETE SET NULL` on a NOT NULL column, so the delete already
+failed, but only with a NOT NULL error on `task`. SQLite cannot change the clause without
+rebuilding `task`, and dropping the old table with foreign keys enforced would cascade to its
+invoice items. A BEFORE DELETE trigger enforces the declared rule instead, with a clear message.
+"""
+
+VERSION = 6
+DESCRIPTION = "Restrict deleting employees with tasks"
+
+
+def upgrade(connection):
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS trg_employee_delete_restrict BEFORE DELETE ON employee "
+        "WHEN EXISTS (SELECT 1 FROM task WHERE employee_id = OLD.employee_id) "
+        "BEGIN SELECT RAISE(ABORT, 'The employee still has tasks; reassign or delete them first.'); END"
+    )
@@ -0,0 +1,30 @@
+"""
+Index the columns the list endpoints are sorted by.
+
+A keyset page sorted by a column is one index seek when an index leads with that column (SQLite
+appends the rowid, the primary key here, to every index entry, so it also orders the ties), and a
+full scan plus a temporary B-tree sort per page otherwise. `parse_sort` only accepts the primary
+key and the leading column of an index, so every accepted sort order is backed by one of these.
+"""
+
+VERSION = 7
+DESCRIPTION = "Add indexes on the sortable columns"
+
+# (index name, table, column); names match what `index=True` generates on the models
+INDEXES = [
+    ("ix_client_name", "client", "name"),
+    ("ix_client_created_at", "client", "created_at"),
+    ("ix_employee_name", "employee", "name"),
+    ("ix_employee_hired_date", "employee", "hired_date"),
+    ("ix_employee_created_at", "employee", "created_at"),
+    ("ix_vehicle_created_at", "vehicle", "created_at"),
+    ("ix_work_start_date", "work", "start_date"),
+    ("ix_work_created_at", "work", "created_at"),
+    ("ix_task_start_date", "task", "start_date"),
+    ("ix_task_created_at", "task", "created_at"),
+]
+
+
+def upgrade(connection):
+    for name, table, column in INDEXES:
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
@@ -0,0 +1,14 @@
+"""
+Index the end date of works, which bounds the window of the turnaround report.
+
+With the report's date range compared against the stored column rather than `date(column)`,
+SQLite can seek `ix_work_end_date` for the works finished in the window instead of scanning
+every work.
+"""
+
+VERSION = 8
+DESCRIPTION = "Add an index on the end date of works"
+
+
+def upgrade(connection):
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_work_end_date ON work (end_date)")
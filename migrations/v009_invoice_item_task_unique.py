@@ -0,0 +1,21 @@
+"""
+Make `invoice_item.task_id` unique, so a task can only be billed once.
+
+`create_invoice_from_work` checks that none of the work's tasks has been invoiced before
+inserting the items, but two requests could both pass that check; the unique index makes the
+second insert fail instead. It replaces the plain index added by v001 under the same name.
+"""
+
+VERSION = 9
+DESCRIPTION = "Make the task of invoice items unique"
+
+
+def upgrade(connection):
+    duplicates = connection.exec_driver_sql(
+        "SELECT task_id, GROUP_CONCAT(item_id) FROM invoice_item GROUP BY task_id HAVING COUNT(*) > 1"
+    ).all()
+    if duplicates:
+        listed = "; ".join(f"task {task_id} (items {ids})" for task_id, ids in duplicates)
+        raise RuntimeError(f"Several invoice items bill the same task, remove the extra ones first: {listed}")
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_invoice_item_task_id")
+    connection.exec_driver_sql("CREATE UNIQUE INDEX ix_invoice_item_task_id ON invoice_item (task_id)")
@@ -13,15 +13,21 @@ class Client(db.Model):
         phone (str): The phone number of the client. Cannot be null.
         address (str): The address of the client. Cannot be null.
         created_at (datetime): Timestamp when the client was created. Defaults to the current time.
+        vehicles (list[Vehicle]): Vehicles owned by the client.
+        invoices (list[Invoice]): Invoices issued to the client.
     """
 
     # Define columns for the table
     client_id = db.Column(db.Integer, primary_key=True)  # Unique identifier for each client
-    name = db.Column(db.String(80), unique=True, nullable=False)  # Client name, must be unique
+    name = db.Column(db.String(80), unique=True, nullable=False, index=True)  # Client name, must be unique
     email = db.Column(db.String(200), nullable=False)  # Client email
     phone = db.Column(db.String(20), nullable=False)  # Client phone number
     address = db.Column(db.String(200), nullable=False)  # Client address
-    created_at = db.Column(db.DateTime, server_default=db.func.now())  # Auto-generated timestamp
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)  # Auto-generated timestamp
+
+    # Related rows, loaded on demand or eagerly with `?include=` (the database deletes them with the client)
+    vehicles = db.relationship('Vehicle', back_populates='client', passive_deletes=True)
+    invoices = db.relationship('Invoice', back_populates='client', passive_deletes=True)
 
     def __repr__(self):
         """
@@ -13,21 +13,25 @@ class Employee(db.Model):
         role (str): Role of the employee (e.g., 'mechanic', 'manager'). Default is 'mechanic'.
         hired_date (date): Date when the employee was hired.
         created_at (datetime): Timestamp indicating when the record was created. Auto-generated by the database.
+        tasks (list[Task]): Tasks assigned to the employee.
     """
     # Primary key column
     employee_id = db.Column(db.Integer, primary_key=True)
 
     # Employee details
-    name = db.Column(db.String(80), nullable=False)  # Employee name (mandatory)
+    name = db.Column(db.String(80), nullable=False, index=True)  # Employee name (mandatory)
     email = db.Column(db.String(200), unique=True, nullable=False)  # Unique email address (mandatory)
     phone = db.Column(db.String(20))  # Phone number (optional)
 
     # Role and employment information
     role = db.Column(db.String(20), nullable=False, default='mechanic')  # Role with a default value of 'mechanic'
-    hired_date = db.Column(db.Date, nullable=False)  # Mandatory hire date
+    hired_date = db.Column(db.Date, nullable=False, index=True)  # Mandatory hire date
 
     # Audit information
-    created_at = db.Column(db.DateTime, server_default=db.func.now())  # Timestamp for when the record was created
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)  # Timestamp for when the record was created
+
+    # Tasks assigned to the employee
+    tasks = db.relationship('Task', back_populates='employee', passive_deletes='all')
 
     def __repr__(self):
         """
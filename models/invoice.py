@@ -12,15 +12,20 @@ class Invoice(db.Model):
         iva (float): Value-added tax applied to the total.
         total_with_iva (float): Total amount including VAT (IVA).
         created_at (datetime): Timestamp when the invoice record was created.
+        client (Client): The client the invoice is issued to.
+        items (list[InvoiceItem]): Items of the invoice.
     """
     __tablename__ = 'invoice'
 
     invoice_id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('client.client_id'), nullable=False)
-    issued_at = db.Column(db.DateTime, nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.client_id', ondelete='CASCADE'), nullable=False, index=True)
+    issued_at = db.Column(db.DateTime, nullable=False, index=True)
     total = db.Column(db.Float, nullable=False)
     iva = db.Column(db.Float, nullable=False)
     total_with_iva = db.Column(db.Float, nullable=False)
 
+    client = db.relationship('Client', back_populates='invoices')
+    items = db.relationship('InvoiceItem', back_populates='invoice', passive_deletes=True)
+
     def __repr__(self):
         return f"<Invoice {self.invoice_id} for Client {self.client_id}>"
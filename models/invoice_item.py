@@ -8,16 +8,21 @@ class InvoiceItem(db.Model):
         item_id (int): Primary key for the invoice_item table.
         description (str): Description of the item.
         cost (float): Cost of the item.
-        task_id (int): Foreign key linking the item to a task.
+        task_id (int): Foreign key linking the item to a task; a task is billed at most once.
         invoice_id (int): Foreign key linking the item to an invoice.
+        invoice (Invoice): The invoice the item belongs to.
+        task (Task): The task the item bills.
     """
     __tablename__ = 'invoice_item'
 
     item_id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.Text, nullable=False)
     cost = db.Column(db.Float, nullable=False)
-    task_id = db.Column(db.Integer, db.ForeignKey('task.task_id'), nullable=False)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.invoice_id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.task_id', ondelete='CASCADE'), nullable=False, index=True, unique=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.invoice_id', ondelete='CASCADE'), nullable=False, index=True)
+
+    invoice = db.relationship('Invoice', back_populates='items')
+    task = db.relationship('Task', back_populates='invoice_items')
 
     def __repr__(self):
         return f"<InvoiceItem {self.description}>"
\ No newline at end of file
@@ -0,0 +1,25 @@
+from utils.database import db
+
+class RevenueClientMonth(db.Model):
+    """
+    Invoiced revenue per client and calendar month, maintained by triggers on the invoice table.
+
+    Attributes:
+        client_id (int): Client the invoices were issued to, part of the primary key.
+        year_month (str): Month the invoices were issued in ('YYYY-MM'), part of the primary key.
+        invoice_count (int): Number of invoices issued to the client in the month.
+        total (float): Sum of the invoice totals before VAT (IVA).
+        iva (float): Sum of the VAT of the invoices.
+        total_with_iva (float): Sum of the invoice totals including VAT.
+    """
+    __tablename__ = 'revenue_client_month'
+
+    client_id = db.Column(db.Integer, primary_key=True)
+    year_month = db.Column(db.String(7), primary_key=True, index=True)
+    invoice_count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+    iva = db.Column(db.Float, nullable=False, default=0)
+    total_with_iva = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RevenueClientMonth {self.client_id} {self.year_month}>"
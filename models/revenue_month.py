@@ -0,0 +1,23 @@
+from utils.database import db
+
+class RevenueMonth(db.Model):
+    """
+    Invoiced revenue per calendar month, maintained by triggers on the invoice table.
+
+    Attributes:
+        year_month (str): Month the invoices were issued in ('YYYY-MM'), primary key.
+        invoice_count (int): Number of invoices issued in the month.
+        total (float): Sum of the invoice totals before VAT (IVA).
+        iva (float): Sum of the VAT of the invoices.
+        total_with_iva (float): Sum of the invoice totals including VAT.
+    """
+    __tablename__ = 'revenue_month'
+
+    year_month = db.Column(db.String(7), primary_key=True)
+    invoice_count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+    iva = db.Column(db.Float, nullable=False, default=0)
+    total_with_iva = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RevenueMonth {self.year_month}>"
@@ -13,17 +13,24 @@ class Task(db.Model):
         end_date (date): End date of the task.
         status (str): Status of the task (e.g., pending, in progress, completed).
         created_at (datetime): Timestamp when the task record was created.
+        work (Work): The work the task belongs to.
+        employee (Employee): The employee assigned to the task.
+        invoice_items (list[InvoiceItem]): Invoice items billing the task.
     """
     __tablename__ = 'task'
 
     task_id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.Text, nullable=False)
-    employee_id = db.Column(db.Integer, db.ForeignKey('employee.employee_id'), nullable=False)
-    work_id = db.Column(db.Integer, db.ForeignKey('work.work_id'), nullable=False)
-    start_date = db.Column(db.Date, nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.employee_id', ondelete='RESTRICT'), nullable=False, index=True)
+    work_id = db.Column(db.Integer, db.ForeignKey('work.work_id', ondelete='CASCADE'), nullable=False, index=True)
+    start_date = db.Column(db.Date, nullable=False, index=True)
     end_date = db.Column(db.Date, nullable=True)
-    status = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    status = db.Column(db.String(50), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
+
+    work = db.relationship('Work', back_populates='tasks')
+    employee = db.relationship('Employee', back_populates='tasks')
+    invoice_items = db.relationship('InvoiceItem', back_populates='task', passive_deletes=True)
 
     def __repr__(self):
         return f"<Task {self.description}>"
@@ -12,19 +12,26 @@ class Vehicle(db.Model):
         client_id (int): The ID of the client associated with the vehicle. Cannot be null.
         created_at (datetime): Timestamp when the vehicle was created. Defaults to the current time.
         license_plate (str): The license plate of the vehicle. Cannot be null.
+        plate_key (str): The license plate in upper case without spaces or dashes, unique. Derived from license_plate.
         model (str): The model of the vehicle. Cannot be null.
         year (int): The year of the vehicle. Cannot be null.        
+        client (Client): Owner of the vehicle.
+        works (list[Work]): Works done on the vehicle.
     """
 
     # Define columns for the table
     vehicle_id = db.Column(db.Integer, primary_key=True)
     brand = db.Column(db.String(80), nullable=False)
-    client_id = db.Column(db.Integer, db.ForeignKey('client.client_id'), nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    client_id = db.Column(db.Integer, db.ForeignKey('client.client_id', ondelete='CASCADE'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
     license_plate = db.Column(db.String(20), nullable=False)
+    plate_key = db.Column(db.String(20), nullable=False, unique=True, index=True)
     model = db.Column(db.String(80), nullable=False)
     year = db.Column(db.Integer, nullable=False)
 
+    client = db.relationship('Client', back_populates='vehicles')
+    works = db.relationship('Work', back_populates='vehicle', passive_deletes=True)
+
     def __repr__(self):
         """
         String representation of the Vehicle object.
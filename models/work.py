@@ -13,17 +13,22 @@ class Work(db.Model):
         start_date (date): Start date of the work.
         status (str): The status of the work (e.g., pending, in progress, completed).
         vehicle_id (int): Foreign key linking the work to a vehicle.
+        vehicle (Vehicle): The vehicle the work is done on.
+        tasks (list[Task]): Tasks the work is made of.
     """
     __tablename__ = 'work'
 
     work_id = db.Column(db.Integer, primary_key=True)
     cost = db.Column(db.Float, nullable=True)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
     description = db.Column(db.Text, nullable=False)
-    end_date = db.Column(db.Date, nullable=True)
-    start_date = db.Column(db.Date, nullable=False)
-    status = db.Column(db.String(50), nullable=False)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.vehicle_id'), nullable=False)
+    end_date = db.Column(db.Date, nullable=True, index=True)
+    start_date = db.Column(db.Date, nullable=False, index=True)
+    status = db.Column(db.String(50), nullable=False, index=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicle.vehicle_id', ondelete='CASCADE'), nullable=False, index=True)
+
+    vehicle = db.relationship('Vehicle', back_populates='works')
+    tasks = db.relationship('Task', back_populates='work', passive_deletes=True)
 
     def __repr__(self):
         return f"<Work {self.description}>"
@@ -0,0 +1,60 @@
+import logging
+from utils.pagination import paginate_async
+from utils.fieldsets import column_select
+from utils.serializers import serializer_for
+from utils.filtering import compile_filters
+from utils.conditional import table_version_statement, version_from_row
+
+logger = logging.getLogger(__name__)
+
+async def get_page_async(session, model, limit=None, after=None, sort=None, fields=None, filters=None):
+    """
+    Retrieve one page of any resource on an AsyncSession.
+    Mirrors the `get_all_*` services: same filters, keyset pagination and serialized rows.
+    :param session: The AsyncSession to read with.
+    :param model: SQLAlchemy model class of the resource.
+    :param limit: Maximum number of rows to return (capped by the server).
+    :param after: Cursor of the previous page.
+    :param sort: Column to sort by, prefixed with '-' for descending order.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: tuple: A list of dictionaries and the next page cursor.
+    """
+    try:
+        where = compile_filters(model, filters)
+        serializer = serializer_for(model, fields)
+        statement = column_select(model, serializer.names).where(*where)
+        rows, next_cursor = await paginate_async(session, statement, model, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
+    except Exception as e:
+        logger.error(f"Error fetching all rows of {model.__tablename__}: {e}")
+        raise  # Let the ASGI layer hand the request over to the Flask app
+
+async def get_row_async(session, model, row_id, fields=None):
+    """
+    Retrieve one row of any resource by primary key on an AsyncSession.
+    :param session: The AsyncSession to read with.
+    :param model: SQLAlchemy model class of the resource.
+    :param row_id: The primary key of the row.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :return: dict: The serialized row, or None if not found.
+    """
+    try:
+        serializer = serializer_for(model, fields)
+        pk = model.__table__.primary_key.columns.values()[0]
+        row = (await session.execute(column_select(model, serializer.names).where(pk == row_id))).first()
+        return serializer(row) if row else None
+    except Exception as e:
+        logger.error(f"Error fetching {model.__tablename__} {row_id}: {e}")
+        raise  # Let the ASGI layer hand the request over to the Flask app
+
+async def get_table_version_async(session, name):
+    """
+    Read the version marker of a table on an AsyncSession.
+    :param session: The AsyncSession to read with.
+    :param name: Name of the table.
+    :return: tuple: The version counter and the (UTC) time of the last write to the table.
+    """
+    return version_from_row((await session.execute(table_version_statement(name))).one())
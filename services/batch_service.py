@@ -0,0 +1,135 @@
+from flask import current_app
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from utils.database import db
+from utils.bulk import prepare_changes, prepare_row
+from models.client import Client
+from models.employee import Employee
+from models.vehicle import Vehicle
+from models.work import Work
+from models.task import Task
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.setting import Setting
+from services.invoice_service import total_with_iva_expression, with_total_with_iva
+from services.vehicle_service import plate_key_change, with_plate_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resources a batch can write to, named like their API paths, with the model and the
+# optional create/update hooks their bulk endpoints use
+BATCH_RESOURCES = {
+    "client": (Client, None, None),
+    "employee": (Employee, None, None),
+    "vehicle": (Vehicle, with_plate_key, plate_key_change),
+    "work": (Work, None, None),
+    "task": (Task, None, None),
+    "invoice": (Invoice, with_total_with_iva, total_with_iva_expression),
+    "invoice_item": (InvoiceItem, None, None),
+    "setting": (Setting, None, None),
+}
+
+BATCH_OPERATIONS = ("create", "update", "delete")
+
+
+class BatchOperationError(ValueError):
+    """
+    Raised when an operation of a batch cannot be applied; the whole batch is rolled back.
+
+    Attributes:
+        index (int): Position of the failing operation in the request.
+    """
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+
+def _resolve(value, refs):
+    """
+    Replace a `{"$ref": name}` placeholder by the id created under that name earlier in the batch.
+    """
+    if isinstance(value, dict) and set(value) == {"$ref"}:
+        if value["$ref"] not in refs:
+            raise ValueError(f"Unknown reference '{value['$ref']}'.")
+        return refs[value["$ref"]]
+    return value
+
+
+def _apply(operation, refs):
+    """
+    Run one operation of a batch in the current transaction.
+    :param operation: The operation as received in the request.
+    :param refs: Ids created so far, by reference name.
+    :return: A dictionary describing the outcome of the operation.
+    """
+    if not isinstance(operation, dict):
+        raise ValueError("Each operation must be a JSON object.")
+    op, resource = operation.get("op"), operation.get("resource")
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Unknown operation '{op}', expected one of: {', '.join(BATCH_OPERATIONS)}.")
+    if resource not in BATCH_RESOURCES:
+        raise ValueError(f"Unknown resource '{resource}'.")
+
+    model, prepare_create, prepare_update = BATCH_RESOURCES[resource]
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0]
+    data = operation.get("data") or {}
+    if not isinstance(data, dict):
+        raise ValueError("'data' must be a JSON object.")
+    data = {name: _resolve(value, refs) for name, value in data.items()}
+
+    if op == "create":
+        ref = operation.get("ref")
+        if ref is not None and (not isinstance(ref, str) or ref in refs):
+            raise ValueError("'ref' must be a name not used earlier in the batch.")
+        values = prepare_row(model, data, prepare_create)
+        row_id = db.session.execute(insert(table).returning(pk), values).scalar_one()
+        if ref is not None:
+            refs[ref] = row_id
+        return {"op": op, "resource": resource, "id": row_id, "ref": ref}
+
+    row_id = _resolve(operation.get("id"), refs)
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("'id' must be an integer or a reference.")
+    if op == "update":
+        statement = update(table).where(pk == row_id).values(prepare_changes(model, data, prepare_update, field="data"))
+    else:
+        statement = delete(table).where(pk == row_id)
+    if db.session.execute(statement).rowcount == 0:
+        raise ValueError(f"{model.__name__} {row_id} not found.")
+    return {"op": op, "resource": resource, "id": row_id, "ref": None}
+
+
+def run_batch(operations):
+    """
+    Apply an ordered list of create/update/delete operations in a single transaction.
+
+    A create may be named with `ref`, and later operations may use `{"$ref": name}` in place
+    of the id it produced (e.g. as the `client_id` of a new vehicle). Nothing is committed
+    unless every operation succeeds.
+    :param operations: The list of operations as received in the request.
+    :return: A list with the outcome of each operation, in request order.
+    :raises BatchOperationError: If an operation fails; its index tells which one.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("The request body must be a non-empty JSON array of operations.")
+    limit = current_app.config["BATCH_MAX_OPERATIONS"]
+    if len(operations) > limit:
+        raise ValueError(f"A batch cannot contain more than {limit} operations.")
+
+    refs, results = {}, []
+    try:
+        for index, operation in enumerate(operations):
+            try:
+                results.append(_apply(operation, refs))
+            except IntegrityError as e:
+                raise BatchOperationError(index, f"Operation {index}: {e.orig}")
+            except ValueError as e:
+                raise BatchOperationError(index, f"Operation {index}: {e}")
+        db.session.commit()
+        return results
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error running batch: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
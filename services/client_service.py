@@ -1,53 +1,143 @@
 import logging
+from sqlalchemy import exists
 from utils.database import db
 from models.client import Client
+from models.vehicle import Vehicle
+from models.work import Work
+from models.task import Task
+from models.invoice import Invoice
+from utils.pagination import encode_cursor, paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
+from utils.date_range import date_range_clauses
 
 logger = logging.getLogger(__name__)
 
-def get_all_clients():
+def get_all_clients(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     """
-    Retrieve all clients.
-    :return: list: A list of dictionaries containing information about all clients.
+    Retrieve one page of clients.
+    :param limit: Maximum number of clients to return (capped by the server).
+    :param after: Cursor of the previous page.
+    :param sort: Column to sort by, prefixed with '-' for descending order.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :param include: Optional relationships to embed, as returned by `parse_include`.
+    :return: tuple: A list of dictionaries containing client information and the next page cursor.
     """
     try:
-        clients = Client.query.all()  # Retrieve all clients from the database
-        return [
-            {
-                "client_id": client.client_id,
-                "name": client.name,
-                "email": client.email,
-                "phone": client.phone,
-                "address": client.address,
-                "created_at": client.created_at,
-            }
-            for client in clients
-        ]
+        where = compile_filters(Client, filters)
+        serializer = serializer_for(Client, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Client).filter(*where)
+            rows, next_cursor = paginate(query, Client, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Client, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Client, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all clients: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def iter_clients(fields=None, filters=None):
+    """
+    Stream every client row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per client, that never holds the whole table in memory.
+    """
+    return stream_rows(Client, fields=fields, filters=filters)
 
-def get_client(client_id):
+def get_client(client_id, fields=None, include=None):
     """
     Retrieve a client by ID.
     :param client_id: The ID of the client to retrieve.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param include: Optional relationships to embed, as returned by `parse_include`.
     :return: dict: A dictionary containing the client's information or an error message.
     """
     try:
-        client = Client.query.get(client_id)
-        if not client:
-            return None
-        return {
-            "client_id": client.client_id,
-            "name": client.name,
-            "email": client.email,
-            "phone": client.phone,
-            "address": client.address,
-            "created_at": client.created_at,
-        }
+        serializer = serializer_for(Client, fields)
+        if include:
+            instance = include_query(Client).filter(Client.client_id == client_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Client, serializer.names).filter(Client.client_id == client_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching client {client_id}: {e}")
         return {"error": "Internal Server Error"}
 
+def _rows(model, *where, order_by=()):
+    """
+    Read every row of `model` matching `where`, serialized.
+    """
+    query = column_query(model, serializer_for(model).names).filter(*where).order_by(*order_by)
+    return serializer_for(model).many(query.all())
+
+def _group(rows, key):
+    """
+    Group serialized rows by the value of their `key` column.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[key], []).append(row)
+    return groups
+
+def get_client_history(client_id, start=None, end=None):
+    """
+    Retrieve a client with their vehicles, the works on each vehicle, the tasks of each work and their invoices.
+
+    Each level is read with one query filtering the foreign key column with an IN list of the
+    parent ids, so the number of queries stays the same however many vehicles or works there are.
+    :param client_id: The ID of the client.
+    :param start: Optional first day of the window ('YYYY-MM-DD'), on the works' start date and the invoices' issue date.
+    :param end: Optional last day of the window ('YYYY-MM-DD').
+    :return: dict: The client's information with its `vehicles` and `invoices`, or None if the client does not exist.
+    :raises ValueError: If a date is not in the YYYY-MM-DD format.
+    """
+    try:
+        work_window = date_range_clauses(Work.start_date, start, end)
+        invoice_window = date_range_clauses(Invoice.issued_at, start, end)
+
+        row = column_query(Client, serializer_for(Client).names).filter(Client.client_id == client_id).first()
+        if row is None:
+            return None
+        history = serializer_for(Client)(row)
+
+        vehicles = _rows(Vehicle, Vehicle.client_id == client_id, order_by=[Vehicle.vehicle_id])
+        vehicle_ids = [vehicle["vehicle_id"] for vehicle in vehicles]
+        works = _rows(
+            Work, Work.vehicle_id.in_(vehicle_ids), *work_window,
+            order_by=[Work.start_date.desc(), Work.work_id.desc()]
+        ) if vehicle_ids else []
+        work_ids = [work["work_id"] for work in works]
+        tasks = _rows(Task, Task.work_id.in_(work_ids), order_by=[Task.task_id]) if work_ids else []
+
+        tasks_by_work = _group(tasks, "work_id")
+        for work in works:
+            work["tasks"] = tasks_by_work.get(work["work_id"], [])
+        works_by_vehicle = _group(works, "vehicle_id")
+        for vehicle in vehicles:
+            vehicle["works"] = works_by_vehicle.get(vehicle["vehicle_id"], [])
+
+        history["vehicles"] = vehicles
+        history["invoices"] = _rows(
+            Invoice, Invoice.client_id == client_id, *invoice_window,
+            order_by=[Invoice.issued_at.desc(), Invoice.invoice_id.desc()]
+        )
+        return history
+    except Exception as e:
+        logger.error(f"Error fetching the history of client {client_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def create_client(name, email, phone, address, commit=True):
     """
     Create a new client.
@@ -69,14 +159,7 @@ def create_client(name, email, phone, address, commit=True):
             db.session.commit()
 
         # Return the client details
-        return {
-            "client_id": client.client_id,
-            "name": client.name,
-            "email": client.email,
-            "phone": client.phone,
-            "address": client.address,
-            "created_at": client.created_at,
-        }
+        return serializer_for(Client).from_object(client)
     except Exception as e:
         # Rollback the transaction only if `commit` is True
         if commit:
@@ -86,6 +169,62 @@ def create_client(name, email, phone, address, commit=True):
 
 
 
+def create_clients_bulk(rows, atomic=False):
+    """
+    Create many clients in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one client.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Client, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating clients: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_clients_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected client with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of client ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the clients.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated clients and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Client, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating clients: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_clients_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected client with a single DELETE ... WHERE statement.
+    :param ids: Optional list of client ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the clients.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted clients and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Client, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting clients: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_client(client_id, values):
+    """
+    Partially update a client with a single UPDATE ... RETURNING statement.
+    :param client_id: The ID of the client to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated client's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Client, client_id, values)
+    except Exception as e:
+        logger.error(f"Error patching client {client_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_client(client_id, name, email, phone, address):
     """
     Update an existing client.
@@ -112,34 +251,45 @@ def update_client(client_id, name, email, phone, address):
         # Commit the changes to the database
         db.session.commit()
         # Return updated client information
-        return {
-            "client_id": client.client_id,
-            "name": client.name,
-            "email": client.email,
-            "phone": client.phone,
-            "address": client.address,
-            "created_at": client.created_at,
-        }
+        return serializer_for(Client).from_object(client)
     except Exception as e:
         # If an error occurs, rollback the transaction
         db.session.rollback()
         logger.error(f"Error updating client {client_id}: {e}")
         return {"error": "Internal Server Error"}
-def delete_client(client_id):
+def delete_client(client_id, cascade=False):
     """
-    Delete a client.
+    Delete a client with a single DELETE ... WHERE statement.
+
+    Its vehicles (with their works, tasks and invoice items) and invoices would go with it
+    (ON DELETE CASCADE), so unless `cascade` is set the statement only matches a client
+    that has neither, and a client that does is left untouched.
     :param client_id: The ID of the client to delete.
-    :return: tuple: A message confirming deletion or an error message and the HTTP status code.
+    :param cascade: If True, delete the client's whole subtree in the same transaction.
+    :return: True if the client was deleted, False if not found.
+    :raises ValueError: If the client has vehicles or invoices and `cascade` is not set.
     """
     try:
-        client = Client.query.get(client_id)
-        if not client:
-            return None
-        # Delete the client
-        db.session.delete(client)
-        # Commit the deletion
-        db.session.commit()
-        return client
+        conditions = () if cascade else (
+            ~exists().where(Vehicle.client_id == Client.client_id),
+            ~exists().where(Invoice.client_id == Client.client_id),
+        )
+        if delete_row(Client, client_id, *conditions):
+            return True
+        # Tell a missing client from a protected one only when nothing was deleted
+        if not cascade and db.session.query(exists().where(Client.client_id == client_id)).scalar():
+            raise ValueError(
+                f"Client {client_id} has vehicles or invoices; set cascade=true to delete them with the client."
+            )
+        return False
     except Exception as e:
         logger.error(f"Error deleting client {client_id}: {e}")
-        return {"error": "Internal Server Error"}
\ No newline at end of file
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("client_service.get_client", lambda: get_client(1))
+register_query("client_service.clients_page_after_cursor", lambda: get_all_clients(after=encode_cursor(None, [1])))
+register_query("client_service.clients_newest_first_after_cursor", lambda: get_all_clients(sort="-created_at", after=encode_cursor("-created_at", ["2025-01-01 00:00:00", 1])))
+register_query("client_service.clients_by_name_after_cursor", lambda: get_all_clients(sort="name", after=encode_cursor("name", ["M", 1])))
+register_query("client_service.get_client_history", lambda: get_client_history(1, "2025-01-01", "2025-12-31"))
@@ -1,43 +1,71 @@
 import logging
 from models.employee import Employee
+from utils.pagination import paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 from utils.database import db
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-def get_all_employees():
+def get_all_employees(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     """
-    Retrieve all employees.
-    :return: dict: A list of dictionaries containing employee information.
+    Retrieve one page of employees.
+    :param limit: Maximum number of employees to return (capped by the server).
+    :param after: Cursor of the previous page.
+    :param sort: Column to sort by, prefixed with '-' for descending order.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :param include: Optional relationships to embed, as returned by `parse_include`.
+    :return: tuple: A list of dictionaries containing employee information and the next page cursor.
     """
     try:
-        employees = Employee.query.all()
-        return [{"employee_id": employee.employee_id, "name": employee.name, "email": employee.email, "phone": employee.phone, "role": employee.role, "hired_date": employee.hired_date, "created_at": employee.created_at} for employee in employees]
+        where = compile_filters(Employee, filters)
+        serializer = serializer_for(Employee, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Employee).filter(*where)
+            rows, next_cursor = paginate(query, Employee, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Employee, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Employee, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all employees: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def iter_employees(fields=None, filters=None):
+    """
+    Stream every employee row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per employee, that never holds the whole table in memory.
+    """
+    return stream_rows(Employee, fields=fields, filters=filters)
 
-def get_employee(employee_id):
+def get_employee(employee_id, fields=None, include=None):
     """
     Retrieve an employee by ID.
     :param employee_id: The ID of the employee to retrieve.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param include: Optional relationships to embed, as returned by `parse_include`.
     :return: dict: A dictionary containing the employee's information or None if not found.
     """
     try:
-        # Query the database for the employee by ID
-        employee = Employee.query.get(employee_id)
-        if not employee:
-            return None  # Return None if the employee is not found
-        # Return employee data as a dictionary
-        return {
-            "employee_id": employee.employee_id,
-            "name": employee.name,
-            "email": employee.email,
-            "phone": employee.phone,
-            "role": employee.role,
-            "hired_date": employee.hired_date,
-            "created_at": employee.created_at,
-        }
+        serializer = serializer_for(Employee, fields)
+        if include:
+            instance = include_query(Employee).filter(Employee.employee_id == employee_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Employee, serializer.names).filter(Employee.employee_id == employee_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching employee {employee_id}: {e}")
         raise  # Raise the exception to let the API layer handle it
@@ -58,7 +86,7 @@ def create_employee(name, email, phone, role, hired_date):
         employee = Employee(name=name, email=email, phone=phone, role=role, hired_date=hired_date_obj)
         db.session.add(employee)  # Save the new employee to the database
         db.session.commit()
-        return {"employee_id": employee.employee_id, "name": employee.name, "email": employee.email, "phone": employee.phone, "role": employee.role, "hired_date": employee.hired_date, "created_at": employee.created_at}
+        return serializer_for(Employee).from_object(employee)
     except Exception as e:
         logger.error(f"Error creating employee: {e}")
         return {"error": "Internal Server Error"}
@@ -67,6 +95,62 @@ def create_employee(name, email, phone, role, hired_date):
 from datetime import datetime
 
 
+def create_employees_bulk(rows, atomic=False):
+    """
+    Create many employees in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one employee.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Employee, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating employees: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_employees_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected employee with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of employee ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the employees.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated employees and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Employee, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating employees: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_employees_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected employee with a single DELETE ... WHERE statement.
+    :param ids: Optional list of employee ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the employees.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted employees and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Employee, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting employees: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_employee(employee_id, values):
+    """
+    Partially update an employee with a single UPDATE ... RETURNING statement.
+    :param employee_id: The ID of the employee to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated employee's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Employee, employee_id, values)
+    except Exception as e:
+        logger.error(f"Error patching employee {employee_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_employee(employee_id, name, email, phone, role, hired_date):
     """
     Update an existing employee.
@@ -96,15 +180,7 @@ def update_employee(employee_id, name, email, phone, role, hired_date):
 
         db.session.commit()  # Commit the transaction
 
-        return {
-            "employee_id": employee.employee_id,
-            "name": employee.name,
-            "email": employee.email,
-            "phone": employee.phone,
-            "role": employee.role,
-            "hired_date": employee.hired_date,
-            "created_at": employee.created_at,
-        }
+        return serializer_for(Employee).from_object(employee)
 
     except Exception as e:
         db.session.rollback()  # Rollback on error
@@ -113,17 +189,18 @@ def update_employee(employee_id, name, email, phone, role, hired_date):
 
 def delete_employee(employee_id):
     """
-    Delete an employee.
+    Delete an employee with a single DELETE ... WHERE statement.
+    Employees who still have tasks are kept (ON DELETE RESTRICT).
     :param employee_id: The ID of the employee to delete.
-    :return: dict: A dictionary containing the deleted employee's information.
+    :return: True if the employee was deleted, False if not found.
+    :raises ValueError: If a foreign key rule forbids the delete.
     """
     try:
-        employee = Employee.query.get(employee_id)
-        if not employee:
-            return None
-        employee.delete()  # Delete the employee from the database
-        return employee
+        return delete_row(Employee, employee_id)
     except Exception as e:
         logger.error(f"Error deleting employee {employee_id}: {e}")
-        return {"error": "Internal Server Error"}, 500
+        raise  # Let the API layer turn the failure into an HTTP error
+
 
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("employee_service.get_employee", lambda: get_employee(1))
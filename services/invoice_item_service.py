@@ -1,38 +1,53 @@
 from utils.database import db
 from models.invoice_item import InvoiceItem
+from utils.pagination import paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_invoice_items():
+def get_all_invoice_items(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     try:
-        items = InvoiceItem.query.all()
-        return [
-            {
-                "item_id": item.item_id,
-                "description": item.description,
-                "cost": item.cost,
-                "task_id": item.task_id,
-                "invoice_id": item.invoice_id,
-            }
-            for item in items
-        ]
+        where = compile_filters(InvoiceItem, filters)
+        serializer = serializer_for(InvoiceItem, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(InvoiceItem).filter(*where)
+            rows, next_cursor = paginate(query, InvoiceItem, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(InvoiceItem, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, InvoiceItem, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all invoice items: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def iter_invoice_items(fields=None, filters=None):
+    """
+    Stream every invoice item row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per invoice item, that never holds the whole table in memory.
+    """
+    return stream_rows(InvoiceItem, fields=fields, filters=filters)
 
-def get_invoice_item(item_id):
+def get_invoice_item(item_id, fields=None, include=None):
     try:
-        item = InvoiceItem.query.get(item_id)
-        if not item:
-            return None
-        return {
-            "item_id": item.item_id,
-            "description": item.description,
-            "cost": item.cost,
-            "task_id": item.task_id,
-            "invoice_id": item.invoice_id,
-        }
+        serializer = serializer_for(InvoiceItem, fields)
+        if include:
+            instance = include_query(InvoiceItem).filter(InvoiceItem.item_id == item_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(InvoiceItem, serializer.names).filter(InvoiceItem.item_id == item_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching invoice item {item_id}: {e}")
         return {"error": "Internal Server Error"}
@@ -47,17 +62,67 @@ def create_invoice_item(description, cost, task_id, invoice_id):
         )
         db.session.add(item)
         db.session.commit()
-        return {
-            "item_id": item.item_id,
-            "description": item.description,
-            "cost": item.cost,
-            "task_id": item.task_id,
-            "invoice_id": item.invoice_id,
-        }
+        return serializer_for(InvoiceItem).from_object(item)
     except Exception as e:
         logger.error(f"Error creating invoice item: {e}")
         return {"error": "Internal Server Error"}
 
+def create_invoice_items_bulk(rows, atomic=False):
+    """
+    Create many invoice items in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one invoice item.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(InvoiceItem, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating invoice items: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_invoice_items_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected invoice item with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of invoice item ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the invoice items.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated invoice items and, if requested, the rows.
+    """
+    try:
+        return bulk_update(InvoiceItem, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating invoice items: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_invoice_items_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected invoice item with a single DELETE ... WHERE statement.
+    :param ids: Optional list of invoice item ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the invoice items.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted invoice items and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(InvoiceItem, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting invoice items: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_invoice_item(item_id, values):
+    """
+    Partially update an invoice item with a single UPDATE ... RETURNING statement.
+    :param item_id: The ID of the invoice item to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated invoice item's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(InvoiceItem, item_id, values)
+    except Exception as e:
+        logger.error(f"Error patching invoice item {item_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_invoice_item(item_id, description=None, cost=None, task_id=None, invoice_id=None):
     try:
         item = InvoiceItem.query.get(item_id)
@@ -70,27 +135,26 @@ def update_invoice_item(item_id, description=None, cost=None, task_id=None, invo
         item.invoice_id = invoice_id if invoice_id else item.invoice_id
 
         db.session.commit()
-        return {
-            "item_id": item.item_id,
-            "description": item.description,
-            "cost": item.cost,
-            "task_id": item.task_id,
-            "invoice_id": item.invoice_id,
-        }
+        return serializer_for(InvoiceItem).from_object(item)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating invoice item {item_id}: {e}")
         return {"error": "Internal Server Error"}
 
 def delete_invoice_item(item_id):
+    """
+    Delete an invoice item with a single DELETE ... WHERE statement.
+    :param item_id: The ID of the invoice item to delete.
+    :return: True if the invoice item was deleted, False if not found.
+    """
     try:
-        item = InvoiceItem.query.get(item_id)
-        if not item:
-            return None
-
-        db.session.delete(item)
-        db.session.commit()
-        return {"message": f"Invoice item {item_id} deleted successfully"}
+        return delete_row(InvoiceItem, item_id)
     except Exception as e:
         logger.error(f"Error deleting invoice item {item_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("invoice_item_service.get_invoice_item", lambda: get_invoice_item(1))
+register_query("invoice_item_service.items_by_invoice", lambda: get_all_invoice_items(filters={"invoice_id": "1"}))
+register_query("invoice_item_service.items_by_task", lambda: get_all_invoice_items(filters={"task_id": "1"}))
@@ -1,41 +1,64 @@
 from datetime import datetime
+from sqlalchemy import and_, case, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from utils.database import db
 from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.task import Task
+from models.vehicle import Vehicle
+from models.work import Work
+from services.setting_service import get_setting_value
+from utils.pagination import encode_cursor, paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_invoices():
+# Setting holding the VAT rate applied to generated invoices (e.g. "0,23" or "23")
+IVA_SETTING = "iva"
+
+def get_all_invoices(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     try:
-        invoices = Invoice.query.all()
-        return [
-            {
-                "invoice_id": invoice.invoice_id,
-                "client_id": invoice.client_id,
-                "issued_at": invoice.issued_at,
-                "total": invoice.total,
-                "iva": invoice.iva,
-                "total_with_iva": invoice.total_with_iva,
-            }
-            for invoice in invoices
-        ]
+        where = compile_filters(Invoice, filters)
+        serializer = serializer_for(Invoice, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Invoice).filter(*where)
+            rows, next_cursor = paginate(query, Invoice, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Invoice, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Invoice, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all invoices: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def iter_invoices(fields=None, filters=None):
+    """
+    Stream every invoice row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per invoice, that never holds the whole table in memory.
+    """
+    return stream_rows(Invoice, fields=fields, filters=filters)
 
-def get_invoice(invoice_id):
+def get_invoice(invoice_id, fields=None, include=None):
     try:
-        invoice = Invoice.query.get(invoice_id)
-        if not invoice:
-            return None
-        return {
-            "invoice_id": invoice.invoice_id,
-            "client_id": invoice.client_id,
-            "issued_at": invoice.issued_at,
-            "total": invoice.total,
-            "iva": invoice.iva,
-            "total_with_iva": invoice.total_with_iva,
-        }
+        serializer = serializer_for(Invoice, fields)
+        if include:
+            instance = include_query(Invoice).filter(Invoice.invoice_id == invoice_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Invoice, serializer.names).filter(Invoice.invoice_id == invoice_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching invoice {invoice_id}: {e}")
         return {"error": "Internal Server Error"}
@@ -54,18 +77,177 @@ def create_invoice(client_id, issued_at, total, iva):
         )
         db.session.add(invoice)
         db.session.commit()
-        return {
-            "invoice_id": invoice.invoice_id,
-            "client_id": invoice.client_id,
-            "issued_at": invoice.issued_at,
-            "total": invoice.total,
-            "iva": invoice.iva,
-            "total_with_iva": invoice.total_with_iva,
-        }
+        return serializer_for(Invoice).from_object(invoice)
     except Exception as e:
         logger.error(f"Error creating invoice: {e}")
         return {"error": "Internal Server Error"}
 
+def iva_rate():
+    """
+    Read the VAT rate from the settings cache.
+    :return: The rate as a fraction (0.23 for 23%).
+    :raises ValueError: If the setting is missing or not a number.
+    """
+    value = get_setting_value(IVA_SETTING)
+    if value is None:
+        raise ValueError(f"The '{IVA_SETTING}' setting is not configured.")
+    try:
+        rate = float(str(value).replace(",", "."))
+    except ValueError:
+        raise ValueError(f"Invalid '{IVA_SETTING}' setting '{value}'.")
+    # Accept percentages as well as fractions
+    return rate / 100 if rate >= 1 else rate
+
+def create_invoice_from_work(work_id, issued_at=None):
+    """
+    Generate the invoice of a work, with one item per billable (not cancelled) task.
+    The work's cost is split evenly across its tasks, the last item absorbing the rounding,
+    and the VAT comes from the configured rate. Everything runs in one transaction and in a
+    fixed number of statements, however many tasks the work has: one aggregate SELECT, the
+    invoice INSERT and a single INSERT ... SELECT for all the items.
+    :param work_id: The ID of the work to invoice.
+    :param issued_at: Optional issue date ("%Y-%m-%d"), defaults to now.
+    :return: A dictionary with the invoice's fields and its `items`, or None if the work does not exist.
+    :raises ValueError: If the work cannot be invoiced (no cost, no billable task, already invoiced).
+    """
+    try:
+        rate = iva_rate()
+        issued_at_obj = datetime.strptime(issued_at, "%Y-%m-%d") if issued_at else datetime.now()
+        billable = and_(Task.work_id == work_id, Task.status != "cancelled")
+
+        summary = db.session.execute(
+            select(
+                Work.cost,
+                Vehicle.client_id,
+                func.count(Task.task_id.distinct()).label("tasks"),
+                func.count(InvoiceItem.item_id).label("invoiced"),
+            )
+            .join(Vehicle, Vehicle.vehicle_id == Work.vehicle_id)
+            .outerjoin(Task, and_(Task.work_id == Work.work_id, billable))
+            .outerjoin(InvoiceItem, InvoiceItem.task_id == Task.task_id)
+            .where(Work.work_id == work_id)
+            .group_by(Work.work_id)
+        ).first()
+        if summary is None:
+            return None
+        if summary.cost is None:
+            raise ValueError(f"Work {work_id} has no cost to invoice.")
+        if not summary.tasks:
+            raise ValueError(f"Work {work_id} has no billable tasks.")
+        if summary.invoiced:
+            raise ValueError(f"Work {work_id} has already been invoiced.")
+
+        total = round(summary.cost, 2)
+        iva = round(total * rate, 2)
+        invoice = db.session.execute(
+            insert(Invoice)
+            .values(client_id=summary.client_id, issued_at=issued_at_obj, total=total, iva=iva,
+                    total_with_iva=round(total + iva, 2))
+            .returning(*Invoice.__table__.columns)
+        ).one()
+
+        share = round(total / summary.tasks, 2)
+        last_share = round(total - share * (summary.tasks - 1), 2)
+        position = func.row_number().over(order_by=Task.task_id)
+        try:
+            items = db.session.execute(
+                insert(InvoiceItem)
+                .from_select(
+                    ["invoice_id", "task_id", "description", "cost"],
+                    select(
+                        literal(invoice.invoice_id),
+                        Task.task_id,
+                        Task.description,
+                        case((position == summary.tasks, last_share), else_=share),
+                    ).where(billable),
+                )
+                .returning(*InvoiceItem.__table__.columns)
+            ).all()
+        except IntegrityError:
+            # Another request billed one of the tasks since the check above (ix_invoice_item_task_id)
+            raise ValueError(f"Work {work_id} has already been invoiced.")
+        db.session.commit()
+
+        result = serializer_for(Invoice)(invoice)
+        result["items"] = serializer_for(InvoiceItem).many(sorted(items, key=lambda item: item.item_id))
+        return result
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating invoice from work {work_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def with_total_with_iva(values):
+    """
+    Derive `total_with_iva` for a bulk-inserted invoice, as `create_invoice` does.
+    """
+    if values.get("total") is not None and values.get("iva") is not None:
+        values["total_with_iva"] = values["total"] + values["iva"]
+    return values
+
+def create_invoices_bulk(rows, atomic=False):
+    """
+    Create many invoices in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one invoice.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Invoice, rows, atomic=atomic, prepare=with_total_with_iva)
+    except Exception as e:
+        logger.error(f"Error bulk creating invoices: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def total_with_iva_expression(changes):
+    """
+    Keep `total_with_iva` in step when a bulk update changes `total` or `iva`.
+    """
+    if "total" in changes or "iva" in changes:
+        changes["total_with_iva"] = changes.get("total", Invoice.total) + changes.get("iva", Invoice.iva)
+    return changes
+
+def update_invoices_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected invoice with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of invoice ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the invoices.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated invoices and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Invoice, values, ids=ids, filters=filters, returning=returning, prepare=total_with_iva_expression)
+    except Exception as e:
+        logger.error(f"Error bulk updating invoices: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_invoices_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected invoice with a single DELETE ... WHERE statement.
+    :param ids: Optional list of invoice ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the invoices.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted invoices and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Invoice, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting invoices: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_invoice(invoice_id, values):
+    """
+    Partially update an invoice with a single UPDATE ... RETURNING statement.
+    :param invoice_id: The ID of the invoice to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated invoice's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Invoice, invoice_id, values, prepare=total_with_iva_expression)
+    except Exception as e:
+        logger.error(f"Error patching invoice {invoice_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_invoice(invoice_id, client_id=None, issued_at=None, total=None, iva=None):
     try:
         invoice = Invoice.query.get(invoice_id)
@@ -79,28 +261,28 @@ def update_invoice(invoice_id, client_id=None, issued_at=None, total=None, iva=N
         invoice.total_with_iva = invoice.total + invoice.iva
 
         db.session.commit()
-        return {
-            "invoice_id": invoice.invoice_id,
-            "client_id": invoice.client_id,
-            "issued_at": invoice.issued_at,
-            "total": invoice.total,
-            "iva": invoice.iva,
-            "total_with_iva": invoice.total_with_iva,
-        }
+        return serializer_for(Invoice).from_object(invoice)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating invoice {invoice_id}: {e}")
         return {"error": "Internal Server Error"}
 
 def delete_invoice(invoice_id):
+    """
+    Delete an invoice with a single DELETE ... WHERE statement.
+    Its items are deleted with it (ON DELETE CASCADE).
+    :param invoice_id: The ID of the invoice to delete.
+    :return: True if the invoice was deleted, False if not found.
+    :raises ValueError: If a foreign key rule forbids the delete.
+    """
     try:
-        invoice = Invoice.query.get(invoice_id)
-        if not invoice:
-            return None
-
-        db.session.delete(invoice)
-        db.session.commit()
-        return {"message": f"Invoice {invoice_id} deleted successfully"}
+        return delete_row(Invoice, invoice_id)
     except Exception as e:
         logger.error(f"Error deleting invoice {invoice_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("invoice_service.get_invoice", lambda: get_invoice(1))
+register_query("invoice_service.invoices_by_client", lambda: get_all_invoices(filters={"client_id": "1"}))
+register_query("invoice_service.invoices_newest_first_after_cursor", lambda: get_all_invoices(sort="-issued_at", after=encode_cursor("-issued_at", ["2025-01-01 00:00:00", 1])))
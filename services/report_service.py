@@ -0,0 +1,133 @@
+import logging
+from sqlalchemy import func, select
+from utils.database import db
+from models.employee import Employee
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.task import Task
+from models.vehicle import Vehicle
+from models.work import Work
+from utils.date_range import date_range_clauses
+from utils.query_audit import register_query
+from utils.ttl_cache import ttl_cached
+
+logger = logging.getLogger(__name__)
+
+def _rows(statement):
+    """
+    Run a report query and return its rows as dictionaries keyed by the labels of its columns.
+    """
+    return [dict(row) for row in db.session.execute(statement).mappings()]
+
+@ttl_cached("REPORT_CACHE_TTL")
+def works_by_status(start=None, end=None):
+    """
+    Count the works of each status, with their total cost.
+    :param start: Optional first start date of the works ('YYYY-MM-DD').
+    :param end: Optional last start date of the works ('YYYY-MM-DD').
+    :return: A list of dictionaries, one per status, most frequent first.
+    :raises ValueError: If a date is not in the YYYY-MM-DD format.
+    """
+    try:
+        count = func.count(Work.work_id)
+        return _rows(
+            select(Work.status.label("status"), count.label("works"),
+                   func.coalesce(func.sum(Work.cost), 0).label("total_cost"))
+            .where(*date_range_clauses(Work.start_date, start, end))
+            .group_by(Work.status)
+            .order_by(count.desc(), Work.status)
+        )
+    except Exception as e:
+        logger.error(f"Error computing works by status: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+@ttl_cached("REPORT_CACHE_TTL")
+def turnaround_by_month(start=None, end=None):
+    """
+    Average, shortest and longest turnaround (days from start to end date) of the works finished each month.
+    :param start: Optional first end date of the works ('YYYY-MM-DD').
+    :param end: Optional last end date of the works ('YYYY-MM-DD').
+    :return: A list of dictionaries, one per month ('YYYY-MM') in which works were finished, in month order.
+    :raises ValueError: If a date is not in the YYYY-MM-DD format.
+    """
+    try:
+        month = func.strftime("%Y-%m", Work.end_date)
+        days = func.julianday(Work.end_date) - func.julianday(Work.start_date)
+        return _rows(
+            select(month.label("year_month"), func.count(Work.work_id).label("works"),
+                   func.round(func.avg(days), 2).label("average_days"),
+                   func.min(days).label("min_days"), func.max(days).label("max_days"))
+            .where(Work.end_date.is_not(None), *date_range_clauses(Work.end_date, start, end))
+            .group_by(month)
+            .order_by(month)
+        )
+    except Exception as e:
+        logger.error(f"Error computing turnaround by month: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+@ttl_cached("REPORT_CACHE_TTL")
+def tasks_completed_by_employee(start=None, end=None):
+    """
+    Count the tasks each employee completed, ranked.
+    :param start: Optional first end date of the tasks ('YYYY-MM-DD').
+    :param end: Optional last end date of the tasks ('YYYY-MM-DD').
+    :return: A list of dictionaries, one per employee with completed tasks, highest count first.
+    :raises ValueError: If a date is not in the YYYY-MM-DD format.
+    """
+    try:
+        completed = func.count(Task.task_id)
+        return _rows(
+            select(Employee.employee_id.label("employee_id"), Employee.name.label("name"),
+                   completed.label("tasks_completed"),
+                   func.rank().over(order_by=completed.desc()).label("rank"))
+            .join(Task, Task.employee_id == Employee.employee_id)
+            .where(Task.status == "completed", *date_range_clauses(Task.end_date, start, end))
+            .group_by(Employee.employee_id)
+            .order_by(completed.desc(), Employee.employee_id)
+        )
+    except Exception as e:
+        logger.error(f"Error computing tasks completed by employee: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+@ttl_cached("REPORT_CACHE_TTL")
+def top_vehicles_by_spend(start=None, end=None, limit=10):
+    """
+    Rank the vehicles by the amount invoiced for the tasks done on them.
+    :param start: Optional first issue date of the invoices ('YYYY-MM-DD').
+    :param end: Optional last issue date of the invoices ('YYYY-MM-DD').
+    :param limit: Number of vehicles to return.
+    :return: A list of dictionaries, one per vehicle, highest spend first.
+    :raises ValueError: If a date is not in the YYYY-MM-DD format or the limit is not positive.
+    """
+    try:
+        if limit < 1:
+            raise ValueError("The 'limit' parameter must be a positive integer.")
+        spend = func.sum(InvoiceItem.cost)
+        return _rows(
+            select(Vehicle.vehicle_id.label("vehicle_id"), Vehicle.license_plate.label("license_plate"),
+                   Vehicle.brand.label("brand"), Vehicle.model.label("model"),
+                   Vehicle.client_id.label("client_id"),
+                   func.round(spend, 2).label("spend"),
+                   func.count(Invoice.invoice_id.distinct()).label("invoices"),
+                   func.rank().over(order_by=spend.desc()).label("rank"))
+            .select_from(InvoiceItem)
+            .join(Invoice, Invoice.invoice_id == InvoiceItem.invoice_id)
+            .join(Task, Task.task_id == InvoiceItem.task_id)
+            .join(Work, Work.work_id == Task.work_id)
+            .join(Vehicle, Vehicle.vehicle_id == Work.vehicle_id)
+            .where(*date_range_clauses(Invoice.issued_at, start, end))
+            .group_by(Vehicle.vehicle_id)
+            .order_by(spend.desc(), Vehicle.vehicle_id)
+            .limit(limit)
+        )
+    except Exception as e:
+        logger.error(f"Error computing top vehicles by spend: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+# (`__wrapped__` bypasses the result cache, so the statements are executed)
+register_query("report_service.works_by_status", lambda: works_by_status.__wrapped__("2025-01-01", "2025-12-31"))
+register_query("report_service.turnaround_by_month", lambda: turnaround_by_month.__wrapped__("2025-01-01", "2025-12-31"))
+register_query("report_service.tasks_completed_by_employee", lambda: tasks_completed_by_employee.__wrapped__("2025-01-01", "2025-12-31"))
+register_query("report_service.top_vehicles_by_spend", lambda: top_vehicles_by_spend.__wrapped__("2025-01-01", "2025-12-31"))
@@ -0,0 +1,156 @@
+import logging
+import re
+from sqlalchemy import delete, func, insert, select
+from utils.database import db
+from models.invoice import Invoice
+from models.revenue_month import RevenueMonth
+from models.revenue_client_month import RevenueClientMonth
+from utils.serializers import serializer_for
+from utils.query_audit import register_query
+
+logger = logging.getLogger(__name__)
+
+# Rollup models and the invoice columns they are grouped by, besides the month
+ROLLUPS = {
+    RevenueClientMonth: [Invoice.client_id],
+    RevenueMonth: [],
+}
+
+# Amounts differing by less than this are rounding noise of the incremental updates, not drift
+TOLERANCE = 0.005
+
+_MONTH = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+def _month(value, name):
+    """
+    Validate an optional 'YYYY-MM' parameter.
+    """
+    if value is not None and not _MONTH.match(value):
+        raise ValueError(f"The '{name}' parameter must be a month in the YYYY-MM format.")
+    return value
+
+def _month_range(model, start, end):
+    """
+    Build the WHERE clauses restricting a rollup to the months between `start` and `end`, inclusive.
+    """
+    clauses = []
+    if _month(start, "from"):
+        clauses.append(model.year_month >= start)
+    if _month(end, "to"):
+        clauses.append(model.year_month <= end)
+    return clauses
+
+def get_monthly_revenue(start=None, end=None):
+    """
+    Retrieve the revenue of every month in a range, read from the monthly rollup.
+    :param start: Optional first month ('YYYY-MM').
+    :param end: Optional last month ('YYYY-MM').
+    :return: A list of dictionaries, one per month with invoices, in month order.
+    :raises ValueError: If a month is not in the YYYY-MM format.
+    """
+    try:
+        rows = db.session.execute(
+            select(*RevenueMonth.__table__.columns)
+            .where(*_month_range(RevenueMonth, start, end))
+            .order_by(RevenueMonth.year_month)
+        ).all()
+        return serializer_for(RevenueMonth).many(rows)
+    except Exception as e:
+        logger.error(f"Error fetching monthly revenue: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def get_client_revenue(client_id, start=None, end=None):
+    """
+    Retrieve the monthly revenue of one client, read from the per-client rollup.
+    :param client_id: The ID of the client.
+    :param start: Optional first month ('YYYY-MM').
+    :param end: Optional last month ('YYYY-MM').
+    :return: A list of dictionaries, one per month in which the client was invoiced, in month order.
+    :raises ValueError: If a month is not in the YYYY-MM format.
+    """
+    try:
+        rows = db.session.execute(
+            select(*RevenueClientMonth.__table__.columns)
+            .where(RevenueClientMonth.client_id == client_id, *_month_range(RevenueClientMonth, start, end))
+            .order_by(RevenueClientMonth.year_month)
+        ).all()
+        return serializer_for(RevenueClientMonth).many(rows)
+    except Exception as e:
+        logger.error(f"Error fetching revenue of client {client_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def get_month_revenue_by_client(year_month):
+    """
+    Retrieve the revenue of every client invoiced in a month, highest total first.
+    :param year_month: The month ('YYYY-MM').
+    :return: A list of dictionaries, one per client.
+    :raises ValueError: If the month is not in the YYYY-MM format.
+    """
+    try:
+        _month(year_month, "year_month")
+        rows = db.session.execute(
+            select(*RevenueClientMonth.__table__.columns)
+            .where(RevenueClientMonth.year_month == year_month)
+            .order_by(RevenueClientMonth.total.desc(), RevenueClientMonth.client_id)
+        ).all()
+        return serializer_for(RevenueClientMonth).many(rows)
+    except Exception as e:
+        logger.error(f"Error fetching revenue by client for {year_month}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def _recompute(model, keys):
+    """
+    Aggregate the invoice table the way the triggers maintain `model`.
+    """
+    year_month = func.strftime("%Y-%m", Invoice.issued_at)
+    return (
+        select(*keys, year_month, func.count(), func.sum(Invoice.total), func.sum(Invoice.iva),
+               func.sum(Invoice.total_with_iva))
+        .group_by(*keys, year_month)
+    )
+
+def _differences(model, keys):
+    """
+    Compare a rollup with a full recompute.
+    :return: A list of (key, stored, expected) tuples, None standing for a missing row.
+    """
+    width = len(keys) + 1
+    stored = {tuple(row[:width]): tuple(row[width:]) for row in db.session.execute(
+        select(*model.__table__.columns)
+    )}
+    expected = {tuple(row[:width]): tuple(row[width:]) for row in db.session.execute(_recompute(model, keys))}
+
+    differences = []
+    for key in sorted(stored.keys() | expected.keys(), key=str):
+        have, want = stored.get(key), expected.get(key)
+        if have is None or want is None or have[0] != want[0] or any(
+            abs(a - b) > TOLERANCE for a, b in zip(have[1:], want[1:])
+        ):
+            differences.append((key, have, want))
+    return differences
+
+def rebuild_revenue(verify_only=False):
+    """
+    Check the revenue rollups against a full recompute from the invoices, and rebuild them.
+    :param verify_only: If True, only report the differences and leave the rollups untouched.
+    :return: A dictionary mapping each rollup table to its list of (key, stored, expected) differences.
+    """
+    try:
+        report = {model.__tablename__: _differences(model, keys) for model, keys in ROLLUPS.items()}
+        if not verify_only:
+            for model, keys in ROLLUPS.items():
+                columns = [column.name for column in model.__table__.columns]
+                db.session.execute(delete(model))
+                db.session.execute(insert(model).from_select(columns, _recompute(model, keys)))
+            db.session.commit()
+        return report
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error rebuilding the revenue rollups: {e}")
+        raise
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("revenue_service.get_monthly_revenue", lambda: get_monthly_revenue("2025-01", "2025-12"))
+register_query("revenue_service.get_client_revenue", lambda: get_client_revenue(1, "2025-01", "2025-12"))
+register_query("revenue_service.get_month_revenue_by_client", lambda: get_month_revenue_by_client("2025-01"))
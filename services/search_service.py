@@ -0,0 +1,147 @@
+import logging
+import re
+from sqlalchemy import text
+from utils.database import db
+from utils.pagination import decode_cursor, encode_cursor, page_size
+
+logger = logging.getLogger(__name__)
+
+# Searchable resources: type -> SQL expression of the title of a hit, over the columns of its index
+SEARCH_SOURCES = {
+    "client": "name",
+    "vehicle": "brand || ' ' || model || ' (' || license_plate || ')'",
+    "work": "description",
+    "task": "description",
+}
+
+# Words of a query beyond this many are ignored
+MAX_QUERY_TERMS = 16
+
+def _terms(q):
+    """
+    Split free text into the words to search for.
+    """
+    terms = re.findall(r"\w+", q or "")[:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValueError("The 'q' parameter must contain at least one word.")
+    return terms
+
+def _match_expression(terms, mode):
+    """
+    Build the FTS5 query of a list of words: every word quoted (so punctuation is never parsed
+    as syntax) and, from three characters on, also matching as a prefix. `mode` "all" requires
+    every word in the same row; "any" accepts rows with any of them, ranking those with more first.
+    """
+    operator = " AND " if mode == "all" else " OR "
+    return operator.join(f'"{term}"*' if len(term) >= 3 else f'"{term}"' for term in terms)
+
+def _branch(kind, seek):
+    """
+    SELECT of the best hits of one index past the cursor, in rank order.
+    """
+    index = f"search_{kind}"
+    where = f"{index} MATCH :match"
+    if seek:
+        where += f" AND (rank, '{kind}', rowid) > (:score, :type, :id)"
+    return (
+        f"SELECT * FROM (SELECT '{kind}' AS type, rowid AS id, rank AS score "
+        f"FROM {index} WHERE {where} ORDER BY rank, rowid LIMIT :size)"
+    )
+
+def _ranked_hits(match, types, size, position):
+    """
+    Read the type, id and score of the next `size` + 1 hits of a query, best first.
+    """
+    params = {"match": match, "size": size + 1}
+    if position:
+        params["score"], params["type"], params["id"] = position
+    # Each index returns at most one page past the cursor; the best of them make the page
+    branches = " UNION ALL ".join(_branch(kind, position) for kind in types)
+    statement = text(f"SELECT type, id, score FROM ({branches}) ORDER BY score, type, id LIMIT :size")
+    return [dict(row) for row in db.session.execute(statement, params).mappings()]
+
+def _describe(hits, match):
+    """
+    Add the title and highlighted snippet of each hit, one query per type on the page.
+    """
+    for kind in dict.fromkeys(hit["type"] for hit in hits):
+        index = f"search_{kind}"
+        ids = [hit["id"] for hit in hits if hit["type"] == kind]
+        statement = text(
+            f"SELECT rowid AS id, {SEARCH_SOURCES[kind]} AS title, "
+            f"snippet({index}, -1, '<mark>', '</mark>', '…', 12) AS snippet "
+            f"FROM {index} WHERE {index} MATCH :match AND rowid IN ({', '.join(map(str, ids))})"
+        )
+        texts = {row.id: row for row in db.session.execute(statement, {"match": match})}
+        for hit in hits:
+            if hit["type"] == kind:
+                hit["title"], hit["snippet"] = texts[hit["id"]].title, texts[hit["id"]].snippet
+    return hits
+
+def search(q, types=None, limit=None, after=None):
+    """
+    Full-text search across clients, vehicles, works and tasks.
+
+    Rows containing every word are returned; when there are none, rows containing any of
+    them are, so a query mixing a vehicle and a work description still finds both.
+    :param q: Free text to search for.
+    :param types: Optional list of resource types to search (all when omitted).
+    :param limit: Maximum number of hits to return (capped by the server).
+    :param after: Cursor returned with the previous page of the same query.
+    :return: tuple: A list of hits (type, id, title, snippet, score; best first) and the next page cursor.
+    :raises ValueError: If the query has no words, a type is unknown or the cursor is invalid.
+    """
+    try:
+        terms = _terms(q)
+        types = types or list(SEARCH_SOURCES)
+        unknown = [kind for kind in types if kind not in SEARCH_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown search type(s): {', '.join(unknown)}. Expected: {', '.join(SEARCH_SOURCES)}.")
+        size = page_size(limit)
+
+        # The cursor is bound to the query, and records whether it fell back to matching any word
+        query_key = " ".join(terms).lower()
+        mode, position = "all", None
+        if after:
+            mode, *position = decode_cursor(after, query_key, [None] * 4)
+        hits = _ranked_hits(_match_expression(terms, mode), types, size, position)
+        if not hits and not after and len(terms) > 1:
+            mode = "any"
+            hits = _ranked_hits(_match_expression(terms, mode), types, size, position)
+
+        next_cursor = None
+        if len(hits) > size:
+            hits = hits[:size]
+            next_cursor = encode_cursor(query_key, [mode, hits[-1]["score"], hits[-1]["type"], hits[-1]["id"]])
+        return _describe(hits, _match_expression(terms, mode)), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
+    except Exception as e:
+        logger.error(f"Error searching for {q!r}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def rebuild_search_index(verify_only=False):
+    """
+    Check the full-text indexes against their tables, and rebuild them.
+    :param verify_only: If True, only check the indexes and leave them untouched.
+    :return: A list of the indexes that did not match their table.
+    """
+    try:
+        damaged = []
+        for kind in SEARCH_SOURCES:
+            index = f"search_{kind}"
+            try:
+                with db.session.begin_nested():
+                    # rank = 1 compares the index with the content table, not only with itself
+                    db.session.execute(text(f"INSERT INTO {index} ({index}, rank) VALUES ('integrity-check', 1)"))
+            except Exception:
+                damaged.append(index)
+            if not verify_only:
+                db.session.execute(text(f"INSERT INTO {index} ({index}) VALUES ('rebuild')"))
+                db.session.execute(text(f"INSERT INTO {index} ({index}) VALUES ('optimize')"))
+        db.session.commit()
+        return damaged
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error rebuilding the search indexes: {e}")
+        raise
@@ -1,36 +1,91 @@
 from utils.database import db
 from models.setting import Setting
+from utils.pagination import paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
+from utils.conditional import get_table_versions
+from sqlalchemy import select
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_settings():
+# In-process copy of the setting table, keyed by `key_name`, with the version of the table it was
+# read at. Settings are read-mostly: each read checks the table's version marker (one indexed row,
+# bumped by triggers whichever process writes) and reloads the whole (small) table when it moved.
+_cache = None
+
+def load_settings_cache():
+    """
+    Load every setting into the in-process cache.
+    :return: A dictionary mapping each key name to the setting's fields.
+    """
+    global _cache
+    (version,) = get_table_versions(["setting"])
+    rows = db.session.execute(select(*Setting.__table__.columns)).mappings()
+    settings = {row["key_name"]: dict(row) for row in rows}
+    _cache = (version, settings)
+    return settings
+
+def _cached_settings():
+    """
+    Return the cached settings, reloading them first if the setting table changed since they were read.
+    """
+    cache = _cache
+    if cache is not None and (cache[0],) == get_table_versions(["setting"]):
+        return cache[1]
+    return load_settings_cache()
+
+def get_setting_by_key(key_name):
+    """
+    Retrieve a setting by its key name from the in-process cache.
+    :param key_name: The name of the setting.
+    :return: A dictionary with the setting's fields, or None if there is no such setting.
+    """
+    setting = _cached_settings().get(key_name)
+    return dict(setting) if setting else None
+
+def get_setting_value(key_name, default=None):
+    """
+    Read the value of a setting from the in-process cache (e.g. a tax rate from another service).
+    :param key_name: The name of the setting.
+    :param default: The value to return if the setting does not exist.
+    :return: The value of the setting, as stored.
+    """
+    setting = _cached_settings().get(key_name)
+    return setting["value"] if setting else default
+
+def get_all_settings(limit=None, after=None, sort=None, fields=None, filters=None):
     try:
-        settings = Setting.query.all()
-        return [
-            {
-                "setting_id": setting.setting_id,
-                "key_name": setting.key_name,
-                "value": setting.value,
-                "updated_at": setting.updated_at,
-            }
-            for setting in settings
-        ]
+        where = compile_filters(Setting, filters)
+        serializer = serializer_for(Setting, fields)
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Setting, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Setting, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all settings: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
 
-def get_setting(setting_id):
+def iter_settings(fields=None, filters=None):
+    """
+    Stream every setting row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per setting, that never holds the whole table in memory.
+    """
+    return stream_rows(Setting, fields=fields, filters=filters)
+
+def get_setting(setting_id, fields=None):
     try:
-        setting = Setting.query.get(setting_id)
-        if not setting:
-            return None
-        return {
-            "setting_id": setting.setting_id,
-            "key_name": setting.key_name,
-            "value": setting.value,
-            "updated_at": setting.updated_at,
-        }
+        serializer = serializer_for(Setting, fields)
+        row = column_query(Setting, serializer.names).filter(Setting.setting_id == setting_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching setting {setting_id}: {e}")
         return {"error": "Internal Server Error"}
@@ -43,16 +98,69 @@ def create_setting(key_name, value):
         )
         db.session.add(setting)
         db.session.commit()
-        return {
-            "setting_id": setting.setting_id,
-            "key_name": setting.key_name,
-            "value": setting.value,
-            "updated_at": setting.updated_at,
-        }
+        return serializer_for(Setting).from_object(setting)
     except Exception as e:
         logger.error(f"Error creating setting: {e}")
         return {"error": "Internal Server Error"}
 
+def create_settings_bulk(rows, atomic=False):
+    """
+    Create many settings in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one setting.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Setting, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating settings: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_settings_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected setting with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of setting ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the settings.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated settings and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Setting, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating settings: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_settings_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected setting with a single DELETE ... WHERE statement.
+    :param ids: Optional list of setting ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the settings.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted settings and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Setting, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting settings: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_setting(setting_id, values):
+    """
+    Partially update a setting with a single UPDATE ... RETURNING statement.
+    :param setting_id: The ID of the setting to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated setting's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        setting = update_row(Setting, setting_id, values)
+        if setting is not None:
+            return setting
+    except Exception as e:
+        logger.error(f"Error patching setting {setting_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_setting(setting_id, key_name=None, value=None):
     try:
         setting = Setting.query.get(setting_id)
@@ -63,26 +171,26 @@ def update_setting(setting_id, key_name=None, value=None):
         setting.value = value if value else setting.value
 
         db.session.commit()
-        return {
-            "setting_id": setting.setting_id,
-            "key_name": setting.key_name,
-            "value": setting.value,
-            "updated_at": setting.updated_at,
-        }
+        return serializer_for(Setting).from_object(setting)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating setting {setting_id}: {e}")
         return {"error": "Internal Server Error"}
 
 def delete_setting(setting_id):
+    """
+    Delete a setting with a single DELETE ... WHERE statement.
+    :param setting_id: The ID of the setting to delete.
+    :return: True if the setting was deleted, False if not found.
+    """
     try:
-        setting = Setting.query.get(setting_id)
-        if not setting:
-            return None
-
-        db.session.delete(setting)
-        db.session.commit()
-        return {"message": f"Setting {setting_id} deleted successfully"}
+        deleted = delete_row(Setting, setting_id)
+        if deleted:
+            return deleted
     except Exception as e:
         logger.error(f"Error deleting setting {setting_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("setting_service.get_setting", lambda: get_setting(1))
@@ -1,45 +1,54 @@
 from datetime import datetime
 from utils.database import db
 from models.task import Task
+from utils.pagination import encode_cursor, paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_tasks():
+def get_all_tasks(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     try:
-        tasks = Task.query.all()
-        return [
-            {
-                "task_id": task.task_id,
-                "description": task.description,
-                "employee_id": task.employee_id,
-                "work_id": task.work_id,
-                "start_date": task.start_date,
-                "end_date": task.end_date,
-                "status": task.status,
-                "created_at": task.created_at,
-            }
-            for task in tasks
-        ]
+        where = compile_filters(Task, filters)
+        serializer = serializer_for(Task, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Task).filter(*where)
+            rows, next_cursor = paginate(query, Task, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Task, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Task, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all tasks: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
 
-def get_task(task_id):
+def iter_tasks(fields=None, filters=None):
+    """
+    Stream every task row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per task, that never holds the whole table in memory.
+    """
+    return stream_rows(Task, fields=fields, filters=filters)
+
+def get_task(task_id, fields=None, include=None):
     try:
-        task = Task.query.get(task_id)
-        if not task:
-            return None
-        return {
-            "task_id": task.task_id,
-            "description": task.description,
-            "employee_id": task.employee_id,
-            "work_id": task.work_id,
-            "start_date": task.start_date,
-            "end_date": task.end_date,
-            "status": task.status,
-            "created_at": task.created_at,
-        }
+        serializer = serializer_for(Task, fields)
+        if include:
+            instance = include_query(Task).filter(Task.task_id == task_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Task, serializer.names).filter(Task.task_id == task_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching task {task_id}: {e}")
         return {"error": "Internal Server Error"}
@@ -59,20 +68,67 @@ def create_task(description, employee_id, work_id, start_date, end_date, status)
         )
         db.session.add(task)
         db.session.commit()
-        return {
-            "task_id": task.task_id,
-            "description": task.description,
-            "employee_id": task.employee_id,
-            "work_id": task.work_id,
-            "start_date": task.start_date,
-            "end_date": task.end_date,
-            "status": task.status,
-            "created_at": task.created_at,
-        }
+        return serializer_for(Task).from_object(task)
     except Exception as e:
         logger.error(f"Error creating task: {e}")
         return {"error": "Internal Server Error"}
 
+def create_tasks_bulk(rows, atomic=False):
+    """
+    Create many tasks in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one task.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Task, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating tasks: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_tasks_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected task with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of task ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the tasks.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated tasks and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Task, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating tasks: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_tasks_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected task with a single DELETE ... WHERE statement.
+    :param ids: Optional list of task ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the tasks.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted tasks and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Task, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting tasks: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_task(task_id, values):
+    """
+    Partially update a task with a single UPDATE ... RETURNING statement.
+    :param task_id: The ID of the task to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated task's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Task, task_id, values)
+    except Exception as e:
+        logger.error(f"Error patching task {task_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_task(task_id, description=None, employee_id=None, work_id=None, start_date=None, end_date=None, status=None):
     try:
         task = Task.query.get(task_id)
@@ -87,33 +143,25 @@ def update_task(task_id, description=None, employee_id=None, work_id=None, start
         task.status = status if status else task.status
 
         db.session.commit()
-        return {
-            "task_id": task.task_id,
-            "description": task.description,
-            "employee_id": task.employee_id,
-            "work_id": task.work_id,
-            "start_date": task.start_date,
-            "end_date": task.end_date,
-            "status": task.status,
-            "created_at": task.created_at,
-        }
+        return serializer_for(Task).from_object(task)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating task {task_id}: {e}")
         return {"error": "Internal Server Error"}
 
 def delete_task(task_id):
+    """
+    Delete a task with a single DELETE ... WHERE statement.
+    The invoice items billing it are deleted with it (ON DELETE CASCADE).
+    :param task_id: The ID of the task to delete.
+    :return: True if the task was deleted, False if not found.
+    :raises ValueError: If a foreign key rule forbids the delete.
+    """
     try:
-        task = Task.query.get(task_id)
-        if not task:
-            return None
-
-        db.session.delete(task)
-        db.session.commit()
-        return {"message": f"Task {task_id} deleted successfully"}
+        return delete_row(Task, task_id)
     except Exception as e:
         logger.error(f"Error deleting task {task_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
 
 def update_task_status(task_id, new_status):
     """
@@ -134,4 +182,12 @@ def update_task_status(task_id, new_status):
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating task {task_id} status: {e}")
-        return {"error": "Internal Server Error"}
\ No newline at end of file
+        return {"error": "Internal Server Error"}
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("task_service.get_task", lambda: get_task(1))
+register_query("task_service.tasks_by_work", lambda: get_all_tasks(filters={"work_id": "1"}))
+register_query("task_service.tasks_by_employee", lambda: get_all_tasks(filters={"employee_id": "1"}))
+register_query("task_service.tasks_by_status", lambda: get_all_tasks(filters={"status": "pending"}))
+register_query("task_service.tasks_newest_first_after_cursor", lambda: get_all_tasks(sort="-created_at", after=encode_cursor("-created_at", ["2025-01-01 00:00:00", 1])))
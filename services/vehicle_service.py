@@ -1,55 +1,126 @@
 import logging
+from sqlalchemy.exc import IntegrityError
 from utils.database import db
 from models.vehicle import Vehicle
+from utils.pagination import encode_cursor, page_size, paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 
 logger = logging.getLogger(__name__)
 
-def get_all_vehicles():
+def normalize_plate(license_plate):
     """
-    Retrieve all vehicles from the database.
-    :return: A list of dictionaries containing vehicle information.
+    Normalize a license plate into its lookup key: upper case, without spaces or dashes.
+    """
+    return license_plate.replace(" ", "").replace("-", "").upper()
+
+def get_all_vehicles(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
+    """
+    Retrieve one page of vehicles from the database.
+    :param limit: Maximum number of vehicles to return (capped by the server).
+    :param after: Cursor of the previous page.
+    :param sort: Column to sort by, prefixed with '-' for descending order.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :param include: Optional relationships to embed, as returned by `parse_include`.
+    :return: A tuple with a list of dictionaries containing vehicle information and the next page cursor.
     """
     try:
-        vehicles = Vehicle.query.all()
-        return [
-            {
-                "vehicle_id": vehicle.vehicle_id,
-                "brand": vehicle.brand,
-                "client_id": vehicle.client_id,
-                "created_at": vehicle.created_at,
-                "license_plate": vehicle.license_plate,
-                "model": vehicle.model,
-                "year": vehicle.year,
-            }
-            for vehicle in vehicles
-        ]
+        where = compile_filters(Vehicle, filters)
+        serializer = serializer_for(Vehicle, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Vehicle).filter(*where)
+            rows, next_cursor = paginate(query, Vehicle, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Vehicle, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Vehicle, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all vehicles: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def iter_vehicles(fields=None, filters=None):
+    """
+    Stream every vehicle row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per vehicle, that never holds the whole table in memory.
+    """
+    return stream_rows(Vehicle, fields=fields, filters=filters)
 
-def get_vehicle(vehicle_id):
+def get_vehicle(vehicle_id, fields=None, include=None):
     """
     Retrieve a vehicle by ID.
     :param vehicle_id: The ID of the vehicle to retrieve.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param include: Optional relationships to embed, as returned by `parse_include`.
     :return: A dictionary containing the vehicle's information or None if not found.
     """
     try:
-        vehicle = Vehicle.query.get(vehicle_id)
-        if not vehicle:
-            return None
-        return {
-            "vehicle_id": vehicle.vehicle_id,
-            "brand": vehicle.brand,
-            "client_id": vehicle.client_id,
-            "created_at": vehicle.created_at,
-            "license_plate": vehicle.license_plate,
-            "model": vehicle.model,
-            "year": vehicle.year,
-        }
+        serializer = serializer_for(Vehicle, fields)
+        if include:
+            instance = include_query(Vehicle).filter(Vehicle.vehicle_id == vehicle_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Vehicle, serializer.names).filter(Vehicle.vehicle_id == vehicle_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching vehicle {vehicle_id}: {e}")
         return {"error": "Internal Server Error"}
 
+def get_vehicle_by_plate(license_plate, fields=None):
+    """
+    Retrieve a vehicle by license plate, however it is spaced, dashed or cased.
+    :param license_plate: The license plate of the vehicle.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :return: A dictionary containing the vehicle's information or None if not found.
+    """
+    try:
+        serializer = serializer_for(Vehicle, fields)
+        row = column_query(Vehicle, serializer.names).filter(Vehicle.plate_key == normalize_plate(license_plate)).first()
+        return serializer(row) if row else None
+    except Exception as e:
+        logger.error(f"Error fetching vehicle with plate {license_plate!r}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def find_vehicles_by_plate_prefix(prefix, limit=None, fields=None):
+    """
+    Retrieve the vehicles whose license plate starts with a partial plate, in plate order.
+    :param prefix: The beginning of the license plate, however it is spaced, dashed or cased.
+    :param limit: Maximum number of vehicles to return (capped by the server).
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :return: A list of dictionaries containing vehicle information.
+    :raises ValueError: If the prefix is empty once normalized.
+    """
+    try:
+        key = normalize_plate(prefix or "")
+        if not key:
+            raise ValueError("The 'prefix' parameter must contain at least one letter or digit.")
+        # A range on the unique index rather than LIKE, which SQLite cannot serve from it
+        upper_bound = key[:-1] + chr(ord(key[-1]) + 1)
+        serializer = serializer_for(Vehicle, fields)
+        rows = (
+            column_query(Vehicle, serializer.names)
+            .filter(Vehicle.plate_key >= key, Vehicle.plate_key < upper_bound)
+            .order_by(Vehicle.plate_key)
+            .limit(page_size(limit))
+            .all()
+        )
+        return serializer.many(rows)
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
+    except Exception as e:
+        logger.error(f"Error searching vehicles with plate prefix {prefix!r}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def create_vehicle(brand, client_id, license_plate, model, year, commit=True):
     """
     Create a new vehicle.
@@ -60,6 +131,7 @@ def create_vehicle(brand, client_id, license_plate, model, year, commit=True):
     :param year: The year of the vehicle.
     :param commit: A boolean indicating whether to commit the transaction immediately.
     :return: A dictionary containing the newly created vehicle's information or an error message.
+    :raises ValueError: If the license plate is already registered or the client does not exist.
     """
     try:
         # Create a new vehicle instance
@@ -67,6 +139,7 @@ def create_vehicle(brand, client_id, license_plate, model, year, commit=True):
             brand=brand,
             client_id=client_id,
             license_plate=license_plate,
+            plate_key=normalize_plate(license_plate),
             model=model,
             year=year
         )
@@ -78,15 +151,12 @@ def create_vehicle(brand, client_id, license_plate, model, year, commit=True):
             db.session.commit()
 
         # Return the vehicle details
-        return {
-            "vehicle_id": vehicle.vehicle_id,
-            "brand": vehicle.brand,
-            "client_id": vehicle.client_id,
-            "created_at": vehicle.created_at,
-            "license_plate": vehicle.license_plate,
-            "model": vehicle.model,
-            "year": vehicle.year,
-        }
+        return serializer_for(Vehicle).from_object(vehicle)
+    except IntegrityError as e:
+        # Duplicate license plate or unknown client
+        if commit:
+            db.session.rollback()
+        raise ValueError(str(e.orig))
     except Exception as e:
         # Rollback the transaction only if `commit` is True
         if commit:
@@ -95,6 +165,79 @@ def create_vehicle(brand, client_id, license_plate, model, year, commit=True):
         return {"error": "Internal Server Error"}
 
 
+def with_plate_key(values):
+    """
+    Derive `plate_key` for a bulk-inserted vehicle, as `create_vehicle` does.
+    """
+    if values.get("license_plate") is not None:
+        values["plate_key"] = normalize_plate(values["license_plate"])
+    return values
+
+def plate_key_change(changes):
+    """
+    Keep `plate_key` in step when a bulk update changes `license_plate`; it is never set directly.
+    """
+    changes.pop("plate_key", None)
+    if "license_plate" in changes:
+        changes["plate_key"] = normalize_plate(changes["license_plate"])
+    return changes
+
+def create_vehicles_bulk(rows, atomic=False):
+    """
+    Create many vehicles in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one vehicle.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Vehicle, rows, atomic=atomic, prepare=with_plate_key)
+    except Exception as e:
+        logger.error(f"Error bulk creating vehicles: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_vehicles_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected vehicle with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of vehicle ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the vehicles.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated vehicles and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Vehicle, values, ids=ids, filters=filters, returning=returning, prepare=plate_key_change)
+    except Exception as e:
+        logger.error(f"Error bulk updating vehicles: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_vehicles_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected vehicle with a single DELETE ... WHERE statement.
+    :param ids: Optional list of vehicle ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the vehicles.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted vehicles and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Vehicle, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting vehicles: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_vehicle(vehicle_id, values):
+    """
+    Partially update a vehicle with a single UPDATE ... RETURNING statement.
+    :param vehicle_id: The ID of the vehicle to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated vehicle's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Vehicle, vehicle_id, values, prepare=plate_key_change)
+    except Exception as e:
+        logger.error(f"Error patching vehicle {vehicle_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_vehicle(vehicle_id, brand=None, client_id=None, license_plate=None, model=None, year=None):
     """
     Update an existing vehicle.
@@ -105,6 +248,7 @@ def update_vehicle(vehicle_id, brand=None, client_id=None, license_plate=None, m
     :param model: The new model of the vehicle.
     :param year: The new year of the vehicle.
     :return: A dictionary containing the updated vehicle's information or None if not found.
+    :raises ValueError: If the license plate is already registered or the client does not exist.
     """
     try:
         vehicle = Vehicle.query.get(vehicle_id)
@@ -115,19 +259,16 @@ def update_vehicle(vehicle_id, brand=None, client_id=None, license_plate=None, m
         vehicle.brand = brand if brand else vehicle.brand
         vehicle.client_id = client_id if client_id else vehicle.client_id
         vehicle.license_plate = license_plate if license_plate else vehicle.license_plate
+        vehicle.plate_key = normalize_plate(vehicle.license_plate)
         vehicle.model = model if model else vehicle.model
         vehicle.year = year if year else vehicle.year
 
         db.session.commit()
-        return {
-            "vehicle_id": vehicle.vehicle_id,
-            "brand": vehicle.brand,
-            "client_id": vehicle.client_id,
-            "created_at": vehicle.created_at,
-            "license_plate": vehicle.license_plate,
-            "model": vehicle.model,
-            "year": vehicle.year,
-        }
+        return serializer_for(Vehicle).from_object(vehicle)
+    except IntegrityError as e:
+        # Duplicate license plate or unknown client
+        db.session.rollback()
+        raise ValueError(str(e.orig))
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating vehicle {vehicle_id}: {e}")
@@ -135,26 +276,22 @@ def update_vehicle(vehicle_id, brand=None, client_id=None, license_plate=None, m
 
 def delete_vehicle(vehicle_id):
     """
-    Delete a vehicle.
+    Delete a vehicle with a single DELETE ... WHERE statement.
+    Its works, their tasks and their invoice items are deleted with it (ON DELETE CASCADE).
     :param vehicle_id: The ID of the vehicle to delete.
-    :return: The deleted vehicle's information or None if not found.
+    :return: True if the vehicle was deleted, False if not found.
+    :raises ValueError: If a foreign key rule forbids the delete.
     """
     try:
-        vehicle = Vehicle.query.get(vehicle_id)
-        if not vehicle:
-            return None
-
-        db.session.delete(vehicle)
-        db.session.commit()
-        return {
-            "vehicle_id": vehicle.vehicle_id,
-            "brand": vehicle.brand,
-            "client_id": vehicle.client_id,
-            "created_at": vehicle.created_at,
-            "license_plate": vehicle.license_plate,
-            "model": vehicle.model,
-            "year": vehicle.year,
-        }
+        return delete_row(Vehicle, vehicle_id)
     except Exception as e:
         logger.error(f"Error deleting vehicle {vehicle_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("vehicle_service.get_vehicle", lambda: get_vehicle(1))
+register_query("vehicle_service.vehicles_by_client", lambda: get_all_vehicles(filters={"client_id": "1"}))
+register_query("vehicle_service.vehicles_newest_first_after_cursor", lambda: get_all_vehicles(sort="-created_at", after=encode_cursor("-created_at", ["2025-01-01 00:00:00", 1])))
+register_query("vehicle_service.get_vehicle_by_plate", lambda: get_vehicle_by_plate("AA-12-BC"))
+register_query("vehicle_service.find_vehicles_by_plate_prefix", lambda: find_vehicles_by_plate_prefix("AA1"))
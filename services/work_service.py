@@ -1,54 +1,71 @@
 import logging
 from utils.database import db
 from models.work import Work
+from utils.pagination import encode_cursor, paginate
+from utils.streaming import stream_rows
+from utils.fieldsets import column_query
+from utils.serializers import serializer_for
+from utils.includes import include_query, serialize_included
+from utils.filtering import compile_filters
+from utils.query_audit import register_query
+from utils.bulk import bulk_delete, bulk_insert, bulk_update, delete_row, update_row
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-def get_all_works():
+def get_all_works(limit=None, after=None, sort=None, fields=None, filters=None, include=None):
     """
-    Retrieve all works from the database.
-    :return: A list of dictionaries containing work details.
+    Retrieve one page of works from the database.
+    :param limit: Maximum number of works to return (capped by the server).
+    :param after: Cursor of the previous page.
+    :param sort: Column to sort by, prefixed with '-' for descending order.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :param include: Optional relationships to embed, as returned by `parse_include`.
+    :return: A tuple with a list of dictionaries containing work details and the next page cursor.
     """
     try:
-        works = Work.query.all()
-        return [
-            {
-                "work_id": work.work_id,
-                "cost": work.cost,
-                "created_at": work.created_at,
-                "description": work.description,
-                "end_date": work.end_date,
-                "start_date": work.start_date,
-                "status": work.status,
-                "vehicle_id": work.vehicle_id,
-            }
-            for work in works
-        ]
+        where = compile_filters(Work, filters)
+        serializer = serializer_for(Work, fields)
+        if include:
+            # ORM instances, whose relationships are then loaded with one query per level
+            query = include_query(Work).filter(*where)
+            rows, next_cursor = paginate(query, Work, limit=limit, after=after, sort=sort)
+            return serialize_included(rows, serializer, include), next_cursor
+        # Read plain rows of the needed columns rather than ORM objects
+        query = column_query(Work, serializer.names).filter(*where)
+        rows, next_cursor = paginate(query, Work, limit=limit, after=after, sort=sort)
+        return serializer.many(rows), next_cursor
+    except ValueError:
+        raise  # The client's own error (filter, sort, cursor or parameter): a 400, not a failure to log
     except Exception as e:
         logger.error(f"Error fetching all works: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
 
-def get_work(work_id):
+def iter_works(fields=None, filters=None):
+    """
+    Stream every work row through a server-side cursor.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param filters: Optional mapping of `column[__operator]` filters to their values.
+    :return: A generator of dictionaries, one per work, that never holds the whole table in memory.
+    """
+    return stream_rows(Work, fields=fields, filters=filters)
+
+def get_work(work_id, fields=None, include=None):
     """
     Retrieve a specific work by ID.
     :param work_id: The ID of the work to retrieve.
+    :param fields: Optional list of column names to return (all columns when omitted).
+    :param include: Optional relationships to embed, as returned by `parse_include`.
     :return: A dictionary with work details or None if not found.
     """
     try:
-        work = Work.query.get(work_id)
-        if not work:
-            return None
-        return {
-            "work_id": work.work_id,
-            "cost": work.cost,
-            "created_at": work.created_at,
-            "description": work.description,
-            "end_date": work.end_date,
-            "start_date": work.start_date,
-            "status": work.status,
-            "vehicle_id": work.vehicle_id,
-        }
+        serializer = serializer_for(Work, fields)
+        if include:
+            instance = include_query(Work).filter(Work.work_id == work_id).first()
+            return serialize_included(instance, serializer, include) if instance else None
+        row = column_query(Work, serializer.names).filter(Work.work_id == work_id).first()
+        return serializer(row) if row else None
     except Exception as e:
         logger.error(f"Error fetching work {work_id}: {e}")
         return {"error": "Internal Server Error"}
@@ -75,20 +92,67 @@ def create_work(cost, description, end_date, start_date, status, vehicle_id):
         )
         db.session.add(work)
         db.session.commit()
-        return {
-            "work_id": work.work_id,
-            "cost": work.cost,
-            "created_at": work.created_at,
-            "description": work.description,
-            "end_date": work.end_date,
-            "start_date": work.start_date,
-            "status": work.status,
-            "vehicle_id": work.vehicle_id,
-        }
+        return serializer_for(Work).from_object(work)
     except Exception as e:
         logger.error(f"Error creating work: {e}")
         return {"error": "Internal Server Error"}
 
+def create_works_bulk(rows, atomic=False):
+    """
+    Create many works in a single transaction with one multi-row INSERT.
+    :param rows: A list of dictionaries, each holding the fields of one work.
+    :param atomic: If True, any invalid row rejects the whole batch; otherwise invalid rows are skipped.
+    :return: A dictionary with the generated ids in request order and the per-row errors.
+    """
+    try:
+        return bulk_insert(Work, rows, atomic=atomic)
+    except Exception as e:
+        logger.error(f"Error bulk creating works: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def update_works_bulk(values, ids=None, filters=None, returning=False):
+    """
+    Update every selected work with a single UPDATE ... WHERE statement.
+    :param values: A dictionary of the columns to set and their new values.
+    :param ids: Optional list of work ids to update.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the works.
+    :param returning: If True, also return the updated rows.
+    :return: A dictionary with the number of updated works and, if requested, the rows.
+    """
+    try:
+        return bulk_update(Work, values, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk updating works: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def delete_works_bulk(ids=None, filters=None, returning=False):
+    """
+    Delete every selected work with a single DELETE ... WHERE statement.
+    :param ids: Optional list of work ids to delete.
+    :param filters: Optional mapping of `column[__operator]` filters selecting the works.
+    :param returning: If True, also return the deleted rows.
+    :return: A dictionary with the number of deleted works and, if requested, the rows.
+    """
+    try:
+        return bulk_delete(Work, ids=ids, filters=filters, returning=returning)
+    except Exception as e:
+        logger.error(f"Error bulk deleting works: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
+def patch_work(work_id, values):
+    """
+    Partially update a work with a single UPDATE ... RETURNING statement.
+    :param work_id: The ID of the work to update.
+    :param values: A dictionary of the columns to set and their new values; falsy values such as 0 are applied.
+    :return: A dictionary containing the updated work's information or None if not found.
+    :raises ValueError: If a column cannot be updated, a value is invalid or a constraint is violated.
+    """
+    try:
+        return update_row(Work, work_id, values)
+    except Exception as e:
+        logger.error(f"Error patching work {work_id}: {e}")
+        raise  # Let the API layer turn the failure into an HTTP error
+
 def update_work(work_id, cost=None, description=None, end_date=None, start_date=None, status=None, vehicle_id=None):
     """
     Update an existing work entry in the database.
@@ -114,16 +178,7 @@ def update_work(work_id, cost=None, description=None, end_date=None, start_date=
         work.vehicle_id = vehicle_id if vehicle_id else work.vehicle_id
 
         db.session.commit()
-        return {
-            "work_id": work.work_id,
-            "cost": work.cost,
-            "created_at": work.created_at,
-            "description": work.description,
-            "end_date": work.end_date,
-            "start_date": work.start_date,
-            "status": work.status,
-            "vehicle_id": work.vehicle_id,
-        }
+        return serializer_for(Work).from_object(work)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating work {work_id}: {e}")
@@ -131,25 +186,17 @@ def update_work(work_id, cost=None, description=None, end_date=None, start_date=
 
 def delete_work(work_id):
     """
-    Delete a work entry from the database.
+    Delete a work with a single DELETE ... WHERE statement.
+    Its tasks, and their invoice items, are deleted with it (ON DELETE CASCADE).
     :param work_id: The ID of the work to delete.
-    :return: The deleted work details or None if not found.
+    :return: True if the work was deleted, False if not found.
+    :raises ValueError: If a foreign key rule forbids the delete.
     """
     try:
-        work = Work.query.get(work_id)
-        if not work:
-            return None
-
-        db.session.delete(work)
-        db.session.commit()
-        return {
-            "work_id": work.work_id,
-            "cost": work.cost,
-            "description": work.description,
-        }
+        return delete_row(Work, work_id)
     except Exception as e:
         logger.error(f"Error deleting work {work_id}: {e}")
-        return {"error": "Internal Server Error"}
+        raise  # Let the API layer turn the failure into an HTTP error
 
 def update_work_status(work_id, new_status):
     """
@@ -170,4 +217,12 @@ def update_work_status(work_id, new_status):
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating work {work_id} status: {e}")
-        return {"error": "Internal Server Error"}
\ No newline at end of file
+        return {"error": "Internal Server Error"}
+
+
+# Representative queries checked for full table scans by `flask db audit-queries`
+register_query("work_service.get_work", lambda: get_work(1))
+register_query("work_service.works_by_vehicle", lambda: get_all_works(filters={"vehicle_id": "1"}))
+register_query("work_service.works_by_status", lambda: get_all_works(filters={"status": "pending"}))
+register_query("work_service.works_newest_first_after_cursor", lambda: get_all_works(sort="-created_at", after=encode_cursor("-created_at", ["2025-01-01 00:00:00", 1])))
+register_query("work_service.works_by_start_date_after_cursor", lambda: get_all_works(sort="start_date", after=encode_cursor("start_date", ["2025-01-01", 1])))
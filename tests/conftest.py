@@ -0,0 +1,116 @@
+import shutil
+from datetime import date
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, insert
+
+from app import create_app
+from config import Config
+from utils.database import db, READ_BIND
+from models.client import Client
+from models.task import Task
+from models.vehicle import Vehicle
+from models.work import Work
+from utils.response_cache import response_cache
+
+# Sample database shipped with the repository; every test works on its own copy
+SAMPLE_DATABASE = Path(__file__).resolve().parent.parent / "instance" / "app.db"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    Application on a temporary copy of the sample database, with a read pool on the same file
+    and the response and report caches disabled so that every request reaches the database.
+    """
+    path = tmp_path / "app.db"
+    shutil.copyfile(SAMPLE_DATABASE, path)
+    uri = f"sqlite:///{path}"
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", uri)
+    monkeypatch.setattr(Config, "READ_DATABASE_URI", uri)
+    monkeypatch.setattr(Config, "SQLALCHEMY_BINDS", {READ_BIND: uri})
+    monkeypatch.setattr(Config, "RESPONSE_CACHE_MAX_BYTES", 0)
+    monkeypatch.setattr(Config, "REPORT_CACHE_TTL", 0)
+    response_cache.clear()
+
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def add_clients(app):
+    """
+    Insert clients, each owning `vehicles` vehicles with `works` works of `tasks` tasks each.
+
+    :return: Function taking the counts and returning the ids of the new clients
+    """
+    serial = iter(range(1_000_000))
+
+    def add(clients=1, vehicles=1, works=1, tasks=1):
+        client_ids = []
+        with app.app_context():
+            for _ in range(clients):
+                n = next(serial)
+                client_id = db.session.execute(insert(Client).returning(Client.client_id), {
+                    "name": f"Client {n}", "email": f"client{n}@example.com", "phone": "910000000",
+                    "address": "Rua B, 1",
+                }).scalar_one()
+                client_ids.append(client_id)
+                vehicle_ids = db.session.execute(insert(Vehicle).returning(Vehicle.vehicle_id), [
+                    {"client_id": client_id, "brand": "Fiat", "model": "Punto", "year": 2010,
+                     "license_plate": f"T{n}-X{v}", "plate_key": f"T{n}X{v}"}
+                    for v in range(vehicles)
+                ]).scalars().all() if vehicles else []
+                work_ids = db.session.execute(insert(Work).returning(Work.work_id), [
+                    {"vehicle_id": vehicle_id, "description": "Revisão", "status": "completed",
+                     "cost": 50.0, "start_date": date(2025, 1, 2), "end_date": date(2025, 1, 3)}
+                    for vehicle_id in vehicle_ids for _ in range(works)
+                ]).scalars().all() if vehicle_ids and works else []
+                if work_ids and tasks:
+                    db.session.execute(insert(Task), [
+                        {"work_id": work_id, "employee_id": 1, "description": "Óleo", "status": "completed",
+                         "start_date": date(2025, 1, 2), "end_date": date(2025, 1, 3)}
+                        for work_id in work_ids for _ in range(tasks)
+                    ])
+            db.session.commit()
+        return client_ids
+    return add
+
+
+@pytest.fixture
+def recorded(app):
+    """
+    Context manager recording the SQL sent to each engine of the application while its block
+    runs, as lists of statements keyed by "primary" and "read".
+    """
+    return lambda: _recorded_statements(app)
+
+
+@contextmanager
+def _recorded_statements(app):
+    with app.app_context():
+        engines = {"primary": db.engines[None], "read": db.engines[READ_BIND]}
+    statements = {route: [] for route in engines}
+    listeners = {}
+    for route, engine in engines.items():
+        def record(connection, cursor, statement, parameters, context, executemany, route=route):
+            statements[route].append(statement)
+        listeners[route] = record
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for route, engine in engines.items():
+            event.remove(engine, "before_cursor_execute", listeners[route])
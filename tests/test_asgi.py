@@ -0,0 +1,82 @@
+# The ASGI entry point answers list and detail GETs itself, with the responses of the Flask app
+
+import asyncio
+
+import pytest
+
+# Headers both entry points must agree on
+COMPARED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Vary", "X-Next-Cursor")
+
+
+@pytest.fixture
+def asgi_app(app):
+    import asgi  # Builds its own module-level app on import, which the Config patches of `app` serve
+    async_app = asgi.AsyncReadApp(app)
+
+    async def refuse(scope, receive, send):
+        raise AssertionError(f"{scope['path']}?{scope['query_string'].decode()} was handed to the Flask app")
+
+    # Every request of these tests must be answered on the async path
+    async_app.wsgi = refuse
+    # One event loop for the whole test, as under an ASGI server: pooled connections belong to it
+    async_app.loop = asyncio.new_event_loop()
+    yield async_app
+    async_app.loop.run_until_complete(async_app.engine.dispose())
+    async_app.loop.close()
+
+
+def _call(asgi_app, path, query_string=b"", headers=()):
+    """
+    Run one GET through the ASGI protocol and return its status, headers and body.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query_string,
+        "root_path": "", "headers": [(b"host", b"localhost"), (b"accept", b"application/json"), *headers],
+        "client": ("127.0.0.1", 1234), "server": ("localhost", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asgi_app.loop.run_until_complete(asgi_app(scope, receive, send))
+    start, body = messages[0], messages[1]
+    headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in start["headers"]}
+    return start["status"], headers, body["body"]
+
+
+@pytest.mark.parametrize("path, query_string", [
+    ("/api/work/", b""),
+    ("/api/work/", b"limit=3"),
+    ("/api/work/", b"status=completed&sort=-created_at&limit=2"),
+    ("/api/work/", b"fields=work_id,status,cost"),
+    ("/api/client/", b"name__contains=Silva"),
+    ("/api/vehicle/", b"client_id=1&sort=created_at"),
+    ("/api/work/1", b""),
+    ("/api/work/1", b"fields=work_id,description"),
+    ("/api/invoice/1", b""),
+])
+def test_async_reads_match_the_flask_responses(app, asgi_app, path, query_string):
+    expected = app.test_client().get(path, query_string=query_string.decode(), headers={"Accept": "application/json"})
+    assert expected.status_code == 200
+
+    status, headers, body = _call(asgi_app, path, query_string)
+
+    assert status == 200
+    assert app.json.loads(body) == expected.get_json()
+    for name in COMPARED_HEADERS:
+        assert headers.get(name.lower()) == expected.headers.get(name)
+
+
+def test_async_read_answers_a_conditional_get(app, asgi_app):
+    etag = app.test_client().get("/api/work/", query_string="limit=2").headers["ETag"]
+
+    status, headers, body = _call(asgi_app, "/api/work/", b"limit=2", [(b"if-none-match", etag.encode())])
+
+    assert status == 304
+    assert headers["etag"] == etag
+    assert body == b""
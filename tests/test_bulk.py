@@ -0,0 +1,82 @@
+# Bulk creates insert the batch with one multi-row INSERT and map the ids back in request order
+
+WORK = {"vehicle_id": 1, "status": "pending", "cost": 10.0, "start_date": "2025-01-10"}
+
+
+def _inserts(statements):
+    return [s for s in statements["primary"] if s.lstrip().upper().startswith("INSERT")]
+
+
+def test_bulk_create_maps_ids_in_request_order(client, recorded):
+    rows = [{**WORK, "description": f"Work {i}"} for i in range(1000)]
+
+    with recorded() as statements:
+        response = client.post("/api/work/bulk", json=rows)
+
+    assert response.status_code == 201
+    ids = response.get_json()["ids"]
+    assert len(_inserts(statements)) == 1
+    for i in (0, 1, 499, 999):
+        assert client.get(f"/api/work/{ids[i]}").get_json()["description"] == f"Work {i}"
+
+
+def test_bulk_create_skips_invalid_and_conflicting_rows(client):
+    rows = [
+        {"name": "Ana", "email": "ana@example.com", "phone": "1", "address": "a"},
+        {"name": "No email"},
+        {"name": "Rui", "email": "ana@example.com", "phone": "2", "address": "b"},
+        {"name": "Eva", "email": "eva@example.com", "phone": "3", "address": "c"},
+    ]
+
+    response = client.post("/api/client/bulk", json=rows)
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert body["ids"][1] is None and body["ids"][2] is None
+    assert client.get(f"/api/client/{body['ids'][0]}").get_json()["name"] == "Ana"
+    assert client.get(f"/api/client/{body['ids'][3]}").get_json()["name"] == "Eva"
+
+
+def test_atomic_bulk_create_rejects_the_whole_batch(client):
+    rows = [
+        {"name": "Ana", "email": "ana@example.com", "phone": "1", "address": "a"},
+        {"name": "Rui", "email": "ana@example.com", "phone": "2", "address": "b"},
+    ]
+
+    response = client.post("/api/client/bulk?atomic=true", json=rows)
+
+    assert response.status_code == 400
+    assert client.get("/api/client/", query_string={"email": "ana@example.com"}).get_json() == []
+
+
+def test_bulk_create_converts_values_by_column_type(client):
+    rows = [{"client_id": 1, "issued_at": "2025-03-31T18:30:00", "total": 100.0, "iva": 0.23}]
+
+    (invoice_id,) = client.post("/api/invoice/bulk", json=rows).get_json()["ids"]
+
+    invoice = client.get(f"/api/invoice/{invoice_id}").get_json()
+    assert invoice["issued_at"].startswith("2025-03-31T18:30:00")
+    assert invoice["total_with_iva"] == 100.23
+
+
+def test_bulk_create_invalidates_cached_lists(app, client):
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = 1024 * 1024
+    before = client.get("/api/work/", query_string={"limit": 500}).get_json()
+
+    client.post("/api/work/bulk", json=[{**WORK, "description": "New"}])
+
+    assert len(client.get("/api/work/", query_string={"limit": 500}).get_json()) == len(before) + 1
+
+
+def test_bulk_create_splits_batches_beyond_the_parameter_limit(client, recorded, monkeypatch):
+    monkeypatch.setattr("utils.bulk.SQLITE_MAX_VARIABLES", 60)  # 10 rows of 6 columns per INSERT
+    rows = [{**WORK, "description": f"Work {i}"} for i in range(25)]
+
+    with recorded() as statements:
+        ids = client.post("/api/work/bulk", json=rows).get_json()["ids"]
+
+    assert len(_inserts(statements)) == 3
+    assert [client.get(f"/api/work/{ids[i]}").get_json()["description"] for i in (0, 10, 24)] == [
+        "Work 0", "Work 10", "Work 24"
+    ]
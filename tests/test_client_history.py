@@ -0,0 +1,50 @@
+# The history of a client is read with a fixed number of queries, however large it is
+
+import pytest
+
+# The client, its vehicles, their works, the works' tasks and the client's invoices
+MAX_QUERIES = 5
+
+
+def _data_selects(statements):
+    # The conditional GET also reads the version of each table; only the history reads count here
+    return [
+        s for s in statements["read"] + statements["primary"]
+        if s.lstrip().upper().startswith("SELECT") and "FROM table_version" not in s
+    ]
+
+
+@pytest.mark.parametrize("vehicles", [1, 500])
+def test_history_query_count_does_not_grow_with_vehicles(client, recorded, add_clients, vehicles):
+    (client_id,) = add_clients(1, vehicles, works=2, tasks=2)
+
+    with recorded() as statements:
+        response = client.get(f"/api/client/{client_id}/history")
+
+    assert response.status_code == 200
+    history = response.get_json()
+    assert len(history["vehicles"]) == vehicles
+    assert sum(len(work["tasks"]) for vehicle in history["vehicles"] for work in vehicle["works"]) == vehicles * 4
+    assert len(_data_selects(statements)) <= MAX_QUERIES
+
+
+def test_history_of_a_client_without_vehicles_skips_the_empty_levels(client, recorded, add_clients):
+    (client_id,) = add_clients(1, vehicles=0)
+
+    with recorded() as statements:
+        response = client.get(f"/api/client/{client_id}/history")
+
+    assert response.get_json()["vehicles"] == []
+    # The client, its vehicles and its invoices: no IN query over an empty list
+    assert len(_data_selects(statements)) == 3
+
+
+def test_history_window_restricts_works_and_invoices(client):
+    history = client.get("/api/client/1/history", query_string={"from": "2030-01-01"}).get_json()
+
+    assert history["invoices"] == []
+    assert all(vehicle["works"] == [] for vehicle in history["vehicles"])
+
+
+def test_history_of_an_unknown_client_is_a_404(client):
+    assert client.get("/api/client/999999/history").status_code == 404
@@ -0,0 +1,83 @@
+# Conditional GETs answer 304 only for current copies, including after a write within the same second
+
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+from werkzeug.http import http_date
+
+from config import Config
+
+PATHS = ["/api/work/", "/api/work/1"]
+
+
+def _date_last_write(table, modifier):
+    """
+    Move the time of the table's last write by `modifier` (an SQLite time modifier) from now.
+
+    :return: The new time, as an HTTP date
+    """
+    with sqlite3.connect(Config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")) as connection:
+        connection.execute(
+            "UPDATE table_version SET updated_at = datetime('now', ?) WHERE table_name = ?", (modifier, table)
+        )
+        (updated_at,) = connection.execute(
+            "SELECT updated_at FROM table_version WHERE table_name = ?", (table,)
+        ).fetchone()
+    return http_date(datetime.fromisoformat(updated_at).replace(tzinfo=timezone.utc))
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_if_none_match_gives_304(client, path):
+    etag = client.get(path).headers["ETag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_write_changes_the_etag(client, path):
+    etag = client.get(path).headers["ETag"]
+
+    client.patch("/api/work/1", json={"description": "Changed"})
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_if_modified_since_gives_304_once_the_second_of_the_write_is_over(client, path):
+    last_modified = _date_last_write("work", "-5 seconds")
+
+    response = client.get(path)
+    assert response.headers["Last-Modified"] == last_modified
+
+    assert client.get(path, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_last_modified_is_withheld_while_the_second_of_the_write_runs(client, path):
+    # A write dated in the current second (ahead, so that the test cannot cross into the next one)
+    last_modified = _date_last_write("work", "+5 seconds")
+
+    response = client.get(path)
+    assert "Last-Modified" not in response.headers
+
+    # Another write in that same second would not move the date: the copy cannot be trusted by it
+    assert client.get(path, headers={"If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_write_in_the_same_second_is_never_hidden_by_a_304(client):
+    client.patch("/api/work/1", json={"description": "First"})
+    copy = client.get("/api/work/1")
+    client.patch("/api/work/1", json={"description": "Second"})
+
+    headers = {"If-Modified-Since": copy.headers["Last-Modified"]} if "Last-Modified" in copy.headers else {}
+    response = client.get("/api/work/1", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["description"] == "Second"
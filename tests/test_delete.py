@@ -0,0 +1,99 @@
+# Deleting a client takes its rows only with `cascade`; an employee with tasks cannot be deleted
+
+import sqlite3
+
+import pytest
+
+from config import Config
+
+
+def _owned(client, client_id):
+    """
+    Count the rows a client owns, by table, and list the ids of its works.
+    """
+    def ids(path, key, **params):
+        return [row[key] for row in client.get(path, query_string={"limit": 500, **params}).get_json()]
+
+    vehicles = ids("/api/vehicle/", "vehicle_id", client_id=client_id)
+    works = ids("/api/work/", "work_id", vehicle_id__in=",".join(map(str, vehicles))) if vehicles else []
+    tasks = ids("/api/task/", "task_id", work_id__in=",".join(map(str, works))) if works else []
+    invoices = ids("/api/invoice/", "invoice_id", client_id=client_id)
+    items = ids("/api/invoice_item/", "item_id", invoice_id__in=",".join(map(str, invoices))) if invoices else []
+    return {"vehicles": len(vehicles), "works": len(works), "tasks": len(tasks),
+            "invoices": len(invoices), "items": len(items)}, works
+
+
+@pytest.fixture
+def invoiced_client(client, add_clients):
+    """
+    A client with two vehicles, each with one work of two tasks, the first work invoiced.
+    """
+    (client_id,) = add_clients(1, 2, 1, 2)
+    _, works = _owned(client, client_id)
+    assert client.post(f"/api/invoice/from-work/{works[0]}", json={}).status_code == 201
+    return client_id
+
+
+def test_client_with_rows_is_kept_without_cascade(client, invoiced_client):
+    before, _ = _owned(client, invoiced_client)
+
+    response = client.delete(f"/api/client/{invoiced_client}")
+
+    assert response.status_code == 400
+    assert "cascade" in response.get_json()["message"]
+    assert client.get(f"/api/client/{invoiced_client}").status_code == 200
+    assert _owned(client, invoiced_client)[0] == before == {
+        "vehicles": 2, "works": 2, "tasks": 4, "invoices": 1, "items": 2,
+    }
+
+
+def test_cascade_deletes_the_client_with_everything_it_owns(client, invoiced_client):
+    response = client.delete(f"/api/client/{invoiced_client}", query_string={"cascade": "true"})
+
+    assert response.status_code == 204
+    assert client.get(f"/api/client/{invoiced_client}").status_code == 404
+    owned, _ = _owned(client, invoiced_client)
+    assert owned == {"vehicles": 0, "works": 0, "tasks": 0, "invoices": 0, "items": 0}
+
+
+def test_client_without_rows_is_deleted_without_cascade(client, add_clients):
+    (client_id,) = add_clients(1, 0)
+
+    assert client.delete(f"/api/client/{client_id}").status_code == 204
+    assert client.get(f"/api/client/{client_id}").status_code == 404
+
+
+def test_unknown_client_is_a_404(client):
+    assert client.delete("/api/client/999999", query_string={"cascade": "true"}).status_code == 404
+
+
+@pytest.mark.parametrize("delete", [
+    lambda client: client.delete("/api/employee/1"),
+    lambda client: client.delete("/api/employee/bulk", json={"ids": [1]}),
+])
+def test_employee_with_tasks_is_kept(client, delete):
+    tasks = len(client.get("/api/task/", query_string={"employee_id": 1, "limit": 500}).get_json())
+    assert tasks
+
+    response = delete(client)
+
+    assert response.status_code == 400
+    assert "still has tasks" in response.get_json()["message"]
+    assert client.get("/api/employee/1").status_code == 200
+    assert len(client.get("/api/task/", query_string={"employee_id": 1, "limit": 500}).get_json()) == tasks
+
+
+def test_trigger_blocks_employee_deletes_outside_the_api(client):
+    with pytest.raises(sqlite3.IntegrityError, match="still has tasks"):
+        with sqlite3.connect(Config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")) as connection:
+            connection.execute("DELETE FROM employee WHERE employee_id = 1")
+
+
+def test_employee_without_tasks_is_deleted(client):
+    employee = client.post("/api/employee/", json={
+        "name": "Eva", "email": "eva@example.com", "phone": "912000000", "role": "mechanic",
+        "hired_date": "2025-01-02",
+    }).get_json()
+
+    assert client.delete(f"/api/employee/{employee['employee_id']}").status_code == 204
+    assert client.get("/api/employee/", query_string={"employee_id": employee["employee_id"]}).get_json() == []
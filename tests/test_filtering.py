@@ -0,0 +1,39 @@
+# Control parameters such as `cascade` or `from` are not read as filters, and invalid filters are client errors
+
+import logging
+
+import pytest
+
+
+@pytest.mark.parametrize("name, value", [("cascade", "true"), ("atomic", "true"), ("from", "2025-01-01"), ("to", "2025-12-31")])
+def test_list_ignores_control_parameters_beside_a_filter(client, add_clients, name, value):
+    (client_id,) = add_clients(1, 1, 0, 0)
+
+    response = client.get("/api/client/", query_string={name: value, "client_id": client_id})
+
+    assert response.status_code == 200
+    assert [row["client_id"] for row in response.get_json()] == [client_id]
+
+
+def test_bulk_delete_accepts_cascade_with_a_filter(client, add_clients):
+    kept, deleted = add_clients(2, 1, 1, 1)
+
+    response = client.delete("/api/client/bulk", json={}, query_string={"cascade": "true", "client_id": deleted})
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 1
+    assert client.get(f"/api/client/{deleted}").status_code == 404
+    assert client.get(f"/api/client/{kept}").status_code == 200
+    assert client.get("/api/vehicle/", query_string={"client_id": deleted}).get_json() == []
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/work/", {"sort": "cost"}),
+    ("/api/client/", {"nickname": "x"}),
+    ("/api/task/", {"after": "not-a-cursor"}),
+])
+def test_client_errors_are_not_logged_as_errors(client, caplog, path, params):
+    response = client.get(path, query_string=params)
+
+    assert response.status_code == 400
+    assert [record for record in caplog.records if record.levelno >= logging.ERROR] == []
@@ -0,0 +1,86 @@
+# `?include=` loads each relationship level with one query per 500 parent keys, however many rows there are
+
+from math import ceil
+
+import pytest
+
+from utils.includes import INCLUDE_CHUNK_SIZE
+
+INCLUDE = "vehicles.works.tasks"
+
+
+def _reads(statements):
+    # Data queries only: the conditional GET also reads the version of each embedded table
+    return len([
+        s for s in statements["read"] + statements["primary"]
+        if s.lstrip().upper().startswith("SELECT") and "FROM table_version" not in s
+    ])
+
+
+def _chunks(*keys):
+    # Queries needed for levels whose parents hold these numbers of keys
+    return sum(ceil(count / INCLUDE_CHUNK_SIZE) for count in keys)
+
+
+def _get(client, recorded, path, **params):
+    with recorded() as statements:
+        response = client.get(path, query_string=params)
+    assert response.status_code == 200
+    return response.get_json(), _reads(statements)
+
+
+@pytest.mark.parametrize("clients, vehicles, works, tasks", [(1, 1, 1, 1), (50, 12, 2, 2)])
+def test_list_include_queries_are_chunked_by_parent_keys(client, recorded, add_clients, clients, vehicles, works, tasks):
+    client_ids = set(add_clients(clients, vehicles, works, tasks))
+
+    page, count = _get(client, recorded, "/api/client/", limit=50, sort="-client_id", include=INCLUDE)
+
+    # The page, then vehicles of the page's clients, works of their vehicles and tasks of those works
+    assert count == 1 + _chunks(len(page), len(page) * vehicles, len(page) * vehicles * works)
+    embedded = sum(
+        len(work["tasks"])
+        for row in page if row["client_id"] in client_ids
+        for vehicle in row["vehicles"] for work in vehicle["works"]
+    )
+    assert embedded == clients * vehicles * works * tasks
+
+
+@pytest.mark.parametrize("vehicles, works, tasks", [(1, 1, 1), (600, 2, 2)])
+def test_detail_include_queries_are_chunked_by_parent_keys(client, recorded, add_clients, vehicles, works, tasks):
+    (client_id,) = add_clients(1, vehicles, works, tasks)
+
+    row, count = _get(client, recorded, f"/api/client/{client_id}", include=INCLUDE)
+
+    # The client, then vehicles of one client, works of each vehicle and tasks of each work
+    assert count == 1 + _chunks(1, vehicles, vehicles * works)
+    assert len(row["vehicles"]) == vehicles
+    assert sum(len(work["tasks"]) for vehicle in row["vehicles"] for work in vehicle["works"]) == vehicles * works * tasks
+
+
+@pytest.mark.parametrize("include, levels", [("vehicles", 1), ("vehicles.works", 2), (INCLUDE, 3)])
+def test_each_include_level_costs_one_query(client, recorded, add_clients, include, levels):
+    (client_id,) = add_clients(1, 200, 2, 1)
+
+    _, count = _get(client, recorded, f"/api/client/{client_id}", include=include)
+
+    assert count == 1 + levels
+
+
+def test_include_levels_beyond_the_chunk_size_split_the_keys(client, recorded, add_clients, monkeypatch):
+    monkeypatch.setattr("utils.includes.INCLUDE_CHUNK_SIZE", 7)
+    (client_id,) = add_clients(1, 20, 1, 3)
+
+    row, count = _get(client, recorded, f"/api/client/{client_id}", include=INCLUDE)
+
+    # 20 vehicles and 20 works: three queries each
+    assert count == 1 + 1 + 3 + 3
+    assert [len(work["tasks"]) for vehicle in row["vehicles"] for work in vehicle["works"]] == [3] * 20
+
+
+def test_include_embeds_many_to_one_relationships(client, recorded):
+    row, count = _get(client, recorded, "/api/task/1", include="work.vehicle.client,employee")
+
+    assert count == 1 + 4
+    assert row["work"]["work_id"] == row["work_id"]
+    assert row["work"]["vehicle"]["client"]["client_id"] == row["work"]["vehicle"]["client_id"]
+    assert row["employee"]["employee_id"] == row["employee_id"]
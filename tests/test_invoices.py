@@ -0,0 +1,60 @@
+# A task is billed at most once, even when two requests invoice the same work at the same time
+
+from sqlalchemy import event
+
+from utils.database import db
+
+
+def _work_of(client, client_id):
+    (vehicle,) = client.get("/api/vehicle/", query_string={"client_id": client_id}).get_json()
+    (work,) = client.get("/api/work/", query_string={"vehicle_id": vehicle["vehicle_id"]}).get_json()
+    return work["work_id"]
+
+
+def test_work_is_invoiced_once(client, add_clients):
+    work_id = _work_of(client, *add_clients(1, 1, 1, 2))
+
+    first = client.post(f"/api/invoice/from-work/{work_id}", json={})
+    second = client.post(f"/api/invoice/from-work/{work_id}", json={})
+
+    assert first.status_code == 201
+    assert len(first.get_json()["items"]) == 2
+    assert second.status_code == 400
+    assert "already been invoiced" in second.get_json()["message"]
+
+
+def test_concurrent_invoice_of_the_same_work_is_rejected(app, client, add_clients):
+    work_id = _work_of(client, *add_clients(1, 1, 1, 1))
+    invoices = len(client.get("/api/invoice/", query_string={"limit": 500}).get_json())
+
+    def bill_first(connection, cursor, statement, parameters, context, executemany):
+        # Another request inserts its item after this one checked the work, before it inserts its own
+        if statement.startswith("INSERT INTO invoice_item"):
+            connection.connection.cursor().execute(
+                "INSERT INTO invoice_item (invoice_id, task_id, description, cost) "
+                "SELECT 1, task_id, 'Elsewhere', 1 FROM task WHERE work_id = ?", (work_id,)
+            )
+
+    with app.app_context():
+        engine = db.engines[None]
+    event.listen(engine, "before_cursor_execute", bill_first)
+    try:
+        response = client.post(f"/api/invoice/from-work/{work_id}", json={})
+    finally:
+        event.remove(engine, "before_cursor_execute", bill_first)
+
+    assert response.status_code == 400
+    assert "already been invoiced" in response.get_json()["message"]
+    # The invoice inserted before the items was rolled back with them
+    assert len(client.get("/api/invoice/", query_string={"limit": 500}).get_json()) == invoices
+
+
+def test_invoice_item_for_a_billed_task_is_rejected(client):
+    item = client.get("/api/invoice_item/1").get_json()
+    row = {"invoice_id": item["invoice_id"], "task_id": item["task_id"], "description": "Again", "cost": 1.0}
+
+    response = client.post("/api/invoice_item/bulk", json=[row])
+
+    assert response.status_code == 400
+    (error,) = response.get_json()["errors"]
+    assert "invoice_item.task_id" in error["message"]
@@ -0,0 +1,58 @@
+# PATCH applies exactly the given columns, falsy values included, in one UPDATE ... RETURNING
+
+import pytest
+
+
+def _statements(statements):
+    # Transaction control is not part of the work done for the request
+    return [
+        s for s in statements["primary"] + statements["read"]
+        if s.split()[0].upper() not in ("BEGIN", "COMMIT", "ROLLBACK")
+    ]
+
+
+@pytest.mark.parametrize("path, values", [
+    ("/api/work/1", {"cost": 0}),
+    ("/api/work/1", {"description": ""}),
+    ("/api/invoice/1", {"iva": 0}),
+    ("/api/task/1", {"end_date": None}),
+    ("/api/setting/1", {"value": ""}),
+])
+def test_patch_persists_falsy_values(client, path, values):
+    response = client.patch(path, json=values)
+
+    assert response.status_code == 200, response.get_json()
+    for name, value in values.items():
+        assert response.get_json()[name] == value
+        assert client.get(path).get_json()[name] == value
+
+
+def test_patch_recomputes_the_derived_total_of_an_invoice(client):
+    invoice = client.patch("/api/invoice/1", json={"iva": 0}).get_json()
+
+    assert invoice["total_with_iva"] == invoice["total"]
+
+
+@pytest.mark.parametrize("path, values", [
+    ("/api/work/999999", {"cost": 0}),
+    ("/api/invoice/999999", {"iva": 0}),
+    ("/api/client/999999", {"name": "Ana"}),
+])
+def test_patch_of_an_unknown_id_is_a_404(client, path, values):
+    assert client.patch(path, json=values).status_code == 404
+
+
+@pytest.mark.parametrize("path, values", [
+    ("/api/work/1", {"cost": 0}),
+    ("/api/invoice/1", {"iva": 0}),
+    ("/api/work/999999", {"cost": 0}),
+])
+def test_patch_runs_a_single_update_returning(client, recorded, path, values):
+    with recorded() as statements:
+        client.patch(path, json=values)
+
+    # No SELECT before the UPDATE, and none after it: the row comes back from RETURNING
+    executed = _statements(statements)
+    assert len(executed) == 1, executed
+    assert executed[0].lstrip().upper().startswith("UPDATE")
+    assert "RETURNING" in executed[0].upper()
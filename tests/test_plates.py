@@ -0,0 +1,23 @@
+# Vehicles are found under /api/vehicle/plate by full plate or by prefix, typed in any way
+
+import pytest
+
+
+@pytest.mark.parametrize("plate", ["AA-12-BC", "aa 12 bc", "aa12bc"])
+def test_plate_lookup_ignores_case_spaces_and_dashes(client, plate):
+    assert client.get(f"/api/vehicle/plate/{plate}").get_json()["vehicle_id"] == 1
+
+
+@pytest.mark.parametrize("prefix", ["AA-1", "aa 1", "aa12b"])
+def test_plate_prefix_lists_matching_vehicles_in_plate_order(client, prefix):
+    response = client.get("/api/vehicle/plate", query_string={"prefix": prefix})
+
+    assert response.status_code == 200
+    plates = [row["license_plate"] for row in response.get_json()]
+    assert "AA-12-BC" in plates
+    assert plates == sorted(plates, key=lambda plate: plate.replace("-", "").replace(" ", "").upper())
+
+
+@pytest.mark.parametrize("query", [{}, {"prefix": " - "}])
+def test_plate_prefix_without_characters_is_a_400(client, query):
+    assert client.get("/api/vehicle/plate", query_string=query).status_code == 400
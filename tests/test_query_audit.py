@@ -0,0 +1,48 @@
+# Service reads are checked against the plans of the statements they actually execute
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models.invoice import Invoice
+from models.work import Work
+from utils.database import db
+from utils.date_range import date_range_clauses
+from utils.query_audit import audit_queries, captured_statements, explain
+
+
+def test_registered_reads_do_not_scan_large_tables(app):
+    with app.app_context():
+        plans, violations = audit_queries(app.config["QUERY_AUDIT_SMALL_TABLES"])
+    assert plans
+    assert violations == []
+
+
+def test_audit_queries_command_passes(app):
+    result = app.test_cli_runner().invoke(args=["db", "audit-queries"])
+    assert result.exit_code == 0, result.output
+    assert "no full table scans" in result.output
+
+
+def test_date_range_includes_the_whole_last_day(app):
+    with app.app_context():
+        for issued_at in (datetime(2025, 2, 28, 23, 59), datetime(2025, 3, 1), datetime(2025, 3, 31, 18, 30),
+                          datetime(2025, 4, 1)):
+            db.session.add(Invoice(client_id=1, issued_at=issued_at, total=10, iva=0.23, total_with_iva=12.3))
+        db.session.commit()
+        statement = (
+            select(Invoice.issued_at)
+            .where(*date_range_clauses(Invoice.issued_at, "2025-03-01", "2025-03-31"))
+            .order_by(Invoice.issued_at)
+        )
+        assert db.session.execute(statement).scalars().all() == [datetime(2025, 3, 1), datetime(2025, 3, 31, 18, 30)]
+
+
+def test_date_range_seeks_the_index_of_the_column(app):
+    with app.app_context():
+        with captured_statements() as statements:
+            db.session.execute(
+                select(Work.work_id).where(*date_range_clauses(Work.end_date, "2024-12-01", "2024-12-31"))
+            ).all()
+        plan = explain(*statements[0])
+    assert plan == ["SEARCH work USING COVERING INDEX ix_work_end_date (end_date>? AND end_date<?)"]
@@ -0,0 +1,73 @@
+# Statements of a GET request go to the read engine, everything written goes to the primary
+
+import pytest
+
+GET_PATHS = [
+    "/api/client/",
+    "/api/client/1?include=vehicles.works.tasks",
+    "/api/client/1/history",
+    "/api/vehicle/?stream=1",
+    "/api/vehicle/plate/AA-12-BC",
+    "/api/vehicle/plate?prefix=aa 1",
+    "/api/work/?status=completed&sort=-created_at",
+    "/api/work/1",
+    "/api/task/",
+    "/api/invoice/1",
+    "/api/invoice_item/",
+    "/api/setting/",
+    "/api/employee/",
+    "/api/revenue/monthly",
+    "/api/reports/works-by-status",
+    "/api/reports/top-vehicles",
+]
+
+WORK = {
+    "vehicle_id": 1, "description": "Revisão", "status": "pending",
+    "cost": 80.0, "start_date": "2025-01-10",
+}
+
+
+def _writes(statements):
+    return [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))]
+
+
+@pytest.mark.parametrize("path", GET_PATHS)
+def test_get_reads_only_from_the_read_engine(client, recorded, path):
+    with recorded() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    assert statements["read"]
+    assert statements["primary"] == []
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("put", "/api/work/1", WORK),
+    ("patch", "/api/work/1", {"cost": 95.0}),
+    ("post", "/api/work/bulk", [WORK, WORK]),
+    ("patch", "/api/work/bulk", {"ids": [1, 2], "values": {"status": "in_progress"}}),
+    ("delete", "/api/task/bulk", {"ids": [1]}),
+    ("post", "/api/batch/", [
+        {"op": "create", "resource": "work", "data": WORK, "ref": "work"},
+        {"op": "create", "resource": "task", "data": {
+            "work_id": {"$ref": "work"}, "employee_id": 1, "description": "Óleo",
+            "status": "pending", "start_date": "2025-01-10",
+        }},
+        {"op": "update", "resource": "vehicle", "id": 1, "data": {"year": 2016}},
+        {"op": "delete", "resource": "invoice_item", "id": 1},
+    ]),
+])
+def test_writes_go_to_the_primary_engine(client, recorded, method, path, body):
+    with recorded() as statements:
+        response = getattr(client, method)(path, json=body)
+    assert response.status_code < 300, response.get_json()
+    assert _writes(statements["primary"])
+    # Not even the reads of a mutating request, which must see its own transaction
+    assert statements["read"] == []
+
+
+def test_get_after_a_write_sees_it_through_the_read_engine(client, recorded):
+    client.patch("/api/work/1", json={"description": "Mudança de óleo"})
+    with recorded() as statements:
+        response = client.get("/api/work/1")
+    assert response.get_json()["description"] == "Mudança de óleo"
+    assert statements["primary"] == []
@@ -0,0 +1,40 @@
+# Report endpoints: date windows, validation errors and unexpected failures
+
+import pytest
+
+import api.report
+
+REPORT_PATHS = [
+    "/api/reports/works-by-status",
+    "/api/reports/turnaround",
+    "/api/reports/tasks-by-employee",
+    "/api/reports/top-vehicles",
+]
+
+
+@pytest.mark.parametrize("path", REPORT_PATHS)
+def test_report_accepts_a_date_window(client, path):
+    response = client.get(path, query_string={"from": "2024-12-01", "to": "2024-12-31"})
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list)
+
+
+@pytest.mark.parametrize("path", REPORT_PATHS)
+def test_report_rejects_an_invalid_date(client, path):
+    response = client.get(path, query_string={"from": "01/12/2024"})
+    assert response.status_code == 400
+    assert "'from'" in response.get_json()["message"]
+
+
+def test_top_vehicles_rejects_a_limit_below_one(client):
+    assert client.get("/api/reports/top-vehicles?limit=0").status_code == 400
+
+
+def test_report_failure_returns_a_500(client, monkeypatch):
+    def fail(**kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(api.report, "turnaround_by_month", fail)
+    response = client.get("/api/reports/turnaround")
+    assert response.status_code == 500
+    assert response.get_json()["message"] == "An error occurred while computing the turnaround report."
@@ -0,0 +1,53 @@
+# Cached list responses are checked against the table versions, so writes by any process invalidate them
+
+import sqlite3
+
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def cached_client(app, client):
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = 1024 * 1024
+    return client
+
+
+def _other_worker(sql, *parameters):
+    # A connection of its own, as another worker process or a script would have
+    with sqlite3.connect(Config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")) as connection:
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute(sql, parameters)
+
+
+def test_repeated_list_is_served_from_the_cache(cached_client, recorded):
+    cached_client.get("/api/client/")
+
+    with recorded() as statements:
+        response = cached_client.get("/api/client/")
+
+    assert response.headers["X-Cache"] == "HIT"
+    # Only the version check reaches the database
+    (select,) = [s for s in statements["read"] + statements["primary"] if s.lstrip().upper().startswith("SELECT")]
+    assert "FROM table_version" in select
+
+
+def test_write_from_another_process_invalidates_the_cache(cached_client):
+    cached_client.get("/api/client/", query_string={"limit": 500})
+
+    _other_worker("UPDATE client SET name = ? WHERE client_id = 1", "Renamed elsewhere")
+
+    response = cached_client.get("/api/client/", query_string={"limit": 500})
+    assert response.headers["X-Cache"] == "MISS"
+    assert next(row for row in response.get_json() if row["client_id"] == 1)["name"] == "Renamed elsewhere"
+
+
+def test_cascaded_delete_invalidates_the_child_table(cached_client, add_clients):
+    (client_id,) = add_clients(1, 2, 1, 1)
+    query = {"client_id": client_id}
+    assert len(cached_client.get("/api/vehicle/", query_string=query).get_json()) == 2
+
+    # The vehicles go through ON DELETE CASCADE, whose deletes fire the vehicle table's version trigger
+    _other_worker("DELETE FROM client WHERE client_id = ?", client_id)
+
+    assert cached_client.get("/api/vehicle/", query_string=query).get_json() == []
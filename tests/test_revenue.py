@@ -0,0 +1,47 @@
+# The revenue rollups kept by triggers match a full recompute after every kind of invoice write
+
+from services.revenue_service import rebuild_revenue
+
+
+def _drift(app):
+    with app.app_context():
+        report = rebuild_revenue(verify_only=True)
+    return {table: differences for table, differences in report.items() if differences}
+
+
+def _invoice(client_id, issued_at, total):
+    return {"client_id": client_id, "issued_at": issued_at, "total": total, "iva": round(total * 0.23, 2)}
+
+
+def _work_of(client, client_id):
+    (vehicle, *_) = client.get("/api/vehicle/", query_string={"client_id": client_id}).get_json()
+    (work,) = client.get("/api/work/", query_string={"vehicle_id": vehicle["vehicle_id"]}).get_json()
+    return work["work_id"]
+
+
+def test_rollups_have_no_drift_after_invoice_writes(app, client, add_clients):
+    assert _drift(app) == {}
+    kept, cascaded = add_clients(2, 1, 1, 2)
+
+    # Creates: single, bulk and generated from a work
+    single = client.post("/api/invoice/", json=_invoice(kept, "2025-03-10", 100.0)).get_json()["invoice_id"]
+    bulk = client.post("/api/invoice/bulk", json=[
+        _invoice(kept, "2025-03-20", 40.0),
+        _invoice(kept, "2025-04-02", 60.0),
+        _invoice(cascaded, "2025-03-15", 80.0),
+        _invoice(cascaded, "2025-05-01", 20.0),
+    ]).get_json()["ids"]
+    assert client.post(f"/api/invoice/from-work/{_work_of(client, cascaded)}", json={"issued_at": "2025-04-09"}).status_code == 201
+
+    # Updates: amounts, month and client, through PUT, PATCH and a bulk UPDATE
+    assert client.put(f"/api/invoice/{single}", json=_invoice(kept, "2025-04-10", 120.0)).status_code == 200
+    assert client.patch(f"/api/invoice/{bulk[0]}", json={"client_id": cascaded, "issued_at": "2025-06-01"}).status_code == 200
+    assert client.patch("/api/invoice/bulk", json={"ids": [bulk[1], bulk[3]], "values": {"total": 10.0}}).status_code == 200
+
+    # Deletes: single, bulk, and every invoice of a client deleted with cascade
+    assert client.delete(f"/api/invoice/{bulk[2]}").status_code == 204
+    assert client.delete("/api/invoice/bulk", json={"ids": [bulk[1]]}).status_code == 200
+    assert client.delete(f"/api/client/{cascaded}", query_string={"cascade": "true"}).status_code == 204
+
+    assert _drift(app) == {}
+    assert client.get("/api/invoice/", query_string={"client_id": cascaded}).get_json() == []
@@ -0,0 +1,39 @@
+# The in-process settings cache is checked against the setting table's version on every read
+
+import sqlite3
+
+from config import Config
+
+
+def _key(client, key_name):
+    return client.get(f"/api/setting/key/{key_name}")
+
+
+def test_setting_read_checks_only_the_table_version(client, recorded):
+    _key(client, "currency")
+
+    with recorded() as statements:
+        response = _key(client, "currency")
+
+    assert response.get_json()["value"] == "EUR"
+    # Version markers only (the conditional GET reads one too): the setting table itself is not read
+    selects = [s for s in statements["read"] + statements["primary"] if s.lstrip().upper().startswith("SELECT")]
+    assert selects and all("FROM table_version" in s for s in selects)
+
+
+def test_api_write_is_seen_by_the_next_read(client):
+    _key(client, "labor_cost")
+
+    client.patch("/api/setting/9", json={"value": "55"})
+
+    assert _key(client, "labor_cost").get_json()["value"] == "55"
+
+
+def test_write_from_another_process_is_seen_by_the_next_read(client):
+    _key(client, "currency")
+
+    # A connection of its own, as another worker process or a script would have
+    with sqlite3.connect(Config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")) as connection:
+        connection.execute("UPDATE setting SET value = 'USD' WHERE key_name = 'currency'")
+
+    assert _key(client, "currency").get_json()["value"] == "USD"
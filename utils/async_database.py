@@ -0,0 +1,44 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from utils.database import READ_BIND, configure_engine, db
+
+# asyncio drivers used in place of the synchronous driver of each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url):
+    """
+    Turn the URL of a synchronous engine into the URL of its asyncio counterpart.
+
+    :param url: sqlalchemy.engine.URL of a synchronous engine
+    :return: sqlalchemy.engine.URL using the backend's asyncio driver
+    :raises ValueError: If no asyncio driver is known for the backend
+    """
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for the '{backend}' backend.")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_read_engine(app):
+    """
+    Create the asyncio engine serving the read endpoints of the ASGI entry point.
+
+    It reads the same database as the read engine of the Flask app (the primary one when
+    the read pool is disabled), through the resolved URL Flask-SQLAlchemy built, and its
+    connections get the same PRAGMA profile plus `query_only`. The connections are pooled like
+    the synchronous ones: aiosqlite defaults to NullPool for database files, which would open
+    a connection and its worker thread, and replay the PRAGMAs, on every request.
+
+    Must be called within an application context.
+
+    :param app: The Flask application
+    :return: tuple: The AsyncEngine and an `async_sessionmaker` bound to it
+    """
+    sync_engine = db.engines.get(READ_BIND, db.engine)
+    engine = create_async_engine(async_database_url(sync_engine.url), poolclass=AsyncAdaptedQueuePool)
+    configure_engine(engine.sync_engine, {**app.config["SQLITE_PRAGMAS"], "query_only": "ON"})
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
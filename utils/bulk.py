@@ -0,0 +1,466 @@
+from datetime import datetime
+
+from flask import current_app, request
+from flask_restx import fields
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, String, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from utils.database import db
+from utils.filtering import compile_filters
+from utils.serializers import serializer_for
+
+# Bound parameters SQLite accepts in one statement (SQLITE_MAX_VARIABLE_NUMBER since 3.32)
+SQLITE_MAX_VARIABLES = 32766
+
+# Query string parameter understood by every bulk endpoint
+BULK_PARAMS = {
+    "atomic": "Set to true to reject the whole batch if any row is invalid (default: skip invalid rows)",
+}
+
+# Query string parameter understood by the bulk update and delete endpoints, which also
+# accept the `column[__operator]=value` filters of the list endpoints
+BULK_CHANGE_PARAMS = {
+    "returning": "Set to true to return the affected rows (default: only their count)",
+}
+
+# Query string parameter of the delete endpoints of resources that own a subtree of rows
+CASCADE_PARAMS = {
+    "cascade": "Set to true to also delete the rows that belong to it (default: refuse when there are any)",
+}
+
+
+def bulk_result_model(namespace):
+    """
+    Swagger model of the response of a bulk create endpoint.
+
+    :param namespace: Flask-RESTx namespace to register the model on
+    """
+    error = namespace.model("BulkRowError", {
+        "index": fields.Integer(description="Position of the row in the request array"),
+        "message": fields.String(description="Why the row was rejected"),
+    })
+    return namespace.model("BulkCreateResult", {
+        "ids": fields.List(fields.Integer, description="Generated ids, in request order (null for rejected rows)"),
+        "errors": fields.List(fields.Nested(error), description="Rejected rows"),
+    })
+
+
+def bulk_change_request_model(namespace):
+    """
+    Swagger model of the body of a bulk update or delete.
+
+    :param namespace: Flask-RESTx namespace to register the model on
+    """
+    return namespace.model("BulkChangeRequest", {
+        "ids": fields.List(fields.Integer, description="Ids of the rows to change (optional when filters are given)"),
+        "values": fields.Raw(description="Columns to set and their new values (bulk update only)"),
+    })
+
+
+def bulk_change_result_model(namespace, swagger_model):
+    """
+    Swagger model of the response of a bulk update or delete.
+
+    :param namespace: Flask-RESTx namespace to register the model on
+    :param swagger_model: Model of the resource, used for the returned rows
+    """
+    return namespace.model(f"{swagger_model.name}BulkChangeResult", {
+        "count": fields.Integer(description="Number of rows affected"),
+        "rows": fields.List(fields.Nested(swagger_model), description="The affected rows, when `returning` is set"),
+    })
+
+
+def bulk_payload():
+    """
+    Read the JSON array of rows sent to a bulk endpoint.
+
+    :return: list: The rows of the request
+    :raises ValueError: If the body is not a non-empty array or exceeds BULK_MAX_ROWS
+    """
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("The request body must be a non-empty JSON array.")
+    limit = current_app.config["BULK_MAX_ROWS"]
+    if len(rows) > limit:
+        raise ValueError(f"A batch cannot contain more than {limit} rows.")
+    return rows
+
+
+def atomic_arg():
+    """
+    Read the `atomic` flag of the current request.
+    """
+    return request.args.get("atomic", "").lower() in ("1", "true", "yes")
+
+
+def bulk_change_payload():
+    """
+    Read the JSON object sent to a bulk update or delete endpoint.
+
+    :return: dict: The body of the request (empty when there is none)
+    :raises ValueError: If the body is not a JSON object
+    """
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    if not isinstance(body, dict):
+        raise ValueError("The request body must be a JSON object.")
+    return body
+
+
+def returning_arg():
+    """
+    Read the `returning` flag of the current request.
+    """
+    return request.args.get("returning", "").lower() in ("1", "true", "yes")
+
+
+def cascade_arg():
+    """
+    Read the `cascade` flag of the current request.
+    """
+    return request.args.get("cascade", "").lower() in ("1", "true", "yes")
+
+
+def bulk_status(result):
+    """
+    HTTP status of a bulk create response: 201 when every row was created, 207 when only
+    some were, and 400 when none were.
+    """
+    if not result["errors"]:
+        return 201
+    return 207 if any(row_id is not None for row_id in result["ids"]) else 400
+
+
+def _insertable_columns(model):
+    """
+    Columns a client may provide: everything except the primary key and server-managed columns.
+    """
+    return [
+        column for column in model.__table__.columns
+        if not column.primary_key and column.server_default is None
+    ]
+
+
+def _coerce(column, value):
+    """
+    Check a JSON value against a column's type and convert it to the matching Python type.
+    """
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        valid = isinstance(value, bool)
+    elif isinstance(column_type, Integer):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(column_type, (Float, Numeric)):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(column_type, (Date, DateTime)):
+        valid = isinstance(value, str)
+        if valid:
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"'{column.name}' must be an ISO 8601 date.")
+            return parsed if isinstance(column_type, DateTime) else parsed.date()
+    else:
+        valid = isinstance(value, str)
+        if valid and isinstance(column_type, String) and column_type.length and len(value) > column_type.length:
+            raise ValueError(f"'{column.name}' must be at most {column_type.length} characters long.")
+    if not valid:
+        raise ValueError(f"'{column.name}' has an invalid type.")
+    return value
+
+
+def prepare_row(model, row, prepare=None):
+    """
+    Validate one incoming row and turn it into the values of an INSERT.
+
+    Every prepared row carries the same keys, which is what lets the whole batch go out as a
+    single multi-row INSERT.
+
+    :param model: SQLAlchemy model class
+    :param row: Row as received in the request
+    :param prepare: Optional hook receiving the converted values and returning them updated
+                    (e.g. to compute derived columns)
+    :return: dict: Column values of the row
+    :raises ValueError: If the row is invalid
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Each row must be a JSON object.")
+
+    columns = _insertable_columns(model)
+    values = {}
+    for column in columns:
+        value = row.get(column.name)
+        if value is not None:
+            values[column.name] = _coerce(column, value)
+    if prepare:
+        values = prepare(values)
+
+    for column in columns:
+        if values.get(column.name) is not None:
+            continue
+        if column.default is not None and column.default.is_scalar:
+            values[column.name] = column.default.arg
+        elif column.nullable:
+            values[column.name] = None
+        else:
+            raise ValueError(f"'{column.name}' is required.")
+    return values
+
+
+def _insert_many(table, rows):
+    """
+    Insert rows with multi-row INSERT ... VALUES statements and return their ids in row order.
+
+    Rows are sent in chunks that stay within SQLite's limit on bound parameters (a single
+    statement for any batch of up to BULK_MAX_ROWS rows of a table of this schema). The SQL is
+    built for the driver directly, with the values converted by each column's type: compiling
+    a Core multi-row insert walks every one of its thousands of parameters, which costs more
+    than sending the rows one by one. SQLite gives the rows of one INSERT consecutive rowids,
+    in VALUES order, while it holds the write lock, so the ids of a chunk are the ones ending
+    at the `last_insert_rowid()` it reports.
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect
+    names = list(rows[0])
+    processors = [table.c[name].type.bind_processor(dialect) for name in names]
+    columns = ", ".join(dialect.identifier_preparer.quote(name) for name in names)
+    row_placeholders = f"({', '.join('?' * len(names))})"
+
+    chunk_size = max(1, SQLITE_MAX_VARIABLES // len(names))
+    ids = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        parameters = tuple(
+            processor(row[name]) if processor else row[name]
+            for row in chunk
+            for name, processor in zip(names, processors)
+        )
+        last_id = connection.exec_driver_sql(
+            f"INSERT INTO {dialect.identifier_preparer.format_table(table)} ({columns}) "
+            f"VALUES {', '.join([row_placeholders] * len(chunk))}",
+            parameters,
+        ).lastrowid
+        ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+    return ids
+
+
+def bulk_insert(model, rows, atomic=False, prepare=None):
+    """
+    Insert many rows in one transaction, with one multi-row INSERT when possible.
+
+    Invalid rows are reported and skipped, unless `atomic` is set, in which case any invalid
+    row rejects the whole batch. If the fast path hits a constraint violation, the rows are
+    retried one by one inside savepoints so that only the offending rows are rejected.
+
+    :param model: SQLAlchemy model class
+    :param rows: List of rows as received in the request
+    :param atomic: Whether a single invalid row rejects the whole batch
+    :param prepare: Optional per-row hook (see `prepare_row`)
+    :return: dict: Generated ids in request order (None for rejected rows) and the list of errors
+    """
+    ids = [None] * len(rows)
+    errors, prepared = [], []
+    for index, row in enumerate(rows):
+        try:
+            prepared.append((index, prepare_row(model, row, prepare)))
+        except ValueError as e:
+            errors.append({"index": index, "message": str(e)})
+
+    if not prepared or (atomic and errors):
+        return {"ids": ids, "errors": errors}
+
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0]
+    try:
+        try:
+            with db.session.begin_nested():
+                new_ids = _insert_many(table, [values for _, values in prepared])
+            for (index, _), new_id in zip(prepared, new_ids):
+                ids[index] = new_id
+        except IntegrityError as e:
+            if atomic:
+                db.session.rollback()
+                return {"ids": ids, "errors": [{"index": None, "message": str(e.orig)}]}
+            # Find the offending rows, keeping the others in the same transaction
+            for index, values in prepared:
+                try:
+                    with db.session.begin_nested():
+                        ids[index] = db.session.execute(insert(table).returning(pk), values).scalar_one()
+                except IntegrityError as row_error:
+                    errors.append({"index": index, "message": str(row_error.orig)})
+            errors.sort(key=lambda error: error["index"])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"ids": ids, "errors": errors}
+
+
+def _selection(model, ids=None, filters=None):
+    """
+    Build the WHERE clauses selecting the rows of a bulk update or delete.
+
+    Refuses an empty selection, so a missing body can never change the whole table.
+    """
+    clauses = compile_filters(model, filters)
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(
+            isinstance(row_id, int) and not isinstance(row_id, bool) for row_id in ids
+        ):
+            raise ValueError("'ids' must be a non-empty array of integers.")
+        limit = current_app.config["BULK_MAX_ROWS"]
+        if len(ids) > limit:
+            raise ValueError(f"A batch cannot contain more than {limit} ids.")
+        clauses.append(model.__table__.primary_key.columns.values()[0].in_(ids))
+    if not clauses:
+        raise ValueError("Select the rows with 'ids' or at least one filter.")
+    return clauses
+
+
+def prepare_changes(model, values, prepare=None, field="values"):
+    """
+    Validate the `values` of a bulk update and turn them into the SET clause of an UPDATE.
+
+    :param model: SQLAlchemy model class
+    :param values: Columns to set and their new values, as received in the request
+    :param prepare: Optional hook receiving the converted values and returning them updated
+                    (values may be SQL expressions over the current row)
+    :param field: Name of the request field holding `values`, used in error messages
+    :return: dict: Column values of the SET clause
+    :raises ValueError: If a column cannot be updated or a value is invalid
+    """
+    if not isinstance(values, dict) or not values:
+        raise ValueError(f"'{field}' must be a non-empty JSON object.")
+
+    columns = {column.name: column for column in _insertable_columns(model)}
+    changes = {}
+    for name, value in values.items():
+        column = columns.get(name)
+        if column is None:
+            raise ValueError(f"Column '{name}' cannot be updated.")
+        if value is None:
+            if not column.nullable:
+                raise ValueError(f"'{name}' cannot be null.")
+            changes[name] = None
+        else:
+            changes[name] = _coerce(column, value)
+    return prepare(changes) if prepare else changes
+
+
+def _execute_change(statement, table, returning):
+    """
+    Run a set-based UPDATE or DELETE and commit it.
+    """
+    try:
+        if returning:
+            rows = [dict(row._mapping) for row in db.session.execute(statement.returning(*table.columns))]
+            result = {"count": len(rows), "rows": rows}
+        else:
+            result = {"count": db.session.execute(statement).rowcount, "rows": None}
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise ValueError(str(e.orig))
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
+
+
+def bulk_update(model, values, ids=None, filters=None, returning=False, prepare=None):
+    """
+    Update every selected row with a single UPDATE ... WHERE statement.
+
+    :param model: SQLAlchemy model class
+    :param values: Columns to set and their new values, as received in the request
+    :param ids: Optional list of primary keys of the rows to update
+    :param filters: Optional `column[__operator]=value` filters (see `utils.filtering`), ANDed with `ids`
+    :param returning: Whether to return the updated rows (through RETURNING) besides their count
+    :param prepare: Optional hook (see `prepare_changes`)
+    :return: dict: The number of updated rows and, if requested, the rows themselves
+    :raises ValueError: If the selection or values are invalid, or the update violates a constraint
+    """
+    table = model.__table__
+    statement = update(table).where(*_selection(model, ids, filters)).values(prepare_changes(model, values, prepare))
+    return _execute_change(statement, table, returning)
+
+
+def update_row(model, row_id, values, prepare=None):
+    """
+    Partially update one row with a single UPDATE ... WHERE pk = ? RETURNING statement.
+
+    Only the columns present in `values` are written, falsy values such as 0 or "" included,
+    and the updated row comes back from the same statement, so nothing is read beforehand.
+
+    :param model: SQLAlchemy model class
+    :param row_id: Primary key of the row
+    :param values: Columns to set and their new values, as received in the request
+    :param prepare: Optional hook (see `prepare_changes`)
+    :return: dict: The updated row, or None when no row has this primary key
+    :raises ValueError: If a value is invalid, or the update violates a constraint
+    """
+    if not isinstance(values, dict) or not values:
+        raise ValueError("The request body must be a non-empty JSON object.")
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0]
+    statement = (
+        update(table).where(pk == row_id)
+        .values(prepare_changes(model, values, prepare))
+        .returning(*table.columns)
+    )
+    try:
+        row = db.session.execute(statement).first()
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise ValueError(str(e.orig))
+    except Exception:
+        db.session.rollback()
+        raise
+    return serializer_for(model)(row) if row else None
+
+
+def delete_row(model, row_id, *conditions):
+    """
+    Delete one row with a single DELETE ... WHERE pk = ? statement.
+
+    Nothing is read beforehand: the row count tells whether the row existed, and the
+    ON DELETE rules declared on the foreign keys remove (CASCADE) or protect (RESTRICT)
+    the rows referencing it within the same statement.
+
+    :param model: SQLAlchemy model class
+    :param row_id: Primary key of the row
+    :param conditions: Optional extra clauses the row must also match to be deleted
+    :return: bool: Whether a row was deleted
+    :raises ValueError: If a foreign key rule forbids the delete
+    """
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0]
+    statement = delete(table).where(pk == row_id, *conditions)
+    try:
+        deleted = db.session.execute(statement).rowcount
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise ValueError(str(e.orig))
+    except Exception:
+        db.session.rollback()
+        raise
+    return deleted > 0
+
+
+def bulk_delete(model, ids=None, filters=None, returning=False):
+    """
+    Delete every selected row with a single DELETE ... WHERE statement.
+
+    :param model: SQLAlchemy model class
+    :param ids: Optional list of primary keys of the rows to delete
+    :param filters: Optional `column[__operator]=value` filters (see `utils.filtering`), ANDed with `ids`
+    :param returning: Whether to return the deleted rows (through RETURNING) besides their count
+    :return: dict: The number of deleted rows and, if requested, the rows themselves
+    :raises ValueError: If the selection is invalid, or the delete violates a constraint
+    """
+    table = model.__table__
+    statement = delete(table).where(*_selection(model, ids, filters))
+    return _execute_change(statement, table, returning)
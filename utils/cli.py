@@ -0,0 +1,86 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from migrations import current_version, upgrade
+from utils.database import db
+from utils.query_audit import audit_queries
+from services.revenue_service import rebuild_revenue
+from services.search_service import rebuild_search_index
+
+# `flask db ...` commands for schema maintenance
+db_cli = AppGroup("db", help="Database schema maintenance commands.")
+
+
+@db_cli.command("upgrade")
+def upgrade_command():
+    """
+    Apply pending schema migrations.
+    """
+    applied = upgrade(db.engine)
+    with db.engine.connect() as connection:
+        version = current_version(connection)
+    if applied:
+        click.echo(f"Applied migrations {', '.join(map(str, applied))}; schema is at version {version}.")
+    else:
+        click.echo(f"Schema is up to date (version {version}).")
+
+
+@db_cli.command("audit-queries")
+@click.option("--verbose", is_flag=True, help="Print the plan of every query, not only the failures.")
+def audit_queries_command(verbose):
+    """
+    Run every registered service read, EXPLAIN the statements it executed and fail on full table scans.
+    """
+    small_tables = current_app.config["QUERY_AUDIT_SMALL_TABLES"]
+    plans, violations = audit_queries(small_tables)
+    if verbose:
+        for name, plan in plans.items():
+            click.echo(f"{name}:")
+            for line in plan:
+                click.echo(f"    {line}")
+
+    for name, line in violations:
+        click.echo(f"{name}: {line}", err=True)
+    if violations:
+        raise click.ClickException(f"{len(violations)} full table scan(s) found in {len(plans)} queries.")
+    click.echo(f"{len(plans)} queries audited, no full table scans.")
+
+
+@db_cli.command("rebuild-revenue")
+@click.option("--verify-only", is_flag=True, help="Only compare the rollups with a full recompute, without rebuilding them.")
+def rebuild_revenue_command(verify_only):
+    """
+    Recompute the revenue rollups from the invoices, reporting where they had drifted.
+    """
+    report = rebuild_revenue(verify_only=verify_only)
+    drifted = 0
+    for table, differences in report.items():
+        for key, stored, expected in differences:
+            click.echo(f"{table} {key}: stored {stored}, expected {expected}", err=True)
+        drifted += len(differences)
+
+    if verify_only and drifted:
+        raise click.ClickException(f"{drifted} rollup row(s) differ from the invoices.")
+    if verify_only:
+        click.echo("Revenue rollups match the invoices.")
+    else:
+        click.echo(f"Revenue rollups rebuilt ({drifted} row(s) had drifted).")
+
+
+@db_cli.command("rebuild-search")
+@click.option("--verify-only", is_flag=True, help="Only check the full-text indexes against their tables, without rebuilding them.")
+def rebuild_search_command(verify_only):
+    """
+    Reindex the full-text search indexes from the tables, reporting any that had drifted.
+    """
+    damaged = rebuild_search_index(verify_only=verify_only)
+    for index in damaged:
+        click.echo(f"{index} does not match its table.", err=True)
+
+    if verify_only and damaged:
+        raise click.ClickException(f"{len(damaged)} search index(es) differ from their tables.")
+    if verify_only:
+        click.echo("Search indexes match their tables.")
+    else:
+        click.echo(f"Search indexes rebuilt ({len(damaged)} had drifted).")
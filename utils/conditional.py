@@ -0,0 +1,146 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+from sqlalchemy import column, select, table
+from werkzeug.http import http_date
+
+from utils.database import db
+from utils.includes import request_tables
+from utils.streaming import wants_stream
+
+# Per-table version markers, bumped by triggers on every write (see migrations/v002_table_versions.py)
+table_version = table("table_version", column("table_name"), column("version"), column("updated_at"))
+
+
+def table_version_statement(name):
+    """
+    Select the version marker of a table.
+    """
+    return select(table_version.c.version, table_version.c.updated_at).where(table_version.c.table_name == name)
+
+
+def version_from_row(row):
+    """
+    Unpack a row selected by `table_version_statement`.
+
+    :return: tuple: The version counter and the (UTC) time of the last write to the table
+    """
+    return row.version, datetime.fromisoformat(row.updated_at).replace(tzinfo=timezone.utc)
+
+
+def get_table_version(name):
+    """
+    Read the version marker of a table.
+
+    :param name: Name of the table
+    :return: tuple: The version counter and the (UTC) time of the last write to the table
+    """
+    return version_from_row(db.session.execute(table_version_statement(name)).one())
+
+
+def get_table_versions(names):
+    """
+    Read the version counters of several tables in one query.
+
+    :param names: Names of the tables
+    :return: tuple: The version counter of each table, in the order of `names`
+    """
+    versions = dict(db.session.execute(
+        select(table_version.c.table_name, table_version.c.version).where(table_version.c.table_name.in_(names))
+    ).all())
+    return tuple(versions.get(name) for name in names)
+
+
+def entity_tag(name, version):
+    """
+    Build the entity tag of the current request's representation.
+
+    The table version identifies the data; the path, query string, field mask and output
+    format identify how it is rendered, so two different bodies never share a tag.
+    """
+    mask_header = current_app.config["RESTX_MASK_HEADER"]
+    variant = "\n".join([
+        request.full_path,
+        request.headers.get(mask_header, ""),
+        "ndjson" if wants_stream() else "json",
+    ])
+    digest = hashlib.blake2b(variant.encode(), digest_size=8).hexdigest()
+    return f"{name}-{version}-{digest}"
+
+
+def not_modified(etag, last_modified):
+    """
+    Check whether the client's cached copy, as described by its conditional headers, is current.
+
+    :param etag: Entity tag of the current representation (without quotes)
+    :param last_modified: Time of the last change to the data (aware datetime), or None when it
+        cannot validate a copy yet (see `last_modified_header`)
+    :return: True if a 304 Not Modified can be returned
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def last_modified_header(last_modified):
+    """
+    Return the time to send as Last-Modified, or None while the second of the last write is running.
+
+    `table_version.updated_at` has a one-second resolution, so a write later in the same second
+    would not move it: a copy dated with it during that second could then be revalidated with
+    If-Modified-Since as current although it misses the write. Such copies only carry the ETag.
+    """
+    return last_modified if last_modified < datetime.now(timezone.utc).replace(microsecond=0) else None
+
+
+def validator_headers(etag, last_modified):
+    """
+    Build the ETag, Last-Modified and Vary headers of a conditional response.
+
+    Last-Modified is left out when `last_modified` is None (see `last_modified_header`).
+    """
+    headers = {"ETag": f'"{etag}"'}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    headers["Vary"] = f"Accept, {current_app.config['RESTX_MASK_HEADER']}"
+    return headers
+
+
+def conditional(name):
+    """
+    Decorator adding ETag and Last-Modified headers to a GET handler reading table `name`.
+
+    With `?include=`, the versions of the embedded tables are part of the tag too.
+
+    When the client's `If-None-Match` (or, failing that, `If-Modified-Since`) shows its copy
+    is current, a 304 Not Modified is returned without running the handler, so the rows
+    are neither read nor serialized. Apply it above `marshal_with` / `streamable`.
+
+    :param name: Name of the table the handler reads
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # Read before the handler runs: a concurrent write can only make the tag older
+            # than the body, which costs a later full response, never a stale 304
+            versions = [get_table_version(table) for table in request_tables(name)]
+            version = ".".join(str(table_version) for table_version, _ in versions)
+            updated_at = last_modified_header(max(table_updated_at for _, table_updated_at in versions))
+            etag = entity_tag(name, version)
+            headers = validator_headers(etag, updated_at)
+            if not_modified(etag, updated_at):
+                return Response(status=304, headers=headers)
+
+            rv = f(*args, **kwargs)
+            if isinstance(rv, Response):
+                if rv.status_code == 200:
+                    rv.headers.update(headers)
+                return rv
+            data, code, extra = unpack(rv)
+            return data, code, {**headers, **extra} if code == 200 else extra
+        return wrapper
+    return decorator
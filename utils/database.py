@@ -1,14 +1,160 @@
 # Import the necessary modules from Flask and SQLAlchemy
-from flask import Flask
+import logging
+import threading
+from collections import Counter
+from flask import Flask, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 
+logger = logging.getLogger(__name__)
+
+# Bind key of the read-only engine (see `SQLALCHEMY_BINDS`), and the requests routed to it
+READ_BIND = "read"
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# PRAGMAs that may be set through the `SQLITE_PRAGMAS` setting, in the order they are applied,
+# with the names SQLite reports back for the ones it returns as numbers
+SQLITE_PRAGMA_VALUES = {
+    "journal_mode": None,
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "cache_size": None,
+    "mmap_size": None,
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+    "busy_timeout": None,
+    "foreign_keys": {0: "OFF", 1: "ON"},
+    "query_only": {0: "OFF", 1: "ON"},
+}
+
 # Base class for SQLAlchemy models. All model classes will inherit from this class.
 # This allows SQLAlchemy to recognize them as models and interact with the database.
 class Base(DeclarativeBase):
   pass  # Placeholder for model classes, no extra functionality is added here.
 
+# Statements executed on each engine ("primary" or "read") since the process started
+_route_counts = Counter()
+_route_counts_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """
+    Session sending the reads of safe requests to the read-only engine.
+
+    Statements run while handling a GET, HEAD or OPTIONS request use the `read` bind when it
+    is configured. Everything else goes to the primary engine: flushes, INSERT/UPDATE/DELETE
+    statements, reads made by mutating requests (so they see their own transaction), and work
+    done outside of a request (startup, CLI commands).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and READ_BIND in self._db.engines and self._reads_from_replica(clause):
+            _count_route("read", clause)
+            return self._db.engines[READ_BIND]
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        _count_route("primary", clause)
+        return engine
+
+    def _reads_from_replica(self, clause):
+        if self._flushing or getattr(clause, "is_dml", False):
+            return False
+        return has_request_context() and request.method in READ_METHODS
+
+
+def _count_route(route, clause):
+    with _route_counts_lock:
+        _route_counts[route] += 1
+    if clause is not None and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Routing {type(clause).__name__} to the {route} engine")
+
+
+def route_stats():
+    """
+    Return how many statements each engine received, and the state of its connection pool.
+    """
+    with _route_counts_lock:
+        counts = dict(_route_counts)
+    engines = {"primary": db.engines[None]}
+    if READ_BIND in db.engines:
+        engines["read"] = db.engines[READ_BIND]
+    return {
+        route: {"statements": counts.get(route, 0), "pool": engine.pool.status()}
+        for route, engine in engines.items()
+    }
+
+
 # Create an instance of SQLAlchemy to manage database interactions
 # The 'model_class=Base' argument tells SQLAlchemy that all models will inherit from the Base class
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+
+
+def configure_engine(engine, pragmas=None):
+    """
+    Attach the connection-level event handlers the application relies on.
+
+    Every new SQLite connection gets the `pragmas` profile (journal mode, synchronous level,
+    caches, busy timeout, foreign key enforcement): most PRAGMAs only last as long as the
+    connection, so they have to be applied as each pooled connection is opened.
+
+    The pysqlite driver starts transactions lazily, right before the first INSERT/UPDATE/DELETE,
+    which silently breaks SAVEPOINTs (a SAVEPOINT issued first opens and later commits its own
+    transaction). Disabling the driver's handling and emitting BEGIN when SQLAlchemy starts a
+    transaction makes nested transactions behave as documented.
+
+    :param engine: The SQLAlchemy engine to configure
+    :param pragmas: Mapping of PRAGMA names (see SQLITE_PRAGMA_VALUES) to the values to set
+    :raises ValueError: If a PRAGMA is not supported
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = dict(pragmas or {})
+    unknown = set(pragmas) - set(SQLITE_PRAGMA_VALUES)
+    if unknown:
+        raise ValueError(f"Unsupported SQLite PRAGMA(s): {', '.join(sorted(unknown))}.")
+    statements = [
+        f"PRAGMA {name} = {pragmas[name]}"
+        for name in SQLITE_PRAGMA_VALUES
+        if pragmas.get(name) not in (None, "")
+    ]
+
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        # Outside of any transaction now, which `journal_mode` requires
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def check_pragmas(engine, pragmas=None):
+    """
+    Read back the PRAGMAs of a fresh connection and log them.
+
+    A requested value SQLite did not accept (e.g. WAL on a filesystem without shared memory,
+    or an mmap size above the compile-time limit) is logged as a warning.
+
+    :param engine: The SQLAlchemy engine to check
+    :param pragmas: The requested values, as given to `configure_engine`
+    :return: dict: The effective value of each PRAGMA
+    """
+    if engine.dialect.name != "sqlite":
+        return {}
+
+    effective = {}
+    with engine.connect() as connection:
+        for name, names in SQLITE_PRAGMA_VALUES.items():
+            value = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            effective[name] = names.get(value, value) if names else value
 
+    logger.info("SQLite PRAGMAs: " + ", ".join(f"{name}={value}" for name, value in effective.items()))
+    for name, requested in (pragmas or {}).items():
+        if requested in (None, "") or str(effective[name]).upper() == str(requested).upper():
+            continue
+        logger.warning(f"SQLite PRAGMA {name} is {effective[name]}, not the requested {requested}.")
+    return effective
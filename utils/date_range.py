@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+from flask import request
+
+# Query string parameters of the endpoints restricted to a range of days
+DATE_RANGE_PARAMS = {
+    "from": "First day to include (YYYY-MM-DD)",
+    "to": "Last day to include (YYYY-MM-DD)",
+}
+
+
+def date_range_args():
+    """
+    Read the date range of the current request.
+    """
+    return {"start": request.args.get("from"), "end": request.args.get("to")}
+
+
+def _date(value, name):
+    """
+    Parse an optional 'YYYY-MM-DD' parameter.
+    """
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"The '{name}' parameter must be a date in the YYYY-MM-DD format.")
+
+
+def date_range_clauses(column, start, end):
+    """
+    Build the WHERE clauses restricting `column` to the days between `start` and `end`, inclusive.
+
+    The column is compared as stored, against `start` and the day after `end`, so an index on
+    it can seek the range and a datetime column includes the whole `end` day.
+
+    :raises ValueError: If `start` or `end` is not a 'YYYY-MM-DD' date
+    """
+    clauses = []
+    start_date, end_date = _date(start, "from"), _date(end, "to")
+    if start_date:
+        clauses.append(column >= start_date)
+    if end_date:
+        clauses.append(column < end_date + timedelta(days=1))
+    return clauses
@@ -0,0 +1,82 @@
+from flask import current_app, request
+from sqlalchemy import select
+
+from utils.database import db
+
+# Query string parameter understood by every list and detail endpoint.
+FIELDS_PARAMS = {
+    "fields": "Comma-separated list of fields to return, e.g. 'work_id,status' (all fields when omitted)",
+}
+
+
+def parse_fields(swagger_model, value=None):
+    """
+    Read and validate the sparse fieldset requested with `?fields=` or the mask header.
+
+    :param swagger_model: Flask-RESTx model of the resource, whose keys are the valid field names
+    :param value: Raw parameter value (defaults to the current request's `fields` argument,
+                  or failing that its X-Fields header)
+    :return: List of field names, or None when every field was requested
+    :raises ValueError: If a field does not exist on the resource
+    """
+    if value is None:
+        value = request.args.get("fields") or request.headers.get(current_app.config["RESTX_MASK_HEADER"], "")
+        value = value.strip("{}")
+    if not value:
+        return None
+
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in swagger_model]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}.")
+    return names or None
+
+
+def _columns(model, fields):
+    """
+    List the columns to read for `fields`, with the primary key appended when it was not requested.
+    """
+    table = model.__table__
+    columns = [table.columns[name] for name in fields]
+    for pk in table.primary_key.columns:
+        if pk.name not in fields:
+            columns.append(pk)
+    return columns
+
+
+def column_query(model, fields):
+    """
+    Build a query that only reads the requested columns of a model.
+
+    The primary key is always selected last, since pagination seeks on it; serializers
+    read the requested columns positionally, so it never reaches the response unless asked for.
+
+    :param model: SQLAlchemy model class
+    :param fields: List of column names
+    :return: Query returning `Row` tuples instead of ORM objects
+    """
+    return db.session.query(*_columns(model, fields))
+
+
+def column_select(model, fields):
+    """
+    Same as `column_query`, as a SELECT statement not tied to the Flask-SQLAlchemy session.
+
+    :param model: SQLAlchemy model class
+    :param fields: List of column names
+    :return: Select
+    """
+    return select(*_columns(model, fields))
+
+
+def apply_fields_mask():
+    """
+    Expose `?fields=` as the Flask-RESTx mask header (X-Fields by default).
+
+    `marshal_with` reads its mask from that header, so the single-row endpoints that still
+    marshal only walk the requested keys instead of formatting every column.
+    """
+    fields = request.args.get("fields")
+    if fields:
+        header = current_app.config["RESTX_MASK_HEADER"].upper().replace("-", "_")
+        request.environ[f"HTTP_{header}"] = fields
@@ -0,0 +1,180 @@
+from datetime import date, datetime
+
+from flask import request
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric
+
+# Query string parameters that drive pagination, streaming, field selection, bulk changes,
+# cascading deletes and date ranges rather than filtering; every other parameter is read as
+# a `column[__operator]=value` filter.
+RESERVED_PARAMS = {
+    "limit", "after", "sort", "fields", "stream", "returning", "include", "cascade", "atomic", "from", "to",
+}
+
+# Supported filter operators and the SQLAlchemy expression each one compiles to
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, value: column.in_(value),
+    "contains": lambda column, value: column.contains(value, autoescape=True),
+    "isnull": lambda column, value: column.is_(None) if value else column.is_not(None),
+}
+
+
+def primary_key(model):
+    """
+    Return the single-column primary key of a model.
+    """
+    return model.__table__.primary_key.columns.values()[0]
+
+
+def _column(model, name, purpose):
+    """
+    Look up a column by name, refusing anything that is not part of the table.
+    """
+    column = model.__table__.columns.get(name)
+    if column is None:
+        raise ValueError(f"Unknown {purpose} column '{name}'.")
+    return column
+
+
+def _parse_bool(raw):
+    """
+    Parse a boolean query string value ('true'/'false' or '1'/'0').
+    """
+    if raw.lower() not in ("true", "false", "1", "0"):
+        raise ValueError(f"Invalid boolean value '{raw}'.")
+    return raw.lower() in ("true", "1")
+
+
+def _convert(column, raw):
+    """
+    Convert a query string value to the Python type of the column it is compared with.
+    """
+    column_type = column.type
+    try:
+        if isinstance(column_type, Boolean):
+            return _parse_bool(raw)
+        if isinstance(column_type, Integer):
+            return int(raw)
+        if isinstance(column_type, (Float, Numeric)):
+            return float(raw)
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(raw)
+        if isinstance(column_type, Date):
+            return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"Invalid value '{raw}' for column '{column.name}'.")
+    return raw
+
+
+def sortable_columns(model):
+    """
+    Return the names of the columns a model's lists can be sorted by.
+
+    A keyset page costs one index seek only when an index orders the rows by the sort column and
+    then by the primary key. Every SQLite index ends with the rowid, which is the primary key of
+    these tables, so an index on a column is such a `(column, pk)` index: the sortable columns are
+    the primary key and the leading column of each index declared on the model.
+    """
+    names = [primary_key(model).name]
+    names += [next(iter(index.columns)).name for index in model.__table__.indexes]
+    return sorted(set(names), key=names.index)
+
+
+def _check_sort_index(model, keys):
+    """
+    Refuse a sort order no index can deliver, which would scan and sort the whole table per page.
+    """
+    names = [column.name for column, _ in keys if column is not primary_key(model)]
+    indexed = [[column.name for column in index.columns] for index in model.__table__.indexes]
+    if names and not any(columns[:len(names)] == names for columns in indexed):
+        raise ValueError(
+            f"Cannot sort by '{','.join(names)}': no index orders the rows that way. "
+            f"Sortable columns: {', '.join(sortable_columns(model))}."
+        )
+    if len({descending for _, descending in keys}) > 1:
+        raise ValueError("All the columns in 'sort' must use the same direction.")
+
+
+def parse_sort(model, sort):
+    """
+    Translate a `sort` query parameter into an ordered list of sort keys.
+
+    The primary key is always appended as a tie-breaker so that the ordering is total,
+    which is what makes a keyset cursor unambiguous.
+
+    :param model: SQLAlchemy model class
+    :param sort: Comma-separated column names, each optionally prefixed with '-' for descending order
+    :return: List of (column, descending) tuples
+    :raises ValueError: If a column does not exist on the model, or no index provides the order
+    """
+    pk = primary_key(model)
+    keys = []
+    for item in (sort or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        descending = item.startswith("-")
+        column = _column(model, item.lstrip("-"), "sort")
+        if any(column is existing for existing, _ in keys):
+            raise ValueError(f"Column '{column.name}' appears more than once in 'sort'.")
+        keys.append((column, descending))
+        if column is pk:
+            # Nothing after the primary key can change the ordering
+            _check_sort_index(model, keys)
+            return keys
+
+    # Break ties in the direction of the first key so '-created_at' lists newest ids first
+    keys.append((pk, keys[0][1] if keys else False))
+    _check_sort_index(model, keys)
+    return keys
+
+
+def compile_filters(model, filters):
+    """
+    Compile `column[__operator]=value` filters into parameterized WHERE clauses.
+
+    Column names are checked against `model.__table__.columns` and values are converted
+    to the column's type, so the database can use its indexes to select the rows.
+
+    :param model: SQLAlchemy model class
+    :param filters: Mapping of filter names to a value or a list of values (ANDed together)
+    :return: List of SQLAlchemy boolean expressions, suitable for `Query.filter(*clauses)`
+    :raises ValueError: If a column, operator or value is invalid
+    """
+    clauses = []
+    for key, values in (filters or {}).items():
+        name, _, operator = key.partition("__")
+        operator = operator or "eq"
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}'.")
+        column = _column(model, name, "filter")
+
+        for raw in values if isinstance(values, list) else [values]:
+            if operator == "in":
+                value = [_convert(column, item) for item in raw.split(",")]
+            elif operator == "isnull":
+                value = _parse_bool(raw)
+            elif operator == "contains":
+                value = raw
+            else:
+                value = _convert(column, raw)
+            clauses.append(OPERATORS[operator](column, value))
+    return clauses
+
+
+def filter_args():
+    """
+    Collect the filters of the current request.
+
+    :return: dict: Each non-reserved query parameter mapped to the list of its values
+    """
+    return {
+        key: values
+        for key, values in request.args.lists()
+        if key not in RESERVED_PARAMS
+    }
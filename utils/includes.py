@@ -0,0 +1,195 @@
+from functools import wraps
+
+from flask import abort, request
+from sqlalchemy import inspect
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from utils.database import db
+from utils.fieldsets import parse_fields
+from utils.serializers import serializer_for
+
+# Query string parameter understood by the list and detail endpoints of resources with relationships
+INCLUDE_PARAMS = {
+    "include": "Comma-separated relationships to embed, dotted for nested levels "
+               "(e.g. 'vehicles,vehicles.works'); each level costs one query",
+}
+
+# Deepest relationship path accepted in `include`
+MAX_INCLUDE_DEPTH = 3
+
+# Parent keys bound in each IN query of an include level (as selectinload does), within SQLite's variable limit
+INCLUDE_CHUNK_SIZE = 500
+
+
+def parse_include(model, value=None):
+    """
+    Read and validate the relationships requested with `?include=`.
+
+    :param model: SQLAlchemy model class of the resource
+    :param value: Raw parameter value (defaults to the current request's `include` argument)
+    :return: Nested dict of relationship names ({"vehicles": {"works": {}}}), or None when nothing was requested
+    :raises ValueError: If a relationship does not exist or a path is too deep
+    """
+    if value is None:
+        value = request.args.get("include", "")
+    tree = {}
+    for path in (item.strip() for item in value.split(",")):
+        if not path:
+            continue
+        names = path.split(".")
+        if len(names) > MAX_INCLUDE_DEPTH:
+            raise ValueError(f"Include path '{path}' is deeper than {MAX_INCLUDE_DEPTH} levels.")
+        current_model, node = model, tree
+        for name in names:
+            relationship = inspect(current_model).relationships.get(name)
+            if relationship is None:
+                raise ValueError(f"Unknown relationship '{name}' in include path '{path}'.")
+            node = node.setdefault(name, {})
+            current_model = relationship.mapper.class_
+    return tree or None
+
+
+def included_tables(model, value=None):
+    """
+    List the tables an `include` request reads besides the model's own.
+
+    :return: List of table names (empty when nothing, or nothing valid, was requested)
+    """
+    try:
+        tree = parse_include(model, value)
+    except ValueError:
+        return []  # The handler reports the error
+    tables = []
+
+    def walk(current_model, node):
+        for name, subtree in node.items():
+            related = inspect(current_model).relationships[name].mapper.class_
+            tables.append(related.__table__.name)
+            walk(related, subtree)
+
+    walk(model, tree or {})
+    return list(dict.fromkeys(tables))
+
+
+def model_for_table(name):
+    """
+    Return the model class mapped to table `name`.
+
+    API modules name their detail resource after the model, so handlers look the model up by table.
+    """
+    return next(mapper.class_ for mapper in db.Model.registry.mappers if mapper.local_table.name == name)
+
+
+def request_tables(name):
+    """
+    List the tables the current request reads: table `name`, plus those embedded with `?include=`.
+
+    Used by the conditional GET headers and the response cache, so a write to an embedded
+    table changes the entity tag and invalidates the cached response.
+    """
+    if not request.args.get("include"):
+        return [name]
+    model = model_for_table(name)
+    return [name, *(table for table in included_tables(model) if table != name)]
+
+
+def include_query(model):
+    """
+    Build a query over ORM instances of `model` whose relationships are loaded by `serialize_included`.
+
+    Lazy loading is disabled, so a relationship that was not included can never cost a query per row.
+
+    :param model: SQLAlchemy model class
+    :return: Query
+    """
+    return db.session.query(model).options(raiseload("*"))
+
+
+def _load_included(instances, model, tree):
+    """
+    Load the relationships of `tree` on `instances`, one query per relationship and per
+    `INCLUDE_CHUNK_SIZE` parent keys.
+
+    Each query selects the related rows whose join column is IN a chunk of the parents' keys
+    (as `get_client_history` does), so a level costs one query up to 500 parents, whatever
+    number of rows it holds.
+    """
+    for name, subtree in tree.items():
+        relationship = inspect(model).relationships[name]
+        related = relationship.mapper.class_
+        ((local, remote),) = relationship.local_remote_pairs
+        keys = sorted({key for key in (getattr(instance, local.key) for instance in instances) if key is not None})
+        rows = []
+        for start in range(0, len(keys), INCLUDE_CHUNK_SIZE):
+            rows.extend(db.session.query(related).options(raiseload("*")).filter(
+                getattr(related, remote.key).in_(keys[start:start + INCLUDE_CHUNK_SIZE])
+            ).order_by(*related.__table__.primary_key.columns).all())
+
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(getattr(row, remote.key), []).append(row)
+        for instance in instances:
+            matches = by_key.get(getattr(instance, local.key), [])
+            set_committed_value(instance, name, matches if relationship.uselist else next(iter(matches), None))
+        _load_included(rows, related, subtree)
+
+
+def _serialize_included(instance, serializer, tree):
+    record = serializer.from_object(instance)
+    for name, subtree in tree.items():
+        related = getattr(instance, name)
+        if isinstance(related, list):
+            related_serializer = serializer_for(type(related[0])) if related else None
+            record[name] = [_serialize_included(item, related_serializer, subtree) for item in related]
+        elif related is not None:
+            record[name] = _serialize_included(related, serializer_for(type(related)), subtree)
+        else:
+            record[name] = None
+    return record
+
+
+def serialize_included(instance, serializer, tree):
+    """
+    Load the relationships of `tree` on an ORM instance (or a list of them) and serialize it with them.
+
+    :param instance: ORM instance or list of instances, from `include_query`
+    :param serializer: Serializer of the instance's model, which may be restricted to some fields
+    :param tree: Relationships returned by `parse_include`
+    :return: dict (or list of dicts), each relationship embedded under its name
+    """
+    instances = instance if isinstance(instance, list) else [instance]
+    if instances:
+        _load_included(instances, type(instances[0]), tree)
+    records = [_serialize_included(item, serializer, tree) for item in instances]
+    return records if isinstance(instance, list) else records[0]
+
+
+def includable(get_row, model, swagger_model):
+    """
+    Decorator letting a detail handler embed related rows when `?include=` is given.
+
+    Such requests are answered from `get_row` directly, since `marshal_with` would drop the
+    embedded keys, and never reach the decorated handler. Apply it below `conditional`.
+
+    :param get_row: Service function returning one serialized row, called as `get_row(id, fields=..., include=...)`
+    :param model: SQLAlchemy model class of the resource
+    :param swagger_model: Flask-RESTx model of the resource, used to validate `?fields=`
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not request.args.get("include"):
+                return f(*args, **kwargs)
+            try:
+                include = parse_include(model)
+                fields = parse_fields(swagger_model)
+            except ValueError as e:
+                abort(400, str(e))
+            (row_id,) = kwargs.values()
+            row = get_row(row_id, fields=fields, include=include)
+            if row is None:
+                abort(404, f"{model.__name__} with ID {row_id} not found.")
+            return row
+        return wrapper
+    return decorator
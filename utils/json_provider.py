@@ -0,0 +1,88 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional: fall back to the standard library encoder
+    orjson = None
+
+
+def _default(o):
+    """
+    Encode the types the standard library cannot, the same way orjson does.
+
+    Dates and datetimes use ISO 8601, like the Swagger models of the API, and decimals
+    become strings so no precision is lost.
+    """
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    JSON provider using orjson when it is installed and the standard library otherwise.
+
+    Both encoders produce the same output: UTF-8, ISO 8601 dates, decimals as strings.
+    With `JSON_COMPACT` (the default) there is no whitespace and keys keep their order;
+    otherwise output is indented and keys are sorted, which is easier to read when debugging.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.compact = app.config.get("JSON_COMPACT", True)
+        self.use_orjson = orjson is not None and app.config.get("JSON_USE_ORJSON", True)
+
+    def dumps_bytes(self, obj):
+        """
+        Serialize `obj` to UTF-8 encoded JSON.
+        """
+        if self.use_orjson:
+            option = 0 if self.compact else orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=_default, option=option)
+        return self.dumps(obj).encode()
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self.dumps_bytes(obj).decode()
+        if self.compact:
+            kwargs.setdefault("separators", (",", ":"))
+        else:
+            kwargs.setdefault("indent", 2)
+            kwargs.setdefault("sort_keys", True)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("default", _default)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype="application/json")
+
+
+def output_json(data, code, headers=None):
+    """
+    Flask-RESTx representation for `application/json` that encodes with the app's JSON provider.
+    """
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
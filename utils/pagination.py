@@ -0,0 +1,252 @@
+import base64
+import binascii
+import json
+
+from flask import current_app, request
+from sqlalchemy import and_, false, or_, select, type_coerce
+from sqlalchemy.types import NullType
+
+from utils.database import db
+from utils.filtering import parse_sort, primary_key
+
+# Query string parameters understood by every paginated collection endpoint.
+# Used with `@ns.doc(params=PAGINATION_PARAMS)` so they show up in Swagger.
+PAGINATION_PARAMS = {
+    "limit": "Maximum number of rows to return (capped by the server)",
+    "after": "Cursor returned in the X-Next-Cursor header of the previous page",
+    "sort": "Indexed column to sort by, prefixed with '-' for descending order "
+            "(e.g. '-created_at'; defaults to the primary key)",
+}
+
+
+def encode_cursor(sort, values):
+    """
+    Encode the position of the last row of a page as an opaque URL-safe token.
+
+    :param sort: The sort specification the page was produced with
+    :param values: Raw database values of the sort keys for the last row
+    :return: Cursor token
+    """
+    payload = json.dumps({"s": sort or "", "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, sort, keys):
+    """
+    Decode a cursor token produced by `encode_cursor`.
+
+    :param token: Cursor token from the `after` query parameter
+    :param sort: The sort specification of the current request
+    :param keys: Sort keys returned by `parse_sort`
+    :return: List of raw values, one per sort key
+    :raises ValueError: If the token is malformed or belongs to a different sort order
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_sort, values = payload["s"], payload["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor.")
+    if cursor_sort != (sort or "") or not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Pagination cursor does not match the requested sort order.")
+    return values
+
+
+def _raw(column):
+    """
+    View a column without Python-side type processing.
+
+    Cursor values are stored exactly as SQLite holds them, so comparing against the raw
+    column avoids mismatches such as '2025-01-20 10:00:00' vs '2025-01-20 10:00:00.000000'.
+    """
+    return type_coerce(column, NullType())
+
+
+def _seek_predicate(keys, values):
+    """
+    Build the WHERE clause selecting the rows that come after `values` in `keys` order.
+
+    SQLite sorts NULLs first in ascending order and last in descending order, and the
+    predicate follows the same rule so that nullable sort columns paginate correctly.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        raw, value = _raw(column), values[i]
+        if descending:
+            if value is None:
+                after = false()
+            else:
+                after = or_(raw < value, raw.is_(None)) if column.nullable else raw < value
+        else:
+            after = raw.is_not(None) if value is None else raw > value
+
+        equal = [
+            _raw(prev).is_(None) if prev_value is None else _raw(prev) == prev_value
+            for (prev, _), prev_value in zip(keys[:i], values[:i])
+        ]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def _seek_ranges(keys, values):
+    """
+    Build the WHERE clauses selecting the rows after `values` in `keys` order, one per index range.
+
+    The sort columns lead an index (see `parse_sort`), and each clause bounds the first of them,
+    so SQLite starts reading the index at the cursor instead of skipping every earlier row. The
+    NULLs of a nullable first column sit at one end of the index (first in ascending order, last
+    in descending order), so the rows after a cursor can span two ranges, returned in sort order.
+    """
+    (column, descending), rest = keys[0], keys[1:]
+    raw, value = _raw(column), values[0]
+    tied = _seek_predicate(rest, values[1:]) if rest else false()
+    if value is None:
+        ranges = [and_(raw.is_(None), tied)]
+        if not descending:
+            ranges.append(raw.is_not(None))
+    elif descending:
+        ranges = [and_(raw <= value, or_(raw < value, tied))]
+        if column.nullable:
+            ranges.append(raw.is_(None))
+    else:
+        ranges = [and_(raw >= value, or_(raw > value, tied))]
+    return ranges
+
+
+def page_size(limit):
+    """
+    Clamp the requested page size to the limits configured for the application.
+
+    :param limit: Requested page size or None for the default
+    :return: Effective page size
+    :raises ValueError: If the limit is not a positive integer
+    """
+    if limit is None:
+        return current_app.config["PAGE_SIZE_DEFAULT"]
+    if limit < 1:
+        raise ValueError("The 'limit' parameter must be a positive integer.")
+    return min(limit, current_app.config["PAGE_SIZE_MAX"])
+
+
+def _page(query, model, limit, after, sort):
+    """
+    Restrict a query or SELECT statement to the rows of one page, plus one to detect the next page.
+
+    :return: tuple: The restricted queries, one per index range the page may span (read them in
+             turn until the page is full), the sort keys and the page size
+    """
+    keys = parse_sort(model, sort)
+    size = page_size(limit)
+
+    ordering = [column.desc() if descending else column.asc() for column, descending in keys]
+    ranges = _seek_ranges(keys, decode_cursor(after, sort, keys)) if after else [None]
+    queries = [
+        (query if where is None else query.filter(where)).order_by(*ordering).limit(size + 1)
+        for where in ranges
+    ]
+    return queries, keys, size
+
+
+def _cursor_statement(model, keys, rows):
+    """
+    Select the raw stored values of the sort keys of the last row of a page.
+
+    :return: The statement, or None when the primary key alone orders the page
+    """
+    if len(keys) == 1:
+        return None
+    pk = primary_key(model)
+    return select(*[_raw(column) for column, _ in keys]).where(pk == getattr(rows[-1], pk.key))
+
+
+def paginate(query, model, limit=None, after=None, sort=None):
+    """
+    Return one page of `query` using keyset (seek) pagination.
+
+    Instead of OFFSET, the page starts right after the row identified by the cursor, so
+    fetching any page costs the same index seek regardless of how deep it is.
+
+    :param query: Query over `model` to paginate
+    :param model: SQLAlchemy model class
+    :param limit: Requested page size
+    :param after: Cursor of the previous page, if any
+    :param sort: Sort specification (see `utils.filtering.parse_sort`)
+    :return: tuple: The rows of the page and the cursor of the next page (or None)
+    :raises ValueError: If any of the pagination arguments is invalid
+    """
+    queries, keys, size = _page(query, model, limit, after, sort)
+    rows = []
+    for page_query in queries:
+        rows += page_query.all()
+        if len(rows) > size:
+            break
+
+    if len(rows) <= size:
+        return rows, None
+
+    rows = rows[:size]
+    statement = _cursor_statement(model, keys, rows)
+    if statement is None:
+        values = [getattr(rows[-1], primary_key(model).key)]
+    else:
+        # Read the raw stored values of the last row so the next seek compares like with like
+        values = list(db.session.execute(statement).one())
+    return rows, encode_cursor(sort, values)
+
+
+async def paginate_async(session, statement, model, limit=None, after=None, sort=None):
+    """
+    Asynchronous counterpart of `paginate`, for a SELECT statement run on an `AsyncSession`.
+
+    :param session: AsyncSession to execute the statements with
+    :param statement: SELECT over `model` to paginate
+    :return: tuple: The rows of the page and the cursor of the next page (or None)
+    :raises ValueError: If any of the pagination arguments is invalid
+    """
+    statements, keys, size = _page(statement, model, limit, after, sort)
+    rows = []
+    for page_statement in statements:
+        rows += (await session.execute(page_statement)).all()
+        if len(rows) > size:
+            break
+
+    if len(rows) <= size:
+        return rows, None
+
+    rows = rows[:size]
+    cursor_statement = _cursor_statement(model, keys, rows)
+    if cursor_statement is None:
+        values = [getattr(rows[-1], primary_key(model).key)]
+    else:
+        values = list((await session.execute(cursor_statement)).one())
+    return rows, encode_cursor(sort, values)
+
+
+def pagination_args():
+    """
+    Read the pagination parameters of the current request.
+
+    :return: dict: Keyword arguments for the `get_all_*` service functions
+    :raises ValueError: If `limit` is not an integer
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("The 'limit' parameter must be a positive integer.")
+    return {
+        "limit": limit,
+        "after": request.args.get("after") or None,
+        "sort": request.args.get("sort") or None,
+    }
+
+
+def pagination_headers(next_cursor):
+    """
+    Build the response headers advertising the next page.
+
+    :param next_cursor: Cursor returned by `paginate`
+    :return: dict: Headers to attach to the list response
+    """
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
@@ -0,0 +1,97 @@
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from utils.database import db
+
+# Registered service reads, keyed by a descriptive name.
+# Each value is a callable calling a service function with representative arguments.
+_QUERIES = {}
+
+# Matches plan lines such as "SCAN work" or "SCAN work USING COVERING INDEX ix_work_status",
+# and "SCAN TABLE work" as printed by SQLite versions before 3.36
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+def register_query(name, run):
+    """
+    Register a service read to be checked by `flask db audit-queries`.
+
+    The statements `run` executes are the ones explained, so the audit sees exactly the SQL
+    the service builds (filters, keyset seeks, date windows) rather than a hand-written copy.
+
+    :param name: Unique, descriptive name of the read (e.g. 'task_service.tasks_by_work')
+    :param run: Callable calling the service function with representative arguments
+    """
+    _QUERIES[name] = run
+
+
+def registered_queries():
+    """
+    Return the registered reads, sorted by name.
+    """
+    return dict(sorted(_QUERIES.items()))
+
+
+@contextmanager
+def captured_statements():
+    """
+    Record the SELECT statements executed on any of the application's engines while the block runs.
+
+    :return: List of (SQL, parameters) tuples, filled as the statements are executed
+    """
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+def explain(statement, parameters=()):
+    """
+    Run `EXPLAIN QUERY PLAN` for an SQL statement with its bound parameters.
+
+    :param statement: SQL of the statement, as sent to the driver
+    :param parameters: Parameters it was executed with
+    :return: List of plan lines, e.g. ['SEARCH task USING INDEX ix_task_work_id (work_id=?)']
+    """
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in rows]
+
+
+def audit_queries(small_tables=()):
+    """
+    Run every registered service read and report full scans of large tables in the plans of
+    the statements it executed.
+
+    :param small_tables: Names of tables small enough for a full scan to be acceptable
+    :return: tuple: A dict of read name to plan lines, and a list of (read name, problem) violations
+    """
+    plans, violations = {}, []
+    for name, run in registered_queries().items():
+        with captured_statements() as statements:
+            try:
+                run()
+            finally:
+                db.session.rollback()
+        if not statements:
+            # A read served from a cache, or failing before its query, proves nothing
+            plans[name] = []
+            violations.append((name, "no SELECT statement was executed"))
+            continue
+        plans[name] = [line for statement, parameters in statements for line in explain(statement, parameters)]
+        for line in plans[name]:
+            match = _SCAN.match(line)
+            if match and match.group(1) not in small_tables:
+                violations.append((name, line))
+    return plans, violations
@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+from werkzeug.http import parse_date
+
+from utils.conditional import get_table_versions, not_modified
+from utils.includes import request_tables
+from utils.streaming import wants_stream
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses, bounded by the total size of their bodies.
+
+    Each entry remembers the versions of the tables it was built from (see
+    migrations/v002_table_versions.py), so a write to one of them, by any process, invalidates
+    its entries without having to find them.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, current_versions):
+        """
+        Return the entry stored under `key` if it is still current, counting a hit or a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["versions"] != current_versions:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry_versions, response, max_bytes):
+        """
+        Store a response, evicting the least recently used entries beyond `max_bytes`.
+        """
+        body = response.get_data()
+        entry = {
+            "versions": entry_versions,
+            "body": body,
+            "status": response.status_code,
+            "headers": [(name, value) for name, value in response.headers if name != "Content-Length"],
+            "size": len(body) + len(key),
+        }
+        if entry["size"] > max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = entry
+            self.size += entry["size"]
+            while self.size > max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, key):
+        self.size -= self._entries.pop(key)["size"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Return the counters of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": current_app.config["RESPONSE_CACHE_MAX_BYTES"],
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key():
+    """
+    Identify the response of the current request: path, query string with its parameters
+    in a canonical order, and the field mask header.
+    """
+    query = urlencode(sorted(request.args.items(multi=True)))
+    mask = request.headers.get(current_app.config["RESTX_MASK_HEADER"], "")
+    return f"{request.path}?{query}|{mask}"
+
+
+def _replay(entry):
+    """
+    Rebuild a response from a cache entry, honouring the client's conditional headers.
+    """
+    headers = dict(entry["headers"])
+    etag = headers.get("ETag", "").strip('"')
+    last_modified = parse_date(headers.get("Last-Modified"))
+    if etag and not_modified(etag, last_modified):
+        return Response(status=304, headers={name: headers[name] for name in ("ETag", "Vary") if name in headers})
+    response = Response(entry["body"], status=entry["status"], headers=entry["headers"])
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+def cached(name):
+    """
+    Decorator serving a list handler reading table `name` from the in-process response cache.
+
+    Apply it to a Resource method, above `conditional`: a hit costs one read of the table
+    versions and is answered from memory, without querying the table or serializing anything.
+    NDJSON streams are never cached. Responses embedding related rows (`?include=`) are keyed
+    on the versions of every table read.
+
+    :param name: Name of the table the handler reads
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(resource, *args, **kwargs):
+            max_bytes = current_app.config["RESPONSE_CACHE_MAX_BYTES"]
+            if not max_bytes or wants_stream():
+                return f(resource, *args, **kwargs)
+
+            key = _cache_key()
+            # Read before the handler runs, so a write that lands meanwhile makes the entry stale
+            entry_versions = get_table_versions(request_tables(name))
+            entry = response_cache.get(key, entry_versions)
+            if entry is not None:
+                return _replay(entry)
+
+            rv = f(resource, *args, **kwargs)
+            response = rv if isinstance(rv, Response) else resource.api.make_response(*unpack(rv))
+            if response.status_code == 200:
+                response_cache.put(key, entry_versions, response, max_bytes)
+                response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,65 @@
+from functools import lru_cache
+
+from sqlalchemy import Date, DateTime
+
+
+class RowSerializer:
+    """
+    Turns rows of a model's table into JSON-ready dictionaries.
+
+    The serializer is compiled once per model (and field selection) from
+    `model.__table__.columns`, the same source `generate_swagger_model` uses, and produces
+    exactly what marshalling with that Swagger model would: one key per column, dates and
+    datetimes in ISO 8601. Rows are read positionally, so plain `Row` tuples are enough.
+    """
+
+    def __init__(self, model, fields=None):
+        table = model.__table__
+        if fields:
+            self.columns = [table.columns[name] for name in fields]
+        else:
+            self.columns = list(table.columns)
+        self.names = [column.name for column in self.columns]
+        self._keys = [column.key for column in self.columns]
+        self._temporal = [
+            column.name for column in self.columns if isinstance(column.type, (Date, DateTime))
+        ]
+
+    def __call__(self, row):
+        """
+        Serialize one row whose first values are the serializer's columns, in order.
+        """
+        record = dict(zip(self.names, row))
+        for name in self._temporal:
+            value = record[name]
+            if value is not None:
+                record[name] = value.isoformat()
+        return record
+
+    def many(self, rows):
+        """
+        Serialize a list of rows.
+        """
+        return [self(row) for row in rows]
+
+    def from_object(self, instance):
+        """
+        Serialize an ORM instance of the model.
+        """
+        return self(tuple(getattr(instance, key) for key in self._keys))
+
+
+@lru_cache(maxsize=256)
+def _compile(model, fields):
+    return RowSerializer(model, fields)
+
+
+def serializer_for(model, fields=None):
+    """
+    Return the (cached) serializer of a model.
+
+    :param model: SQLAlchemy model class
+    :param fields: Optional list of column names to restrict the output to, in output order
+    :return: RowSerializer
+    """
+    return _compile(model, tuple(fields) if fields else None)
@@ -0,0 +1,124 @@
+from functools import wraps
+
+from flask import Response, abort, current_app, request, stream_with_context
+
+from utils.database import db
+from utils.fieldsets import column_query, parse_fields
+from utils.filtering import compile_filters, filter_args
+from utils.serializers import serializer_for
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Query string parameter documenting the streaming mode in Swagger
+STREAM_PARAMS = {
+    "stream": f"Set to 1 to stream every row as newline-delimited JSON (same as 'Accept: {NDJSON_MIMETYPE}')",
+}
+
+# Once the first row is out, lines are grouped into chunks of roughly this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def wants_stream():
+    """
+    Check whether the current request asked for a streamed NDJSON response.
+
+    :return: True if `?stream=1` was given or NDJSON is the preferred `Accept` type
+    """
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _iter_serialized(statement, serializer, batch_size):
+    """
+    Execute `statement` with a server-side cursor and yield each row serialized.
+    """
+    result = db.session.execute(statement, execution_options={"yield_per": batch_size})
+    try:
+        for row in result:
+            yield serializer(row)
+    finally:
+        result.close()
+
+
+def stream_rows(model, fields=None, filters=None, batch_size=None):
+    """
+    Iterate over every matching row of a model's table through a server-side cursor.
+
+    Rows are fetched `batch_size` at a time as plain tuples and serialized one by one, so
+    neither the result set nor ORM objects ever accumulate in memory. The statement is built before
+    the iterator is returned, so invalid filters are reported before any byte is sent.
+
+    :param model: SQLAlchemy model class
+    :param fields: Optional list of column names to read (all columns when omitted)
+    :param filters: Optional `column[__operator]=value` filters (see `utils.filtering`)
+    :param batch_size: Rows fetched per round trip (defaults to STREAM_BATCH_SIZE)
+    :return: Iterator of JSON-ready dictionaries keyed by column name
+    :raises ValueError: If a filter is invalid
+    """
+    batch_size = batch_size or current_app.config["STREAM_BATCH_SIZE"]
+    serializer = serializer_for(model, fields)
+    statement = (
+        column_query(model, serializer.names).statement
+        .where(*compile_filters(model, filters))
+        .order_by(*model.__table__.primary_key.columns)
+    )
+    return _iter_serialized(statement, serializer, batch_size)
+
+
+def ndjson_response(rows):
+    """
+    Stream rows as newline-delimited JSON, one object per line.
+
+    :param rows: Iterable of serialized rows (e.g. from `stream_rows`)
+    :return: Streaming Flask response
+    """
+    def encode(row):
+        return current_app.json.dumps(row) + "\n"
+
+    def generate():
+        rows_iter = iter(rows)
+        first = next(rows_iter, None)
+        if first is None:
+            return
+        # Send the very first row on its own to keep time-to-first-byte low
+        yield encode(first)
+
+        buffer, size = [], 0
+        for row in rows_iter:
+            line = encode(row)
+            buffer.append(line)
+            size += len(line)
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def streamable(iter_rows, swagger_model):
+    """
+    Decorator letting a list handler answer with an NDJSON stream on request.
+
+    Streamed requests are served from `iter_rows` and never reach the decorated handler,
+    so the full list is never built.
+
+    :param iter_rows: Service function returning an iterator of serialized rows
+    :param swagger_model: Flask-RESTx model of the resource, used to validate `?fields=`
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if wants_stream():
+                try:
+                    fields = parse_fields(swagger_model)
+                    rows = iter_rows(fields=fields, filters=filter_args())
+                except ValueError as e:
+                    abort(400, str(e))
+                return ndjson_response(rows)
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
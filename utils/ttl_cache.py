@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app
+
+
+def ttl_cached(ttl_setting, max_entries=256):
+    """
+    Decorator caching the results of a function for a few seconds, keyed by its arguments.
+
+    For results computed from several tables, where no single table version (see
+    `utils.response_cache`) tells when they are stale: a repeated call within the TTL is
+    answered from memory, and anything written meanwhile shows up once the entry expires.
+    At most `max_entries` results are kept, the least recently used ones being dropped first.
+
+    :param ttl_setting: Name of the configuration value holding the TTL in seconds (0 disables the cache)
+    :param max_entries: Maximum number of cached results
+    """
+    def decorator(f):
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            ttl = current_app.config[ttl_setting]
+            if not ttl:
+                return f(*args, **kwargs)
+
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(key)
+                    return entry[1]
+
+            result = f(*args, **kwargs)
+            with lock:
+                entries[key] = (now + ttl, result)
+                entries.move_to_end(key)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return result
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator